@@ -2,15 +2,30 @@ from flask import Flask, jsonify
 from app.config import Config
 from app.extensions import db, migrate, jwt, mail
 
-from app.controllers.web_controller import web_bp
-from app.controllers.web_api_controller import web_api_bp
 from app.db_objects_mssql import ensure_db_objects_mssql
 
 
-def create_app():
+ROLES = ("all", "web", "worker")
+
+
+def create_app(role: str | None = None):
+    """
+    role: "all" | "web" | "worker" (verilmezse APP_ROLE config'i)
+    - web: scheduler başlatılmaz, job modülleri import edilmez
+    - worker: blueprint yok; engine WORKER_SQLALCHEMY_ENGINE_OPTIONS ile kurulur,
+      scheduler'ı çağıran başlatır (bkz. app/worker.py)
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    role = role or app.config.get("APP_ROLE", "all")
+    if role not in ROLES:
+        raise ValueError(f"Geçersiz APP_ROLE: {role}")
+    app.config["APP_ROLE"] = role
+
+    if role == "worker":
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = app.config["WORKER_SQLALCHEMY_ENGINE_OPTIONS"]
+
     # 1) Önce db init (db.engine / db.session için şart)
     db.init_app(app)
 
@@ -19,10 +34,19 @@ def create_app():
 
     # 3) Diğer extension’lar
     migrate.init_app(app, db)
-    jwt.init_app(app)
     mail.init_app(app)
 
+    from app.cli import register_cli
+    register_cli(app)
+
+    if role == "worker":
+        return app
+
+    jwt.init_app(app)
+
     # 4) Web/UI blueprintleri
+    from app.controllers.web_controller import web_bp
+    from app.controllers.web_api_controller import web_api_bp
     app.register_blueprint(web_bp)
     app.register_blueprint(web_api_bp)
 
@@ -38,12 +62,23 @@ def create_app():
     app.register_blueprint(borrow_bp, url_prefix="/borrow")
     app.register_blueprint(notif_bp, url_prefix="/notifications")
 
+    # Autocomplete index'i (/books/suggest): arka planda kurulur, açılışı bekletmez
+    if app.config.get("SUGGEST_WARM_ON_START", True):
+        from app.services.suggest_service import SuggestService
+        SuggestService.warm(app)
+
+    # Paylaşılan katalog snapshot'ı: her web process'i builder'ı dener, makine başına biri kilidi alır
+    if app.config.get("CATALOG_SNAPSHOT_PATH"):
+        from app.tasks.catalog_snapshot import start_snapshot_builder
+        start_snapshot_builder(app)
+
     @app.get("/health")
     def health():
         return jsonify({"ok": True})
 
-    # Scheduler (gecikme kontrol)
-    from app.tasks.scheduler import start_scheduler
-    start_scheduler(app)
+    # Scheduler (gecikme kontrol): sadece tek process modunda; web process'leri job çalıştırmaz
+    if role == "all":
+        from app.tasks.scheduler import start_scheduler
+        start_scheduler(app)
 
     return app
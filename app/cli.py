@@ -0,0 +1,49 @@
+# app/cli.py
+"""Flask CLI komutları (flask --app app <komut>)."""
+import click
+
+
+def register_cli(app):
+    @app.cli.command("worker")
+    def worker_command():
+        """Scheduler ve background job'ları çalıştırır."""
+        if app.config.get("APP_ROLE") != "worker":
+            # "all" rolünde process içi scheduler zaten açık; web pool'u ile ikinci scheduler olmasın
+            raise click.UsageError("APP_ROLE=worker ile çalıştırın: APP_ROLE=worker flask --app app worker")
+        from app.worker import run_worker
+        run_worker(app)
+
+    @app.cli.command("reconcile-counters")
+    @click.option("--fix", is_flag=True, help="Gerçek değerleri library_counters'a yaz.")
+    def reconcile_counters_command(fix: bool):
+        """library_counters'ı taban tablolardan yeniden hesaplar, kaymayı raporlar."""
+        from app.tasks.reconcile_counters import run_counter_reconcile
+        report = run_counter_reconcile(app, fix=fix)
+        for name, r in report.items():
+            click.echo(f"{name:24} stored={r['stored']:<14} actual={r['actual']:<14} drift={r['drift']}")
+        if fix:
+            click.echo("Sayaçlar güncellendi.")
+
+    @app.cli.command("rebuild-leaderboards")
+    @click.option("--days", type=int, default=None, help="Kaç gün geriye (varsayılan LEADERBOARD_RETENTION_DAYS).")
+    def rebuild_leaderboards_command(days: int | None):
+        """Leaderboard bucket'larını borrows'tan yeniden üretir."""
+        from app.tasks.leaderboards import run_leaderboard_rebuild
+        for board, n in run_leaderboard_rebuild(app, days).items():
+            click.echo(f"{board:16} {n} bucket")
+
+    @app.cli.command("rebuild-search-index")
+    @click.option("--batch-size", type=int, default=1000)
+    def rebuild_search_index_command(batch_size: int):
+        """Katalog arama index'ini (search_terms / search_postings) books'tan yeniden üretir."""
+        from app.tasks.search_index import run_search_index_rebuild
+        stats = run_search_index_rebuild(app, batch_size)
+        click.echo(f"{stats['books']} kitap, {stats['postings']} posting, {stats['terms']} terim")
+
+    @app.cli.command("build-catalog-snapshot")
+    @click.option("--path", default=None, help="Varsayılan CATALOG_SNAPSHOT_PATH.")
+    def build_catalog_snapshot_command(path: str | None):
+        """Katalog mmap snapshot'ını books'tan yazar (sürüm aynı olsa da)."""
+        from app.tasks.catalog_snapshot import build_catalog_snapshot
+        stats = build_catalog_snapshot(app, path, force=True)
+        click.echo(f"{stats['books']} kitap, books sürümü {stats['books_version']} ({stats['seconds']}s)")
@@ -13,6 +13,20 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {"pool_pre_ping": True}
 
+    # Process rolü (create_app):
+    # - all: web + process içi scheduler (tek process / geliştirme, varsayılan)
+    # - web: sadece request'ler; scheduler / job modülleri yüklenmez
+    # - worker: sadece scheduler + job'lar (python -m app.worker), kendi pool ayarlarıyla
+    APP_ROLE = os.getenv("APP_ROLE", "all")
+
+    # Worker'ın engine'i: aynı anda en fazla birkaç job + heartbeat DB kullanır
+    WORKER_SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_pre_ping": True,
+        "pool_size": int(os.getenv("WORKER_POOL_SIZE", "3")),
+        "max_overflow": int(os.getenv("WORKER_MAX_OVERFLOW", "2")),
+        "pool_recycle": int(os.getenv("WORKER_POOL_RECYCLE", "1800")),
+    }
+
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "jwt-super-secret")
 
     # ✅ SESSION COOKIE AYARLARI (EKLE)
@@ -28,3 +42,97 @@ class Config:
     MAIL_USERNAME = os.getenv("MAIL_USERNAME", "")
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER", "noreply@library.local")
+
+    # Late check: tek transaction'da işlenecek borrow sayısı (chunk başına commit + checkpoint)
+    LATE_CHECK_CHUNK_SIZE = int(os.getenv("LATE_CHECK_CHUNK_SIZE", "500"))
+    # Late check paralelliği: user_id aralığına göre partition sayısı, bunları işleyen thread sayısı
+    # (WORKER_POOL_SIZE + WORKER_MAX_OVERFLOW en az LATE_CHECK_WORKERS + 2 olmalı)
+    LATE_CHECK_PARTITIONS = int(os.getenv("LATE_CHECK_PARTITIONS", "1"))
+    LATE_CHECK_WORKERS = int(os.getenv("LATE_CHECK_WORKERS", "1"))
+    LATE_CHECK_PARTITION_LEASE_SECONDS = int(os.getenv("LATE_CHECK_PARTITION_LEASE_SECONDS", "300"))
+    # bu kadar denemede (hata / lease dolması) bitmeyen partition failed olur; koşu onu beklemeden biter
+    LATE_CHECK_PARTITION_MAX_ATTEMPTS = int(os.getenv("LATE_CHECK_PARTITION_MAX_ATTEMPTS", "3"))
+    # Late check artımlı çalışır; bu aralıkla (saat) tam tarama yapılır (penalty gün artışı, tekrar hatırlatma).
+    # 0: her koşu tam tarama
+    LATE_CHECK_FULL_PASS_HOURS = int(os.getenv("LATE_CHECK_FULL_PASS_HOURS", "24"))
+    # Late check bir sonraki vade / due_soon sınırında tek seferlik tetiklenir; bu aralık emniyet ağıdır
+    LATE_CHECK_SAFETY_MINUTES = int(os.getenv("LATE_CHECK_SAFETY_MINUTES", "60"))
+    LATE_CHECK_MIN_DELAY_SECONDS = int(os.getenv("LATE_CHECK_MIN_DELAY_SECONDS", "5"))
+
+    # Mail outbox / delivery worker
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", "100"))
+    MAIL_OUTBOX_POLL_SECONDS = int(os.getenv("MAIL_OUTBOX_POLL_SECONDS", "30"))
+    MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+    MAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv("MAIL_OUTBOX_BACKOFF_SECONDS", "60"))
+    MAIL_OUTBOX_LEASE_SECONDS = int(os.getenv("MAIL_OUTBOX_LEASE_SECONDS", "300"))
+
+    # SMTP bağlantı havuzu: paralel oturum sayısı ve oturum başına en fazla mail
+    MAIL_POOL_CONNECTIONS = int(os.getenv("MAIL_POOL_CONNECTIONS", "4"))
+    MAIL_MAX_PER_CONNECTION = int(os.getenv("MAIL_MAX_PER_CONNECTION", "50"))
+
+    # SMTP dayanıklılık: socket timeout, circuit breaker, koşu başına gönderim süresi bütçesi
+    MAIL_TIMEOUT = int(os.getenv("MAIL_TIMEOUT", "10"))
+    MAIL_BREAKER_FAILURES = int(os.getenv("MAIL_BREAKER_FAILURES", "5"))
+    MAIL_BREAKER_RESET_SECONDS = int(os.getenv("MAIL_BREAKER_RESET_SECONDS", "60"))
+    MAIL_SEND_BUDGET_SECONDS = int(os.getenv("MAIL_SEND_BUDGET_SECONDS", "120"))
+
+    # Aynı borrow için aynı tip bildirimin tekrar gönderilme aralığı (saat)
+    NOTIFY_OVERDUE_REPEAT_HOURS = int(os.getenv("NOTIFY_OVERDUE_REPEAT_HOURS", "24"))
+    NOTIFY_DUE_SOON_REPEAT_HOURS = int(os.getenv("NOTIFY_DUE_SOON_REPEAT_HOURS", "24"))
+
+    # 1: late_check kullanıcı başına tek özet mail atar (geciken + yaklaşan tüm kitaplar)
+    NOTIFY_DIGEST = os.getenv("NOTIFY_DIGEST", "0") == "1"
+
+    # Scheduler DB lease: sahip bu süre heartbeat atmazsa lease başka process'e geçer
+    SCHEDULER_LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "60"))
+    SCHEDULER_LEASE_HEARTBEAT_SECONDS = int(os.getenv("SCHEDULER_LEASE_HEARTBEAT_SECONDS", "15"))
+
+    # Admin dashboard sayıları: bu süre cache'ten, sonra MAX_STALE'e kadar eski değer + arka planda yenileme
+    ADMIN_STATS_TTL_SECONDS = int(os.getenv("ADMIN_STATS_TTL_SECONDS", "30"))
+    ADMIN_STATS_MAX_STALE_SECONDS = int(os.getenv("ADMIN_STATS_MAX_STALE_SECONDS", "300"))
+
+    # Günlük rollup (daily_stats): her gün 00:MM UTC'de önceki günler; ilk koşuda en fazla bu kadar gün geriye
+    DAILY_STATS_RUN_MINUTE = int(os.getenv("DAILY_STATS_RUN_MINUTE", "15"))
+    DAILY_STATS_BACKFILL_DAYS = int(os.getenv("DAILY_STATS_BACKFILL_DAYS", "365"))
+    # /admin/trends tek istekte en fazla bu kadar gün döner
+    TRENDS_MAX_DAYS = int(os.getenv("TRENDS_MAX_DAYS", "731"))
+
+    # Leaderboard'lar: bellekte tutulan ilk K, yenileme aralığı, bucket saklama süresi (gün)
+    LEADERBOARD_TOP_K = int(os.getenv("LEADERBOARD_TOP_K", "10"))
+    LEADERBOARD_TTL_SECONDS = int(os.getenv("LEADERBOARD_TTL_SECONDS", "60"))
+    LEADERBOARD_RETENTION_DAYS = int(os.getenv("LEADERBOARD_RETENTION_DAYS", "35"))
+
+    # Katalog araması: sorgunun son kelimesi için en fazla kaç önek genişlemesi, sayfalanabilecek sonuç sınırı
+    SEARCH_PREFIX_EXPANSIONS = int(os.getenv("SEARCH_PREFIX_EXPANSIONS", "20"))
+    SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+    # sorgu token'larının toplam posting'i bunun altındaysa tam BM25 (SQL), üstündeyse token başına
+    # impact sıralı SEARCH_CANDIDATES aday yeniden puanlanır
+    SEARCH_EXACT_MAX_POSTINGS = int(os.getenv("SEARCH_EXACT_MAX_POSTINGS", "5000"))
+    SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "1000"))
+
+    # Autocomplete (/books/suggest): process içi önek index'i; catalog_version bu aralıkla kontrol edilir,
+    # başka process yazdıysa index arka planda baştan kurulur. MAX_SCAN: istek başına incelenen en fazla id
+    SUGGEST_WARM_ON_START = os.getenv("SUGGEST_WARM_ON_START", "1") == "1"
+    SUGGEST_SYNC_SECONDS = int(os.getenv("SUGGEST_SYNC_SECONDS", "60"))
+    SUGGEST_MAX_SCAN = int(os.getenv("SUGGEST_MAX_SCAN", "5000"))
+    SUGGEST_BUILD_BATCH_SIZE = int(os.getenv("SUGGEST_BUILD_BATCH_SIZE", "5000"))
+
+    # Facet'ler (/books/facets): yazar / müsaitlik bucket'ları bu süre cache'ten; yazımlar process içinde
+    # invalidate eder, diğer process'ler en geç TTL sonunda görür. AUTHOR_LIMIT: cache'te tutulan yazar sayısı
+    FACETS_TTL_SECONDS = int(os.getenv("FACETS_TTL_SECONDS", "60"))
+    FACETS_MAX_STALE_SECONDS = int(os.getenv("FACETS_MAX_STALE_SECONDS", "300"))
+    FACETS_AUTHOR_LIMIT = int(os.getenv("FACETS_AUTHOR_LIMIT", "100"))
+
+    # Katalog cache'i (BookRepo): tek kitap LRU + liste sayfaları; yazımlar process içinde invalidate eder,
+    # diğer process'lerin yazımları en geç TTL sonunda görünür
+    CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "10000"))
+    CATALOG_PAGE_CACHE_SIZE = int(os.getenv("CATALOG_PAGE_CACHE_SIZE", "256"))
+    CATALOG_CACHE_TTL_SECONDS = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+
+    # Paylaşılan katalog snapshot'ı: dosya yolu verilirse (ör. /dev/shm/library-catalog.bks) web process'leri
+    # kitapları mmap'ten okur; makine başına tek builder books sürümünü POLL aralığıyla kontrol edip yeniden
+    # yazar. Boş: kapalı. MAX_SCAN: filtreli sayfada taranacak en fazla satır (aşılırsa DB)
+    CATALOG_SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "")
+    CATALOG_SNAPSHOT_POLL_SECONDS = int(os.getenv("CATALOG_SNAPSHOT_POLL_SECONDS", "30"))
+    CATALOG_SNAPSHOT_MAX_SCAN = int(os.getenv("CATALOG_SNAPSHOT_MAX_SCAN", "10000"))
+    CATALOG_SNAPSHOT_BATCH_SIZE = int(os.getenv("CATALOG_SNAPSHOT_BATCH_SIZE", "10000"))
@@ -1,47 +1,103 @@
 # app/controllers/book_controller.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy import case
+from app.models.book import Book
 from app.services.book_service import BookService
-from app.utils.decorators import role_required
+from app.services.facet_service import FacetService
+from app.services.search_service import SearchService
+from app.services.suggest_service import SuggestService
+from app.utils.decorators import role_required, conditional_get
+from app.utils.pagination import parse_page_args, parse_fields, parse_bool_arg
 
 book_bp = Blueprint("books", __name__, url_prefix="/books")
 
+# ?fields= ile seçilebilecek alanlar: (kolon, formatter)
+BOOK_FIELDS = {
+    "id": (Book.id, None),
+    "title": (Book.title, None),
+    "author": (Book.author, None),
+    "isbn": (Book.isbn, None),
+    "total_copies": (Book.total_copies, None),
+    "available_copies": (Book.available_copies, None),
+    "available": (case((Book.available_copies > 0, 1), else_=0), bool),
+}
+
 
 @book_bp.get("/")
+@conditional_get(BookService.list_tag)
 def list_books():
-    books = BookService.list_books()
-    return jsonify({
-        "success": True,
-        "data": [
-            {
-                "id": b.id,
-                "title": b.title,
-                "author": b.author,
-                "isbn": getattr(b, "isbn", None),
-                "total_copies": getattr(b, "total_copies", None),
-                "available_copies": getattr(b, "available_copies", None),
-                "available": getattr(b, "available", None),
-            }
-            for b in books
-        ]
-    })
+    try:
+        # ?author=...&available=1 : facet filtreleri
+        cursor, limit = parse_page_args()
+        fields = parse_fields(BOOK_FIELDS)
+        available = parse_bool_arg("available")
+        data, next_cursor = BookService.list_books_page(
+            BOOK_FIELDS, fields, cursor, limit, request.args.get("author"), available
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
+
+
+@book_bp.get("/facets")
+def book_facets():
+    # ?limit= : en çok kitabı olan yazarlar + müsait / değil sayıları; cache'ten
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), current_app.config.get("FACETS_AUTHOR_LIMIT", 100)))
+    except ValueError:
+        return jsonify({"success": False, "message": "Geçersiz limit"}), 400
+
+    data, age = FacetService.facets(limit)
+    return jsonify({"success": True, "data": data, "snapshot_age_seconds": round(age, 1)})
+
+
+@book_bp.get("/search")
+def search_books():
+    # ?q=...&limit=&cursor= : BM25 sıralı; Türkçe harf / aksan duyarsız
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"success": False, "message": "q zorunlu"}), 400
+    try:
+        cursor, limit = parse_page_args(default_limit=20, max_limit=100)
+        data, next_cursor = SearchService.search(q, cursor, limit)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
+
+
+@book_bp.get("/suggest")
+def suggest_books():
+    # ?prefix=...&limit= : başlık / yazar kelime öneki; bellekteki index'ten, DB'ye gitmez
+    prefix = (request.args.get("prefix") or "").strip()
+    if not prefix:
+        return jsonify({"success": False, "message": "prefix zorunlu"}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", 10)), 1), 50)
+    except ValueError:
+        return jsonify({"success": False, "message": "Geçersiz limit"}), 400
+
+    data = SuggestService.suggest(prefix, limit)
+    return jsonify({"success": True, "data": data or [], "ready": data is not None})
 
 
 @book_bp.get("/<int:book_id>")
 def get_book(book_id: int):
     try:
-        b = BookService.get_book(book_id)
+        b = BookService.get_book_data(book_id)
         return jsonify({
             "success": True,
             "data": {
-                "id": b.id,
-                "title": b.title,
-                "author": b.author,
-                "isbn": getattr(b, "isbn", None),
-                "total_copies": getattr(b, "total_copies", None),
-                "available_copies": getattr(b, "available_copies", None),
-                "available": getattr(b, "available", None),
+                "id": b["id"],
+                "title": b["title"],
+                "author": b["author"],
+                "isbn": b.get("isbn"),
+                "total_copies": b.get("total_copies"),
+                "available_copies": b.get("available_copies"),
+                "available": b.get("available"),
             }
         })
     except ValueError as e:
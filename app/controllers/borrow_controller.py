@@ -2,9 +2,23 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.borrow_service import BorrowService
 from app.repositories.borrow_repo import BorrowRepo
+from app.models.borrow import Borrow
+from app.models.book import Book
+from app.models.user import User
+from app.utils.pagination import parse_page_args, parse_fields
 
 borrow_bp = Blueprint("borrow", __name__)
 
+# admin listesi için ?fields= ile seçilebilecek alanlar: (kolon, formatter)
+ADMIN_BORROW_FIELDS = {
+    "id": (Borrow.id, None),
+    "user": (User.username, None),
+    "book": (Book.title, None),
+    "due_date": (Borrow.due_date, str),
+    "returned_at": (Borrow.returned_at, str),
+    "status": (Borrow.status, None),
+}
+
 @borrow_bp.post("/")
 @jwt_required()
 def borrow_book():
@@ -53,14 +67,11 @@ def all_borrows_admin_only():
     if role != "admin":
         return jsonify({"success": False, "message": "Yetkisiz"}), 403
 
-    borrows = BorrowRepo.list_all()
-    return jsonify({"success": True, "data": [
-        {
-            "id": x.id,
-            "user": x.user.username if x.user else None,
-            "book": x.book.title if x.book else None,
-            "due_date": str(x.due_date),
-            "returned_at": str(x.returned_at) if x.returned_at else None,
-            "status": x.status
-        } for x in borrows
-    ]})
+    try:
+        cursor, limit = parse_page_args()
+        fields = parse_fields(ADMIN_BORROW_FIELDS)
+        data, next_cursor = BorrowRepo.list_page(ADMIN_BORROW_FIELDS, fields, cursor, limit)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
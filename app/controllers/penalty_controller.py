@@ -1,13 +1,31 @@
 # app/controllers/penalty_controller.py
 
+from datetime import datetime
+
 from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 
 from app.models.penalty import Penalty
 from app.models.borrow import Borrow
+from app.repositories.counter_repo import CounterRepo
+from app.repositories.penalty_repo import PenaltyRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, LOANS
+from app.utils.pagination import parse_page_args, parse_fields
 
 penalty_bp = Blueprint("penalties", __name__, url_prefix="/penalties")
 
+# ?fields= ile seçilebilecek alanlar: (kolon, formatter)
+PENALTY_FIELDS = {
+    "id": (Penalty.id, None),
+    "borrow_id": (Penalty.borrow_id, None),
+    "days_overdue": (Penalty.days_overdue, None),
+    "daily_fee": (Penalty.daily_fee, float),
+    "amount": (Penalty.amount, float),
+    "is_paid": (Penalty.is_paid, bool),
+    "created_at": (Penalty.created_at, lambda v: v.isoformat()),
+    "updated_at": (Penalty.updated_at, lambda v: v.isoformat()),
+}
+
 
 def _jwt_user():
     claims = get_jwt()
@@ -55,23 +73,14 @@ def all_penalties():
     if role != "admin":
         return jsonify({"success": False, "message": "Forbidden"}), 403
 
-    rows = Penalty.query.order_by(Penalty.id.desc()).all()
-    return jsonify({
-        "success": True,
-        "data": [
-            {
-                "id": p.id,
-                "borrow_id": p.borrow_id,
-                "days_overdue": p.days_overdue,
-                "daily_fee": float(p.daily_fee),
-                "amount": float(p.amount),
-                "is_paid": bool(p.is_paid),
-                "created_at": p.created_at.isoformat(),
-                "updated_at": p.updated_at.isoformat(),
-            }
-            for p in rows
-        ]
-    })
+    try:
+        cursor, limit = parse_page_args()
+        fields = parse_fields(PENALTY_FIELDS)
+        data, next_cursor = PenaltyRepo.list_page(PENALTY_FIELDS, fields, cursor, limit)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
 
 
 @penalty_bp.post("/pay/<int:penalty_id>")
@@ -93,6 +102,9 @@ def pay_penalty(penalty_id: int):
         return jsonify({"success": False, "message": "Zaten ödendi"}), 400
 
     p.is_paid = True
+    p.paid_at = datetime.utcnow()
+    CounterRepo.add(CounterRepo.unpaid_penalty_delta(p.amount, None))
+    ResourceVersionRepo.bump(LOANS, [Borrow.query.with_entities(Borrow.user_id).filter_by(id=p.borrow_id).scalar()])
     from app.extensions import db
     db.session.commit()
 
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
-from flask import Blueprint, jsonify, request, session
-from sqlalchemy import func, text ,false
+from flask import Blueprint, current_app, jsonify, request, session
+from sqlalchemy import func, text
 from app.extensions import db
 from app.models.penalty import Penalty
 from app.models.notification_log import NotificationLog
@@ -9,7 +9,19 @@ from app.models.book import Book
 from app.models.user import User
 from app.repositories.book_repo import BookRepo
 from app.repositories.borrow_repo import BorrowRepo
-from sqlalchemy.orm import joinedload
+from app.repositories.counter_repo import CounterRepo, OVERDUE_STATUSES
+from app.repositories.daily_stats_repo import DailyStatsRepo
+from app.repositories.penalty_repo import PenaltyRepo
+from app.repositories.notification_repo import NotificationRepo
+from app.repositories.lease_repo import LeaseRepo
+from app.repositories.partition_repo import PartitionRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, BOOKS, LOANS
+from app.services.book_service import BookService
+from app.services.facet_service import FacetService
+from app.services.leaderboard_service import LeaderboardService, WINDOWS
+from app.services.stats_service import StatsService
+from app.utils.decorators import conditional_get
+from app.utils.pagination import parse_page_args, parse_fields, parse_bool_arg
 
 
 web_api_bp = Blueprint("web_api", __name__, url_prefix="/web/api")
@@ -30,22 +42,92 @@ def _json_error(message, code=400):
     return jsonify({"success": False, "message": message}), code
 
 
+def _loans_tag():
+    # oturum yoksa koşulsuz çalışır (handler 401 döner)
+    if not _require_login():
+        return None
+    return ResourceVersionRepo.tag(LOANS, int(session["user_id"]))
+
+
+# ?fields= ile seçilebilecek alanlar: (kolon, formatter)
+BOOK_FIELDS = {
+    "id": (Book.id, None),
+    "title": (Book.title, None),
+    "author": (Book.author, None),
+    "isbn": (Book.isbn, None),
+    "total_copies": (Book.total_copies, None),
+    "available_copies": (Book.available_copies, None),
+}
+
+ADMIN_PENALTY_FIELDS = {
+    "id": (Penalty.id, None),
+    "borrow_id": (Penalty.borrow_id, None),
+    "days_overdue": (Penalty.days_overdue, int),
+    "daily_fee": (Penalty.daily_fee, float),
+    "amount": (Penalty.amount, float),
+    "is_paid": (Penalty.is_paid, bool),
+    "updated_at": (Penalty.updated_at, str),
+    "created_at": (Penalty.created_at, str),
+
+    "due_date": (Borrow.due_date, str),
+    "returned_at": (Borrow.returned_at, str),
+    "status": (Borrow.status, None),
+
+    # ✅ Admin için kritik: kimin cezası
+    "user_id": (Borrow.user_id, int),
+    "username": (User.username, None),
+    "email": (User.email, None),
+
+    "book_id": (Borrow.book_id, int),
+}
+
+MAIL_REPORT_FIELDS = {
+    "id": (NotificationLog.id, None),
+    "borrow_id": (NotificationLog.borrow_id, None),
+    "type": (NotificationLog.type, None),
+
+    # admin UI için:
+    "user": (User.username, None),
+    "email": (func.coalesce(User.email, NotificationLog.email), None),
+    "book": (Book.title, None),
+    "due_date": (Borrow.due_date, str),
+
+    "sent_at": (NotificationLog.sent_at, str),
+    "success": (NotificationLog.success, bool),
+    "error": (NotificationLog.error_message, None),
+    "message": (NotificationLog.message, None),
+}
+
+
 # -----------------------------
 # Books
 # -----------------------------
 @web_api_bp.get("/books")
+@conditional_get(BookService.list_tag)
 def books_list():
-    books = BookRepo.list_all()
-    return jsonify({"success": True, "data": [
-        {
-            "id": b.id,
-            "title": b.title,
-            "author": b.author,
-            "isbn": getattr(b, "isbn", None),
-            "total_copies": getattr(b, "total_copies", 0),
-            "available_copies": getattr(b, "available_copies", 0)
-        } for b in books
-    ]})
+    try:
+        cursor, limit = parse_page_args()
+        fields = parse_fields(BOOK_FIELDS)
+        available = parse_bool_arg("available")
+        data, next_cursor = BookService.list_books_page(
+            BOOK_FIELDS, fields, cursor, limit, request.args.get("author"), available
+        )
+    except ValueError as e:
+        return _json_error(str(e), 400)
+
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
+
+
+@web_api_bp.get("/books/facets")
+def books_facets():
+    # filtre paneli: yazar ve müsaitlik bucket'ları (cache'li gruplu sorgular)
+    try:
+        limit = max(1, min(int(request.args.get("limit", 20)), current_app.config.get("FACETS_AUTHOR_LIMIT", 100)))
+    except ValueError:
+        return _json_error("Geçersiz limit", 400)
+
+    data, age = FacetService.facets(limit)
+    return jsonify({"success": True, "data": data, "snapshot_age_seconds": round(age, 1)})
 
 
 @web_api_bp.post("/books")
@@ -71,15 +153,14 @@ def books_create():
         if avail > total:
             avail = total
 
-        book = Book(
-            title=title,
-            author=author,
-            isbn=(data.get("isbn") or None),
-            total_copies=total,
-            available_copies=avail
-        )
-        db.session.add(book)
-        db.session.commit()
+        # yazım + yan etkiler (sayaç, sürüm, arama / öneri index'i, cache) tek yolda: BookService
+        book = BookService.create_book({
+            "title": title,
+            "author": author,
+            "isbn": data.get("isbn") or None,
+            "total_copies": total,
+            "available_copies": avail,
+        })
         return jsonify({"success": True, "id": book.id}), 201
 
     except Exception as e:
@@ -96,32 +177,25 @@ def books_update(book_id: int):
 
     data = request.get_json() or {}
     try:
-        book = BookRepo.get(book_id)
-        if not book:
+        if not BookRepo.get(book_id):
             return _json_error("Kitap bulunamadı", 404)
 
+        changes = {}
         if "title" in data and data["title"] is not None:
-            book.title = str(data["title"]).strip()
+            changes["title"] = str(data["title"]).strip()
         if "author" in data and data["author"] is not None:
-            book.author = str(data["author"]).strip()
+            changes["author"] = str(data["author"]).strip()
         if "isbn" in data:
             isbn = (data.get("isbn") or "").strip()
-            book.isbn = isbn if isbn else None
+            changes["isbn"] = isbn if isbn else None
 
+        # tutarlılık (available > total kırpması service'te)
         if "total_copies" in data and data["total_copies"] is not None:
-            book.total_copies = int(data["total_copies"])
+            changes["total_copies"] = max(int(data["total_copies"]), 1)
         if "available_copies" in data and data["available_copies"] is not None:
-            book.available_copies = int(data["available_copies"])
-
-        # tutarlılık
-        if book.total_copies < 1:
-            book.total_copies = 1
-        if book.available_copies < 0:
-            book.available_copies = 0
-        if book.available_copies > book.total_copies:
-            book.available_copies = book.total_copies
+            changes["available_copies"] = max(int(data["available_copies"]), 0)
 
-        BookRepo.update()
+        book = BookService.update_book(book_id, changes)
         return jsonify({"success": True, "data": {"id": book.id}})
 
     except Exception as e:
@@ -148,7 +222,7 @@ def books_delete(book_id: int):
         if active_count > 0:
             return _json_error("Bu kitap aktif ödünçte. Önce iadeler tamamlanmalı.", 400)
 
-        BookRepo.delete(book)
+        BookService.delete_book(book_id)
         return jsonify({"success": True})
 
     except Exception as e:
@@ -180,7 +254,15 @@ def borrow_create():
             {"uid": uid, "bid": bid, "days": days}
         ).fetchone()
 
+        # SP hata fırlatmadıysa ödünç açıldı; sayaç aynı transaction'da
+        CounterRepo.add({"active_borrows": 1})
+        LeaderboardService.record_borrow(bid)
+        ResourceVersionRepo.bump(BOOKS)
+        ResourceVersionRepo.bump(LOANS, [uid])
         db.session.commit()
+        # SP stok değişimini dönmüyor: 0 sınırı geçildi mi bilinmediği için her seferinde
+        FacetService.availability_changed()
+        BookRepo.invalidate(bid)
 
         return jsonify({
             "success": True,
@@ -194,6 +276,7 @@ def borrow_create():
 
 
 @web_api_bp.get("/borrow/my")
+@conditional_get(_loans_tag)
 def borrow_my():
     if not _require_login():
         return _json_error("Unauthorized", 401)
@@ -222,6 +305,11 @@ def borrow_return(borrow_id: int):
     uid = int(session["user_id"])
 
     try:
+        # SP öncesi durum: sayaçlar için (açık mı, gecikmiş mi)
+        prev = db.session.query(Borrow.status, Borrow.returned_at, Borrow.book_id).filter(
+            Borrow.id == int(borrow_id), Borrow.user_id == uid
+        ).first()
+
         # 1) iade işlemi (SP)
         row = db.session.execute(
             text("""
@@ -232,7 +320,17 @@ def borrow_return(borrow_id: int):
             {"bid": int(borrow_id), "uid": uid}
         ).fetchone()
 
+        if prev and prev.returned_at is None:
+            CounterRepo.add({
+                "active_borrows": -1,
+                "overdue_borrows": -1 if prev.status in OVERDUE_STATUSES else 0,
+            })
+        ResourceVersionRepo.bump(BOOKS)
+        ResourceVersionRepo.bump(LOANS, [uid])
         db.session.commit()
+        FacetService.availability_changed()
+        if prev:
+            BookRepo.invalidate(prev.book_id)
 
         returned_at = getattr(row, "returned_at", None) if row else None
 
@@ -246,6 +344,7 @@ def borrow_return(borrow_id: int):
                 amount = days_overdue * DAILY_FEE
 
                 p = Penalty.query.filter_by(borrow_id=b.id).first()
+                before = p.amount if p and not p.is_paid else None
                 if not p:
                     p = Penalty(
                         borrow_id=b.id,
@@ -261,6 +360,9 @@ def borrow_return(borrow_id: int):
                         p.daily_fee = DAILY_FEE
                         p.amount = amount
 
+                after = p.amount if not p.is_paid else None
+                CounterRepo.add(CounterRepo.unpaid_penalty_delta(before, after))
+                ResourceVersionRepo.bump(LOANS, [uid])
                 db.session.commit()
 
         return jsonify({"success": True, "returned_at": str(returned_at) if returned_at else None})
@@ -280,23 +382,25 @@ def admin_stats():
     if session.get("role") != "admin":
         return _json_error("Yetkisiz", 403)
 
-    total_books = Book.query.count()
-    total_copies = (Book.query.with_entities(func.coalesce(func.sum(Book.total_copies), 0)).scalar() or 0)
-
-    active_borrows = Borrow.query.filter(Borrow.returned_at.is_(None)).count()
-    overdue_borrows = Borrow.query.filter(Borrow.returned_at.is_(None), Borrow.due_date < datetime.utcnow()).count()
-
+    # library_counters (tablo taraması yok) + kısa TTL'li snapshot (stale-while-revalidate)
+    data, age = StatsService.admin_stats()
     return jsonify({
         "success": True,
-        "data": {
-            "total_books": int(total_books),
-            "total_copies": int(total_copies),
-            "active_borrows": int(active_borrows),
-            "overdue_borrows": int(overdue_borrows),
-        }
+        "data": {k: v for k, v in data.items() if k != "generated_at"},
+        "generated_at": data["generated_at"],
+        "snapshot_age_seconds": round(age, 1),
     })
 
 
+@web_api_bp.get("/admin/cache")
+def admin_cache():
+    if not _require_admin():
+        return _json_error("Yetkisiz", 403)
+
+    # process içi katalog cache'i: hit / miss / eviction / invalidation (bu process'in sayıları)
+    return jsonify({"success": True, "data": BookRepo.cache_stats()})
+
+
 @web_api_bp.get("/admin/overdue")
 def admin_overdue_list():
     if not _require_login():
@@ -304,7 +408,7 @@ def admin_overdue_list():
     if session.get("role") != "admin":
         return _json_error("Yetkisiz", 403)
 
-    rows = Borrow.query.filter(Borrow.returned_at.is_(None), Borrow.due_date < datetime.utcnow()).all()
+    rows = BorrowRepo.find_overdue(datetime.utcnow())
     return jsonify({"success": True, "data": [
         {
             "id": b.id,
@@ -326,17 +430,10 @@ def admin_notifications():
 
     now = datetime.utcnow()
 
-    overdue_rows = Borrow.query.filter(
-        Borrow.returned_at.is_(None),
-        Borrow.due_date < now
-    ).order_by(Borrow.due_date.asc()).limit(20).all()
+    overdue_rows = BorrowRepo.find_overdue(now, limit=20)
 
     soon_limit = now + timedelta(days=2)
-    due_soon_rows = Borrow.query.filter(
-        Borrow.returned_at.is_(None),
-        Borrow.due_date >= now,
-        Borrow.due_date <= soon_limit
-    ).order_by(Borrow.due_date.asc()).limit(20).all()
+    due_soon_rows = BorrowRepo.find_due_between(now, soon_limit, limit=20)
 
     notifications = []
 
@@ -381,47 +478,22 @@ def admin_penalties():
 
     only_unpaid = request.args.get("only_unpaid", "0") == "1"
 
-    q = (
-        db.session.query(Penalty, Borrow, User)
-        .join(Borrow, Borrow.id == Penalty.borrow_id)
-        .join(User, User.id == Borrow.user_id)
-    )
-
-    if only_unpaid:
-        q = q.filter(Penalty.is_paid == false())  # MSSQL uyumlu
-
-    rows = q.order_by(Penalty.updated_at.desc()).limit(200).all()
-
-    data = []
-    for p, b, u in rows:
-        data.append({
-            "id": p.id,
-            "borrow_id": p.borrow_id,
-            "days_overdue": int(p.days_overdue),
-            "daily_fee": float(p.daily_fee),
-            "amount": float(p.amount),
-            "is_paid": bool(p.is_paid),
-            "updated_at": str(p.updated_at),
-            "created_at": str(p.created_at),
-
-            "due_date": str(b.due_date) if b and b.due_date else None,
-            "returned_at": str(b.returned_at) if b and b.returned_at else None,
-            "status": getattr(b, "status", None),
-
-            # ✅ Admin için kritik: kimin cezası
-            "user_id": int(u.id) if u else (int(b.user_id) if b else None),
-            "username": getattr(u, "username", None) if u else None,
-            "email": getattr(u, "email", None) if u else None,
-
-            "book_id": int(b.book_id) if b else None,
-        })
+    try:
+        cursor, limit = parse_page_args(default_limit=200)
+        fields = parse_fields(ADMIN_PENALTY_FIELDS)
+        data, next_cursor = PenaltyRepo.admin_page(
+            ADMIN_PENALTY_FIELDS, fields, cursor, limit, only_unpaid=only_unpaid
+        )
+    except ValueError as e:
+        return _json_error(str(e), 400)
 
-    return jsonify({"success": True, "data": data})
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
 
 # -----------------------------
 # User penalties (session based)  ✅
 # -----------------------------
 @web_api_bp.get("/penalties/my")
+@conditional_get(_loans_tag)
 def penalties_my():
     if not _require_login():
         return _json_error("Unauthorized", 401)
@@ -479,7 +551,9 @@ def penalties_pay(penalty_id: int):
         return jsonify({"success": True, "message": "Bu ceza zaten ödenmiş", "data": {"id": p.id, "is_paid": True}}), 200
 
     p.is_paid = True
-    p.updated_at = datetime.utcnow()
+    p.updated_at = p.paid_at = datetime.utcnow()
+    CounterRepo.add(CounterRepo.unpaid_penalty_delta(p.amount, None))
+    ResourceVersionRepo.bump(LOANS, [uid])
     db.session.commit()
 
     return jsonify({"success": True, "message": "Ödeme alındı", "data": {"id": p.id, "is_paid": True}}), 200
@@ -512,46 +586,95 @@ def admin_mail_report():
     if session.get("role") != "admin":
         return _json_error("Yetkisiz", 403)
 
-    # limit güvenli aralık
+    # limit güvenli aralık (1..500, varsayılan 200)
     try:
-        limit = int(request.args.get("limit", "200"))
-    except Exception:
-        limit = 200
-    limit = max(1, min(limit, 500))
+        cursor, limit = parse_page_args(default_limit=200)
+        fields = parse_fields(MAIL_REPORT_FIELDS)
+        data, next_cursor = NotificationRepo.report_page(MAIL_REPORT_FIELDS, fields, cursor, limit)
+    except ValueError as e:
+        return _json_error(str(e), 400)
 
-    # NotificationLog -> Borrow -> User/Book (eager load)
-    rows = (
-        NotificationLog.query
-        .options(
-            joinedload(NotificationLog.borrow).joinedload(Borrow.user),
-            joinedload(NotificationLog.borrow).joinedload(Borrow.book),
+    return jsonify({"success": True, "data": data, "next_cursor": next_cursor})
+
+
+@web_api_bp.get("/admin/scheduler")
+def admin_scheduler_status():
+    if not _require_login():
+        return _json_error("Unauthorized", 401)
+    if session.get("role") != "admin":
+        return _json_error("Yetkisiz", 403)
+
+    # her job için: şu anki lease sahibi (leader) + son koşu süresi
+    return jsonify({"success": True, "data": LeaseRepo.status(datetime.utcnow())})
+
+
+@web_api_bp.get("/admin/late-check/partitions")
+def admin_late_check_partitions():
+    if not _require_login():
+        return _json_error("Unauthorized", 401)
+    if session.get("role") != "admin":
+        return _json_error("Yetkisiz", 403)
+
+    # son / devam eden late check koşusunun partition bazında ilerleme ve süreleri
+    from app.tasks.late_check import JOB_NAME, DIGEST_JOB_NAME
+    job_name = DIGEST_JOB_NAME if current_app.config.get("NOTIFY_DIGEST") else JOB_NAME
+    return jsonify({"success": True, "job": job_name, "data": PartitionRepo.status(job_name)})
+
+
+@web_api_bp.get("/admin/trends")
+def admin_trends():
+    if not _require_login():
+        return _json_error("Unauthorized", 401)
+    if session.get("role") != "admin":
+        return _json_error("Yetkisiz", 403)
+
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD (varsayılan: son 30 gün); sadece daily_stats okunur
+    try:
+        today = datetime.utcnow().date()
+        day_to = datetime.strptime(request.args["to"], "%Y-%m-%d").date() if request.args.get("to") else today
+        day_from = (
+            datetime.strptime(request.args["from"], "%Y-%m-%d").date() if request.args.get("from")
+            else day_to - timedelta(days=29)
         )
-        .order_by(NotificationLog.sent_at.desc())
-        .limit(limit)
-        .all()
-    )
+    except ValueError:
+        return _json_error("from / to YYYY-MM-DD olmalı", 400)
 
-    data = []
-    for n in rows:
-        b = n.borrow
-        u = getattr(b, "user", None) if b else None
-        bk = getattr(b, "book", None) if b else None
+    if day_from > day_to:
+        return _json_error("from, to'dan sonra olamaz", 400)
+    max_days = current_app.config.get("TRENDS_MAX_DAYS", 731)
+    if (day_to - day_from).days + 1 > max_days:
+        return _json_error(f"En fazla {max_days} gün istenebilir", 400)
 
-        data.append({
-            "id": n.id,
-            "borrow_id": n.borrow_id,
-            "type": n.type,
-
-            # admin UI için:
-            "user": getattr(u, "username", None) if u else None,
-            "email": getattr(u, "email", None) if u else (n.email or None),
-            "book": getattr(bk, "title", None) if bk else None,
-            "due_date": str(getattr(b, "due_date", None)) if b and getattr(b, "due_date", None) else None,
-
-            "sent_at": str(n.sent_at) if n.sent_at else None,
-            "success": bool(n.success),
-            "error": n.error_message,
-            "message": n.message,
-        })
+    return jsonify({
+        "success": True,
+        "from": day_from.isoformat(),
+        "to": day_to.isoformat(),
+        "data": DailyStatsRepo.range(day_from, day_to),
+    })
 
-    return jsonify({"success": True, "data": data})
\ No newline at end of file
+
+@web_api_bp.get("/admin/leaderboards")
+def admin_leaderboards():
+    if not _require_login():
+        return _json_error("Unauthorized", 401)
+    if session.get("role") != "admin":
+        return _json_error("Yetkisiz", 403)
+
+    # ?window=day|week|month (varsayılan month); bellekteki top-K'dan döner
+    window = request.args.get("window", "month")
+    if window not in WINDOWS:
+        return _json_error(f"window: {', '.join(WINDOWS)}", 400)
+    try:
+        k = int(request.args.get("k", current_app.config.get("LEADERBOARD_TOP_K", 10)))
+    except ValueError:
+        return _json_error("k sayı olmalı", 400)
+    k = max(1, k)
+
+    books, books_age = LeaderboardService.top("books_borrowed", window)
+    users, users_age = LeaderboardService.top("users_overdue", window)
+    return jsonify({
+        "success": True,
+        "window": window,
+        "data": {"books_borrowed": books[:k], "users_overdue": users[:k]},
+        "snapshot_age_seconds": round(max(books_age, users_age), 1),
+    })
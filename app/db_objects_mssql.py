@@ -272,6 +272,9 @@ END
 
 def ensure_db_objects_mssql(app):
     with app.app_context():
+        # trigger / SP'ler T-SQL; başka dialect'te (ör. testlerde SQLite) atlanır
+        if db.engine.dialect.name != "mssql":
+            return
         conn = db.engine.connect()
         trans = conn.begin()
         try:
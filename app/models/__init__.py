@@ -2,6 +2,18 @@ from app.models.user import User
 from app.models.book import Book
 from app.models.borrow import Borrow
 from app.models.notification_log import NotificationLog
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.job_partition import JobPartition
+from app.models.mail_outbox import MailOutbox
+from app.models.mail_outbox_item import MailOutboxItem
+from app.models.notification_state import NotificationState
+from app.models.scheduler_lease import SchedulerLease
+from app.models.library_counter import LibraryCounter
+from app.models.daily_stat import DailyStat
+from app.models.leaderboard_bucket import LeaderboardBucket
+from app.models.search_term import SearchTerm
+from app.models.search_posting import SearchPosting
+from app.models.resource_version import ResourceVersion
 
 
 def notification():
@@ -17,3 +17,35 @@ class Borrow(db.Model):
 
     user = db.relationship("User", backref="borrows")
     book = db.relationship("Book", backref="borrows")
+
+    # Açık ödünçler (returned_at IS NULL) için filtreli indexler: late check, admin stats/overdue
+    # tüm tabloyu değil sadece açık ödünçleri tarar. MSSQL: filtered index, PG/SQLite: partial index.
+    __table_args__ = (
+        db.Index(
+            "ix_borrows_open_due_date", "due_date",
+            mssql_where=db.text("returned_at IS NULL"), mssql_include=["user_id", "book_id"],
+            postgresql_where=db.text("returned_at IS NULL"),
+            sqlite_where=db.text("returned_at IS NULL"),
+        ),
+        db.Index(
+            "ix_borrows_open_user_due_date", "user_id", "due_date",
+            mssql_where=db.text("returned_at IS NULL"),
+            postgresql_where=db.text("returned_at IS NULL"),
+            sqlite_where=db.text("returned_at IS NULL"),
+        ),
+        # günlük rollup: gün aralığında başlayan / iade edilen ödünçler; iade edilmişlerin vade günü
+        # (ix_borrows_open_due_date ile birlikte tüm ödünçler due_date aralığıyla okunabilir)
+        db.Index("ix_borrows_borrowed_at", "borrowed_at"),
+        db.Index(
+            "ix_borrows_returned_due_date", "due_date",
+            mssql_where=db.text("returned_at IS NOT NULL"),
+            postgresql_where=db.text("returned_at IS NOT NULL"),
+            sqlite_where=db.text("returned_at IS NOT NULL"),
+        ),
+        db.Index(
+            "ix_borrows_returned_at", "returned_at",
+            mssql_where=db.text("returned_at IS NOT NULL"),
+            postgresql_where=db.text("returned_at IS NOT NULL"),
+            sqlite_where=db.text("returned_at IS NOT NULL"),
+        ),
+    )
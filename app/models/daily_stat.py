@@ -0,0 +1,25 @@
+from datetime import datetime
+from app.extensions import db
+
+class DailyStat(db.Model):
+    """
+    Günlük rollup (UTC gün). Trend grafikleri olay tablolarını değil bu tabloyu okur.
+    Satırlar daily_stats job'ı tarafından tamamlanmış günler için bir kez yazılır.
+    """
+    __tablename__ = "daily_stats"
+
+    day = db.Column(db.Date, primary_key=True)
+
+    borrows_started = db.Column(db.Integer, nullable=False, default=0)
+    borrows_returned = db.Column(db.Integer, nullable=False, default=0)
+    # gün başında açık ve vadesi geçmiş ödünçler (o gün ceza günü işleyenler)
+    overdue_open = db.Column(db.Integer, nullable=False, default=0)
+
+    penalty_amount_accrued = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    penalties_paid = db.Column(db.Integer, nullable=False, default=0)
+    penalty_amount_paid = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    mails_sent = db.Column(db.Integer, nullable=False, default=0)
+    mails_failed = db.Column(db.Integer, nullable=False, default=0)
+
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,19 @@
+from datetime import datetime
+from app.extensions import db
+
+class JobCheckpoint(db.Model):
+    __tablename__ = "job_checkpoints"
+
+    # ör. "late_check"
+    job_name = db.Column(db.String(100), primary_key=True)
+
+    # devam eden koşunun referans zamanı; yarım kalan koşu aynı "now" ile sürdürülür
+    run_started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # artımlı koşunun alt sınırı (önceki koşunun run_started_at'i); None = tam tarama
+    watermark = db.Column(db.DateTime, nullable=True)
+    # son biten tam taramanın run_started_at'i
+    last_full_at = db.Column(db.DateTime, nullable=True)
+
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
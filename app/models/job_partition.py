@@ -0,0 +1,32 @@
+from app.extensions import db
+
+class JobPartition(db.Model):
+    """
+    Bir job koşusunun iş parçası (user_id aralığı). Worker'lar (thread / process / node)
+    partition'ları bu tablodan claim eder; ilerleme (last_id) ve süre partition başına tutulur.
+    Koşunun referans zamanı job_checkpoints.run_started_at'tedir.
+    """
+    __tablename__ = "job_partitions"
+
+    job_name = db.Column(db.String(100), primary_key=True)
+    part_no = db.Column(db.Integer, primary_key=True)
+
+    # [user_id_from, user_id_to) aralığı
+    user_id_from = db.Column(db.Integer, nullable=False)
+    user_id_to = db.Column(db.Integer, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending / running / done / failed
+    owner = db.Column(db.String(200), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True)
+
+    # claim sayısı (lease'i dolan / hata alan deneme dahil); LATE_CHECK_PARTITION_MAX_ATTEMPTS'te failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(500), nullable=True)
+
+    # partition içi keyset (borrow id; özet modunda user_id)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
@@ -0,0 +1,16 @@
+from app.extensions import db
+
+class LeaderboardBucket(db.Model):
+    """
+    Leaderboard sayaçları: (board, gün, kitap/kullanıcı) başına adet.
+    Yazma yolları kendi transaction'ında count = count + n yapar; gün / hafta / ay
+    pencereleri sadece ilgili günlerin bucket'larını toplar, borrows taranmaz.
+    """
+    __tablename__ = "leaderboard_buckets"
+
+    # books_borrowed: kitap başına ödünç, users_overdue: kullanıcı başına gecikmeye düşen ödünç
+    board = db.Column(db.String(30), primary_key=True)
+    bucket_day = db.Column(db.Date, primary_key=True)
+    entity_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from app.extensions import db
+
+class LibraryCounter(db.Model):
+    """
+    Dashboard sayaçları (ör. active_borrows, unpaid_penalty_amount). Her yazma yolu kendi
+    transaction'ında "value = value + delta" ile günceller; sayım için tablolar taranmaz.
+    Kayma olursa: flask --app app reconcile-counters --fix
+    """
+    __tablename__ = "library_counters"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,32 @@
+from datetime import datetime
+from app.extensions import db
+
+class MailOutbox(db.Model):
+    """
+    Gönderilecek mailler. Job'lar status/penalty değişiklikleriyle aynı transaction'da
+    buraya yazar; SMTP gönderimini ayrı delivery worker yapar.
+    """
+    __tablename__ = "mail_outbox"
+    __table_args__ = (
+        db.Index("ix_mail_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    borrow_id = db.Column(db.Integer, db.ForeignKey("borrows.id"), nullable=True, index=True)
+    notif_type = db.Column(db.String(50), nullable=False)  # overdue / due_soon / late_return
+
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending/sending/sent/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = db.Column(db.DateTime, nullable=True)  # "sending" kaydının lease süresi
+    last_error = db.Column(db.String(500), nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    items = db.relationship("MailOutboxItem", backref="outbox", lazy="select")
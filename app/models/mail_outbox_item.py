@@ -0,0 +1,14 @@
+from app.extensions import db
+
+class MailOutboxItem(db.Model):
+    """
+    Tek bir outbox mesajının kapsadığı borrow'lar (özet/digest mail).
+    Gönderim sonucu her borrow için ayrı NotificationLog satırı olarak yazılır.
+    """
+    __tablename__ = "mail_outbox_items"
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    outbox_id = db.Column(db.Integer, db.ForeignKey("mail_outbox.id"), nullable=False, index=True)
+    borrow_id = db.Column(db.Integer, db.ForeignKey("borrows.id"), nullable=False)
+    notif_type = db.Column(db.String(50), nullable=False)  # overdue / due_soon
@@ -7,7 +7,7 @@ class NotificationLog(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
 
-    borrow_id = db.Column(db.Integer, db.ForeignKey("borrows.id"), nullable=False, index=True)
+    borrow_id = db.Column(db.Integer, db.ForeignKey("borrows.id"), nullable=False)
 
     # bildirimin tipi: overdue_mail, due_soon, late_return vs.
     type = db.Column(db.String(50), nullable=False, default="late_return")
@@ -22,4 +22,14 @@ class NotificationLog(db.Model):
     # İstersen isim error_message kalsın:
     error_message = db.Column(db.String(500), nullable=True)
 
+    # outbox üzerinden gönderildiyse hangi mesaj (özet mailde birden çok borrow aynı mesajı gösterir)
+    outbox_id = db.Column(db.Integer, db.ForeignKey("mail_outbox.id"), nullable=True, index=True)
+
     borrow = db.relationship("Borrow", backref="notifications")
+
+    __table_args__ = (
+        # borrow_id FK aramaları (Borrow.notifications) ve (borrow_id, type) süzmeleri
+        db.Index("ix_notification_logs_borrow_id_type", "borrow_id", "type"),
+        # mail raporu: sent_at DESC, id DESC keyset
+        db.Index("ix_notification_logs_sent_at_id", sent_at.desc(), id.desc()),
+    )
@@ -0,0 +1,20 @@
+from datetime import datetime
+from app.extensions import db
+
+class NotificationState(db.Model):
+    """
+    Borrow + bildirim tipi başına son gönderim durumu.
+    Job'lar notification_logs geçmişini taramak yerine bir chunk için tek sorguyla
+    uygunluğu (next_eligible_at) okur ve (borrow_id, type) anahtarıyla atomik claim eder.
+    """
+    __tablename__ = "notification_states"
+
+    borrow_id = db.Column(db.Integer, db.ForeignKey("borrows.id"), primary_key=True)
+    type = db.Column(db.String(50), primary_key=True)  # overdue / due_soon / late_return
+
+    last_sent_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    next_eligible_at = db.Column(db.DateTime, nullable=False)
+    send_count = db.Column(db.Integer, nullable=False, default=1)
+
+    # son claim eden koşunun token'ı (hangi satırları bu koşunun aldığını bulmak için)
+    claim_token = db.Column(db.String(32), nullable=True)
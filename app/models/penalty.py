@@ -13,8 +13,15 @@ class Penalty(db.Model):
     amount = db.Column(db.Numeric(10, 2), nullable=False, default=0)
 
     is_paid = db.Column(db.Boolean, nullable=False, default=False)
+    # ödeme zamanı (günlük rollup: ödenen ceza); updated_at accrual ile de değişir
+    paid_at = db.Column(db.DateTime, nullable=True, index=True)
 
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     borrow = db.relationship("Borrow", backref=db.backref("penalty", uselist=False))
+
+    # admin ceza listesi: updated_at DESC, id DESC keyset
+    __table_args__ = (
+        db.Index("ix_penalties_updated_at_id", updated_at.desc(), id.desc()),
+    )
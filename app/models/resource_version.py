@@ -0,0 +1,16 @@
+from datetime import datetime
+from app.extensions import db
+
+class ResourceVersion(db.Model):
+    """
+    Koşullu GET (ETag / Last-Modified) için kaynak sürümleri: ilgili tablolara her yazımda,
+    yazımla aynı transaction'da version = version + 1. Okuma tek PK lookup.
+    """
+    __tablename__ = "resource_versions"
+
+    # books: katalog listeleri (scope_id 0), loans: kullanıcının ödünç + ceza listeleri (scope_id = user_id)
+    resource = db.Column(db.String(30), primary_key=True)
+    scope_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,27 @@
+from datetime import datetime
+from app.extensions import db
+
+class SchedulerLease(db.Model):
+    """
+    Job başına DB lease'i: tüm process/node'lar arasında bir job'ı aynı anda tek bir
+    sahip (owner) çalıştırır. Sahip heartbeat ile expires_at'i uzatır; process ölürse
+    lease süresi dolar ve başka bir process devralır.
+    """
+    __tablename__ = "scheduler_leases"
+
+    # ör. "late_check_job"
+    name = db.Column(db.String(100), primary_key=True)
+
+    # host:pid:rastgele (bkz. app/tasks/scheduler.py)
+    owner = db.Column(db.String(200), nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # son koşu (status endpoint için)
+    last_run_owner = db.Column(db.String(200), nullable=True)
+    last_run_started_at = db.Column(db.DateTime, nullable=True)
+    last_run_finished_at = db.Column(db.DateTime, nullable=True)
+    last_run_duration_ms = db.Column(db.Integer, nullable=True)
+    last_run_ok = db.Column(db.Boolean, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
@@ -0,0 +1,24 @@
+from app.extensions import db
+
+class SearchPosting(db.Model):
+    """
+    Ters index: (token, kitap) başına terim frekansı. PK token ile başladığı için bir token'ın
+    posting'leri tek index range'inde okunur. doc_len kitabın toplam token sayısı
+    (BM25 uzunluk normalizasyonu; join'e gerek kalmasın diye her posting'de).
+    """
+    __tablename__ = "search_postings"
+
+    token = db.Column(db.String(64), primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey("books.id"), primary_key=True, autoincrement=False)
+
+    tf = db.Column(db.Integer, nullable=False)
+    doc_len = db.Column(db.Integer, nullable=False)
+    # yazma anındaki ortalama uzunlukla BM25 tf bileşeni; sık token'larda en iyi adaylar
+    # bütün posting listesi okunmadan bu sırayla alınır
+    impact = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        # kitap güncelleme / silme: eski posting'leri bul
+        db.Index("ix_search_postings_book_id", "book_id"),
+        db.Index("ix_search_postings_token_impact", "token", impact.desc()),
+    )
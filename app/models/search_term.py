@@ -0,0 +1,11 @@
+from app.extensions import db
+
+class SearchTerm(db.Model):
+    """
+    Arama sözlüğü: normalize token -> kaç kitapta geçtiği (df, BM25 idf için).
+    Kitap yazma yollarında posting'lerle aynı transaction'da güncellenir.
+    """
+    __tablename__ = "search_terms"
+
+    token = db.Column(db.String(64), primary_key=True)
+    df = db.Column(db.Integer, nullable=False, default=0)
@@ -1,15 +1,268 @@
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, case
+
 from app.models.book import Book
 from app.extensions import db
+from app.utils.catalog_snapshot import SnapshotReader, CatalogSnapshot, FIELDS as SNAPSHOT_FIELDS
+from app.utils.lru_cache import LRUCache
+from app.utils.pagination import keyset_page, encode_cursor, DEFAULT_LIMIT
+
+# Process içi katalog cache'i: tek kitap (id -> dict) ve liste sayfaları ((alanlar, cursor, limit, filtreler)
+# -> sayfa). Değerler düz dict; yazım yolları get() ile session'a bağlı nesne almaya devam eder.
+# Çağıranlar dönen dict / listeyi değiştirmemeli (paylaşılan kopya)
+_book_cache = LRUCache("books")
+_page_cache = LRUCache("book_pages")
+
+_BOOK_COLUMNS = (Book.id, Book.title, Book.author, Book.isbn, Book.total_copies, Book.available_copies)
+
+
+# Makine genelinde paylaşılan mmap snapshot (CATALOG_SNAPSHOT_PATH; bkz. app/tasks/catalog_snapshot.py).
+# Bu process'in snapshot'tan sonra yazdığı kitaplar (_dirty: id -> yazım zamanı) snapshot'tan okunmaz;
+# yazımdan sonra kurulmuş bir snapshot gelince listeden düşer
+_reader = SnapshotReader()
+_dirty: dict[int, float] = {}
+_dirty_all = 0.0
+_dirty_lock = threading.Lock()
+_snapshot_stats = {"hits": 0, "fallbacks": 0}
+
+
+def _configure():
+    cfg = current_app.config
+    ttl = cfg.get("CATALOG_CACHE_TTL_SECONDS", 30)
+    _book_cache.configure(cfg.get("CATALOG_CACHE_SIZE", 10_000), ttl)
+    _page_cache.configure(cfg.get("CATALOG_PAGE_CACHE_SIZE", 256), ttl)
+
+
+def _snapshot() -> CatalogSnapshot | None:
+    snap = _reader.current(current_app.config.get("CATALOG_SNAPSHOT_PATH"))
+    if snap is None or _dirty_all >= snap.built_at:
+        return None
+    if _dirty:
+        with _dirty_lock:
+            for book_id in [k for k, t in _dirty.items() if t < snap.built_at]:
+                del _dirty[book_id]
+    return snap
+
+
+def _fresh(snap: CatalogSnapshot, book_id: int) -> bool:
+    written = _dirty.get(book_id)
+    return written is None or written < snap.built_at
+
+
+def _load(book_id: int) -> dict | None:
+    row = db.session.query(*_BOOK_COLUMNS).filter(Book.id == book_id).first()
+    return dict(row._mapping) if row is not None else None
+
+
+def _snapshot_current(snap: CatalogSnapshot, books_version: int | None) -> bool:
+    """
+    Liste sayfası için snapshot yeterli mi: snapshot sadece içindeki id'leri bilir, sonradan eklenen
+    kitapları bilmez. books_version (ETag'in sürümü) verilirse snapshot'ınkiyle aynı olmalı; verilmezse
+    bu process snapshot'tan sonra yazmamış olmalı. Değilse sayfa DB'den okunur.
+    """
+    if books_version is not None:
+        return snap.books_version == books_version
+    return not _dirty
+
+
+def _page_from_snapshot(snap: CatalogSnapshot, field_map: dict, fields: list, cursor, limit: int,
+                        available: bool | None):
+    """
+    keyset_page'in snapshot karşılığı (id DESC); snapshot güncel olmalı (bkz. _snapshot_current).
+    Filtre yüzünden CATALOG_SNAPSHOT_MAX_SCAN'den fazla satır taranacaksa None (DB'ye düşülür).
+    """
+    if cursor is not None and (len(cursor) != 1 or not isinstance(cursor[0], int)):
+        raise ValueError("Geçersiz cursor")
+    max_scan = current_app.config.get("CATALOG_SNAPSHOT_MAX_SCAN", 10_000)
+
+    rows = []
+    for scanned, row in enumerate(snap.iter_desc(cursor[0] if cursor else None), 1):
+        if scanned > max_scan:
+            return None
+        if available is not None and (row["available_copies"] > 0) != available:
+            continue
+        rows.append(row)
+        if len(rows) > limit:
+            break
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["id"]])
+
+    data = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            value = int(row["available_copies"] > 0) if name == "available" else row[name]
+            fmt = field_map[name][1]
+            item[name] = fmt(value) if (fmt and value is not None) else value
+        data.append(item)
+    return data, next_cursor
+
 
 class BookRepo:
     @staticmethod
     def list_all():
         return Book.query.order_by(Book.id.desc()).all()
 
+    @staticmethod
+    def filtered(author: str | None = None, available: bool | None = None):
+        """Facet filtreleri: yazar tam eşleşme (ix_books_author), available_copies > 0 / = 0."""
+        q = Book.query
+        if author is not None:
+            q = q.filter(Book.author == author)
+        if available is not None:
+            q = q.filter(Book.available_copies > 0 if available else Book.available_copies <= 0)
+        return q
+
+    @staticmethod
+    def list_page(field_map: dict, fields: list, cursor=None, limit: int = DEFAULT_LIMIT,
+                  author: str | None = None, available: bool | None = None,
+                  books_version: int | None = None):
+        """
+        id DESC keyset sayfalama; sadece istenen kolonlar okunur. Snapshot varsa (yazar filtresi
+        hariç, sürümü güncelse) oradan, yoksa read-through: aynı parametreli sayfa CATALOG_CACHE_TTL_SECONDS boyunca
+        ya da bir kitap değişene kadar cache'ten döner.
+        books_version (ETag'li uçlar): cache anahtarına girer; başka process yazınca sürüm değişir ve
+        eski sayfa yeni ETag ile verilmez.
+        return: (data, next_cursor)
+        """
+        snap = _snapshot()
+        if (snap is not None and author is None and set(fields) <= set(SNAPSHOT_FIELDS)
+                and _snapshot_current(snap, books_version)):
+            page = _page_from_snapshot(snap, field_map, fields, cursor, limit, available)
+            if page is not None:
+                _snapshot_stats["hits"] += 1
+                return page
+        if snap is not None:
+            _snapshot_stats["fallbacks"] += 1
+        _configure()
+        key = (
+            tuple(fields), tuple(cursor) if cursor is not None else None, limit, author, available,
+            books_version,
+        )
+        version = _page_cache.version
+        hit, page = _page_cache.get(key)
+        if hit:
+            return page
+        page = keyset_page(BookRepo.filtered(author, available), field_map, fields, [Book.id], cursor, limit)
+        _page_cache.put(key, page, version)
+        return page
+
+    @staticmethod
+    def author_facets(limit: int) -> tuple[list[tuple[str, int]], int]:
+        """return: (en çok kitabı olan ilk limit yazar (yazar, kitap sayısı), farklı yazar sayısı)"""
+        n = func.count(Book.id)
+        rows = (
+            db.session.query(Book.author, n)
+            .group_by(Book.author)
+            .order_by(n.desc(), Book.author)
+            .limit(limit)
+            .all()
+        )
+        distinct = db.session.query(func.count(func.distinct(Book.author))).scalar()
+        return [(author, int(count)) for author, count in rows], int(distinct or 0)
+
+    @staticmethod
+    def availability_facets() -> dict:
+        """Tek taramada iki bucket: şu an ödünç alınabilir / tüm kopyalar dışarıda."""
+        available, total = db.session.query(
+            func.coalesce(func.sum(case((Book.available_copies > 0, 1), else_=0)), 0),
+            func.count(Book.id),
+        ).one()
+        return {"available": int(available), "unavailable": int(total) - int(available)}
+
     @staticmethod
     def get(book_id: int):
         return Book.query.get(book_id)
 
+    @staticmethod
+    def get_cached(book_id: int) -> dict | None:
+        """
+        Salt okunur kitap (dict): mmap snapshot'tan; snapshot yoksa / kitap orada yoksa / bu process
+        snapshot'tan sonra yazdıysa LRU'dan, o da yoksa tek satır okunup cache'e yazılır.
+        """
+        snap = _snapshot()
+        if snap is not None and _fresh(snap, book_id):
+            book = snap.get(book_id)
+            if book is not None:
+                _snapshot_stats["hits"] += 1
+                return book
+        if snap is not None:
+            _snapshot_stats["fallbacks"] += 1
+
+        _configure()
+        version = _book_cache.version
+        hit, book = _book_cache.get(book_id)
+        if hit:
+            return book
+        book = _load(book_id)
+        if book is not None:
+            _book_cache.put(book_id, book, version)
+        return book
+
+    @staticmethod
+    def invalidate(book_id: int | None = None):
+        """
+        Commit sonrası çağrılır: kitabın kaydı (id yoksa tüm kitaplar) ve tüm liste sayfaları düşer.
+        Katalog yazımları ve available_copies değiştiren ödünç / iade yolları çağırır.
+        """
+        global _dirty_all
+        if current_app.config.get("CATALOG_SNAPSHOT_PATH"):
+            now = time.time()
+            with _dirty_lock:
+                if book_id is None:
+                    _dirty_all = now
+                else:
+                    _dirty[book_id] = now
+        _book_cache.invalidate(book_id)
+        _page_cache.invalidate()
+
+    @staticmethod
+    def snapshot_rows_after(last_id: int, limit: int) -> list[tuple]:
+        """Snapshot builder için id sırasıyla tam satırlar."""
+        return (
+            db.session.query(*_BOOK_COLUMNS)
+            .filter(Book.id > last_id)
+            .order_by(Book.id)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def cache_stats() -> dict:
+        snap = _snapshot()
+        snapshot = dict(_snapshot_stats, dirty=len(_dirty), mapped=snap is not None)
+        if snap is not None:
+            snapshot.update(
+                books=len(snap),
+                books_version=snap.books_version,
+                age_seconds=round(time.time() - snap.built_at, 1),
+            )
+        return {"books": _book_cache.stats(), "book_pages": _page_cache.stats(), "snapshot": snapshot}
+
+    @staticmethod
+    def titles_after(last_id: int, limit: int) -> list[tuple]:
+        """(id, title, author) id sırasıyla; bellek içi index'i batch batch kurmak için."""
+        return (
+            db.session.query(Book.id, Book.title, Book.author)
+            .filter(Book.id > last_id)
+            .order_by(Book.id)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def add(book: Book):
+        """Commit yapmaz; flush ile id alınır (aynı transaction'da index / sayaç yazmak için)."""
+        db.session.add(book)
+        db.session.flush()
+        return book
+
     @staticmethod
     def create(book: Book):
         db.session.add(book)
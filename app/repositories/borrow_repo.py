@@ -1,19 +1,43 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import func, case, or_
+from sqlalchemy.orm import joinedload
 from app.models.borrow import Borrow
+from app.models.book import Book
+from app.models.user import User
 from app.extensions import db
+from app.utils.pagination import keyset_page, DEFAULT_LIMIT
 
 class BorrowRepo:
+    @staticmethod
+    def with_refs(q):
+        """
+        Listelerde x.user / x.book erişimi satır başına ayrı SELECT atmasın diye
+        iki many-to-one ilişki tek sorguda JOIN ile yüklenir.
+        """
+        return q.options(joinedload(Borrow.user), joinedload(Borrow.book))
+
     @staticmethod
     def get(borrow_id: int):
         return Borrow.query.get(borrow_id)
 
     @staticmethod
     def list_by_user(user_id: int):
-        return Borrow.query.filter_by(user_id=user_id).order_by(Borrow.id.desc()).all()
+        q = Borrow.query.filter_by(user_id=user_id).order_by(Borrow.id.desc())
+        return BorrowRepo.with_refs(q).all()
 
     @staticmethod
-    def list_all():
-        return Borrow.query.order_by(Borrow.id.desc()).all()
+    def list_page(field_map: dict, fields: list, cursor=None, limit: int = DEFAULT_LIMIT):
+        """
+        id DESC keyset sayfalama. User/Book outer join ile bağlı olduğu için
+        field_map içinde User.username / Book.title gibi kolonlar da kullanılabilir.
+        return: (data, next_cursor)
+        """
+        q = (
+            Borrow.query
+            .outerjoin(User, User.id == Borrow.user_id)
+            .outerjoin(Book, Book.id == Borrow.book_id)
+        )
+        return keyset_page(q, field_map, fields, [Borrow.id], cursor, limit)
 
     @staticmethod
     def create(borrow: Borrow):
@@ -26,8 +50,58 @@ class BorrowRepo:
         db.session.commit()
 
     @staticmethod
-    def find_overdue(now: datetime):
-        return Borrow.query.filter(
+    def find_overdue(now: datetime, limit: int | None = None, since: datetime | None = None):
+        """
+        since verilirse sadece since'ten bu yana gecikmeye düşenler: since <= due_date < now ya da
+        since'ten sonra açılıp vadesi zaten geçmiş olanlar (late_check._due_window ile aynı kural).
+        """
+        q = Borrow.query.filter(
             Borrow.returned_at.is_(None),
             Borrow.due_date < now
-        ).all()
+        )
+        if since is not None:
+            q = q.filter(or_(Borrow.due_date >= since, Borrow.borrowed_at >= since))
+        q = q.order_by(Borrow.due_date.asc())
+        if limit:
+            q = q.limit(limit)
+        return BorrowRepo.with_refs(q).all()
+
+    @staticmethod
+    def count_overdue(now: datetime) -> int:
+        """Açık ve vadesi geçmiş ödünç sayısı (late check'i beklemez); ix_borrows_open_due_date range."""
+        return int(
+            db.session.query(func.count(Borrow.id))
+            .filter(Borrow.returned_at.is_(None), Borrow.due_date < now)
+            .scalar() or 0
+        )
+
+    @staticmethod
+    def next_due_event(now: datetime, due_soon_window: timedelta) -> datetime | None:
+        """
+        Late check için bir sonraki olay anı (tek sorgu):
+        - en yakın vadesi dolacak açık borrow (overdue'ya geçiş)
+        - en yakın due_soon penceresine girecek borrow (due_date - due_soon_window)
+        """
+        horizon = now + due_soon_window
+        next_due, next_soon = (
+            db.session.query(
+                func.min(Borrow.due_date),
+                func.min(case((Borrow.due_date > horizon, Borrow.due_date))),
+            )
+            .filter(Borrow.returned_at.is_(None), Borrow.due_date > now)
+            .one()
+        )
+        events = [t for t in (next_due, next_soon - due_soon_window if next_soon else None) if t]
+        return min(events) if events else None
+
+    @staticmethod
+    def find_due_between(start: datetime, end: datetime, limit: int | None = None):
+        q = Borrow.query.filter(
+            Borrow.returned_at.is_(None),
+            Borrow.due_date >= start,
+            Borrow.due_date <= end
+        ).order_by(Borrow.due_date.asc())
+        if limit:
+            q = q.limit(limit)
+        return BorrowRepo.with_refs(q).all()
+
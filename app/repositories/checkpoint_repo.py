@@ -0,0 +1,16 @@
+from app.models.job_checkpoint import JobCheckpoint
+from app.extensions import db
+
+class CheckpointRepo:
+    @staticmethod
+    def get_or_create(job_name: str) -> JobCheckpoint:
+        cp = JobCheckpoint.query.get(job_name)
+        if not cp:
+            cp = JobCheckpoint(job_name=job_name)
+            db.session.add(cp)
+            db.session.flush()
+        return cp
+
+    @staticmethod
+    def is_unfinished(cp: JobCheckpoint) -> bool:
+        return cp.run_started_at is not None and cp.finished_at is None
@@ -0,0 +1,122 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import func, case, select, true, false
+
+from app.models.book import Book
+from app.models.borrow import Borrow
+from app.models.library_counter import LibraryCounter
+from app.models.penalty import Penalty
+from app.models.search_posting import SearchPosting
+from app.extensions import db
+
+
+# late check / late_return bu status'lerle işaretler; overdue sayacı bunları sayar
+OVERDUE_STATUSES = ("overdue", "late")
+
+# admin dashboard'da gösterilenler (/web/api/admin/stats)
+DASHBOARD_COUNTERS = (
+    "total_books",
+    "total_copies",
+    "active_borrows",
+    "overdue_borrows",
+    "unpaid_penalty_count",
+    "unpaid_penalty_amount",
+)
+
+COUNTERS = DASHBOARD_COUNTERS + (
+    # iç: arama index'indeki toplam token (BM25 ortalama doküman uzunluğu = bu / total_books)
+    "search_token_total",
+)
+
+# katalog (books) her yazımda artar; bellek içi kopyalar (autocomplete index) bununla senkron kalır.
+# Taban tablodan türetilemez: COUNTERS'ta değil, reconcile dokunmaz
+CATALOG_VERSION = "catalog_version"
+
+# para dışındakiler tam sayı döner
+_DECIMAL_COUNTERS = ("unpaid_penalty_amount",)
+
+
+def _out(name: str, value) -> int | float:
+    value = Decimal(value or 0)
+    return float(value) if name in _DECIMAL_COUNTERS else int(value)
+
+
+class CounterRepo:
+    @staticmethod
+    def add(deltas: dict):
+        """
+        Sayaçları atomik olarak artırır/azaltır (value = value + delta; read-modify-write yok).
+        Commit yapmaz: çağıranın transaction'ıyla birlikte commit/rollback olur.
+        """
+        table = LibraryCounter.__table__
+        now = datetime.utcnow()
+        for name, delta in deltas.items():
+            if not delta:
+                continue
+            db.session.execute(
+                table.update()
+                .where(table.c.name == name)
+                .values(value=table.c.value + Decimal(str(delta)), updated_at=now)
+            )
+
+    @staticmethod
+    def unpaid_penalty_delta(before, after) -> dict:
+        """before / after: cezanın ödenmemiş tutarı; ceza yoksa ya da ödenmişse None."""
+        return {
+            "unpaid_penalty_count": int(after is not None) - int(before is not None),
+            "unpaid_penalty_amount": Decimal(str(after or 0)) - Decimal(str(before or 0)),
+        }
+
+    @staticmethod
+    def get(name: str) -> int | float:
+        value = db.session.query(LibraryCounter.value).filter(LibraryCounter.name == name).scalar()
+        return _out(name, value)
+
+    @staticmethod
+    def get_all(names: tuple = COUNTERS) -> dict:
+        stored = dict(
+            db.session.query(LibraryCounter.name, LibraryCounter.value)
+            .filter(LibraryCounter.name.in_(names))
+            .all()
+        )
+        return {name: _out(name, stored.get(name)) for name in names}
+
+    @staticmethod
+    def compute_actual(now: datetime) -> dict:
+        """Sayaçların taban tablolardan gerçek değeri (tek round trip; reconcile için)."""
+        books = select(
+            func.count(Book.id).label("total_books"),
+            func.coalesce(func.sum(Book.total_copies), 0).label("total_copies"),
+        ).subquery()
+        loans = select(
+            func.count(Borrow.id).label("active_borrows"),
+            func.coalesce(func.sum(case((Borrow.status.in_(OVERDUE_STATUSES), 1), else_=0)), 0)
+            .label("overdue_borrows"),
+        ).where(Borrow.returned_at.is_(None)).subquery()
+        penalties = select(
+            func.count(Penalty.id).label("unpaid_penalty_count"),
+            func.coalesce(func.sum(Penalty.amount), 0).label("unpaid_penalty_amount"),
+        ).where(Penalty.is_paid == false()).subquery()
+        search = select(
+            func.coalesce(func.sum(SearchPosting.tf), 0).label("search_token_total"),
+        ).subquery()
+
+        # dört tek satırlık aggregate: CROSS JOIN
+        row = db.session.execute(
+            select(books, loans, penalties, search)
+            .select_from(books.join(loans, true()).join(penalties, true()).join(search, true()))
+        ).one()
+        return {name: _out(name, row._mapping[name]) for name in COUNTERS}
+
+    @staticmethod
+    def set_all(values: dict):
+        """Reconcile: değerleri yazar, eksik satırları ekler. Commit çağıranda."""
+        now = datetime.utcnow()
+        for name, value in values.items():
+            row = db.session.get(LibraryCounter, name)
+            if row is None:
+                db.session.add(LibraryCounter(name=name, value=Decimal(str(value)), updated_at=now))
+            else:
+                row.value = Decimal(str(value))
+                row.updated_at = now
@@ -0,0 +1,152 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, case, and_, or_
+
+from app.models.borrow import Borrow
+from app.models.daily_stat import DailyStat
+from app.models.notification_log import NotificationLog
+from app.models.penalty import Penalty
+from app.extensions import db
+
+
+def _bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
+class DailyStatsRepo:
+    @staticmethod
+    def first_activity_day() -> date | None:
+        # ix_borrows_borrowed_at: MIN tek index okuması
+        first = db.session.query(func.min(Borrow.borrowed_at)).scalar()
+        return first.date() if first else None
+
+    @staticmethod
+    def overdue_open_on(day: date) -> int | None:
+        row = db.session.get(DailyStat, day)
+        return row.overdue_open if row is not None else None
+
+    @staticmethod
+    def _overdue_open_full(start: datetime) -> int:
+        """
+        Gün başında açık + vadesi geçmiş: hâlâ açık olanlar (açık ödünç index'i) + gün başından sonra
+        iade edilenler (returned_at index'i). İkincisi o günden sonraki tüm iadeleri okur: sadece
+        yakın günler / ilk gün için.
+        """
+        still_open = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at.is_(None), Borrow.due_date < start, Borrow.borrowed_at < start
+        ).scalar()
+        returned_later = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at >= start, Borrow.due_date < start, Borrow.borrowed_at < start
+        ).scalar()
+        return int(still_open or 0) + int(returned_later or 0)
+
+    @staticmethod
+    def _overdue_open_delta(prev_start: datetime, start: datetime) -> int:
+        """
+        Önceki gün başından bu gün başına gecikmiş açık sayısındaki değişim; sadece önceki günün olayları
+        okunur (hepsi gün aralığında index range):
+        + vadesi önceki gün dolan ve gün sonunda hâlâ açık olanlar (açık / iade edilmiş due_date index'leri)
+        + önceki gün vadesi zaten geçmiş olarak açılanlar (borrowed_at index'i)
+        - önceki gün başında gecikmişken o gün iade edilenler (returned_at index'i)
+        """
+        came_due_open = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at.is_(None),
+            Borrow.due_date >= prev_start, Borrow.due_date < start, Borrow.borrowed_at < start,
+        ).scalar()
+        came_due_returned_later = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at >= start,
+            Borrow.due_date >= prev_start, Borrow.due_date < start, Borrow.borrowed_at < start,
+        ).scalar()
+        opened_overdue = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.borrowed_at >= prev_start, Borrow.borrowed_at < start, Borrow.due_date < prev_start,
+            or_(Borrow.returned_at.is_(None), Borrow.returned_at >= start),
+        ).scalar()
+        returned = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at >= prev_start, Borrow.returned_at < start,
+            Borrow.due_date < prev_start, Borrow.borrowed_at < prev_start,
+        ).scalar()
+        return (
+            int(came_due_open or 0) + int(came_due_returned_later or 0) + int(opened_overdue or 0)
+            - int(returned or 0)
+        )
+
+    @staticmethod
+    def compute(day: date, prev_overdue_open: int | None = None) -> dict:
+        """
+        Tek gün için aggregate'ler; her sorgu gün aralığında index range okur:
+        borrowed_at / returned_at / penalties.paid_at / notification_logs.sent_at.
+        prev_overdue_open: bir önceki günün overdue_open'ı (backfill); verilirse gün başı gecikmiş sayısı
+        önceki günün olaylarıyla güncellenir, verilmezse tam sayılır.
+        penalty_amount_accrued çağıran tarafta (ücret kuralı service'te).
+        """
+        start, end = _bounds(day)
+
+        started = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.borrowed_at >= start, Borrow.borrowed_at < end
+        ).scalar()
+        returned = db.session.query(func.count(Borrow.id)).filter(
+            Borrow.returned_at >= start, Borrow.returned_at < end
+        ).scalar()
+
+        if prev_overdue_open is None:
+            overdue_open = DailyStatsRepo._overdue_open_full(start)
+        else:
+            overdue_open = prev_overdue_open + DailyStatsRepo._overdue_open_delta(start - timedelta(days=1), start)
+
+        paid_count, paid_amount = db.session.query(
+            func.count(Penalty.id), func.coalesce(func.sum(Penalty.amount), 0)
+        ).filter(Penalty.paid_at >= start, Penalty.paid_at < end).one()
+
+        mails_sent, mails_failed = db.session.query(
+            func.coalesce(func.sum(case((NotificationLog.success == True, 1), else_=0)), 0),  # noqa: E712
+            func.coalesce(func.sum(case((NotificationLog.success == False, 1), else_=0)), 0),  # noqa: E712
+        ).filter(NotificationLog.sent_at >= start, NotificationLog.sent_at < end).one()
+
+        return {
+            "borrows_started": int(started or 0),
+            "borrows_returned": int(returned or 0),
+            "overdue_open": overdue_open,
+            "penalties_paid": int(paid_count or 0),
+            "penalty_amount_paid": Decimal(str(paid_amount or 0)),
+            "mails_sent": int(mails_sent or 0),
+            "mails_failed": int(mails_failed or 0),
+        }
+
+    @staticmethod
+    def upsert(day: date, values: dict, now: datetime):
+        """Aynı gün tekrar hesaplanırsa üzerine yazar. Commit çağıranda."""
+        row = db.session.get(DailyStat, day)
+        if row is None:
+            row = DailyStat(day=day)
+            db.session.add(row)
+        for k, v in values.items():
+            setattr(row, k, v)
+        row.computed_at = now
+
+    @staticmethod
+    def range(day_from: date, day_to: date) -> list[dict]:
+        """[day_from, day_to] kapalı aralık; sadece rollup tablosu okunur (PK range)."""
+        rows = (
+            DailyStat.query
+            .filter(and_(DailyStat.day >= day_from, DailyStat.day <= day_to))
+            .order_by(DailyStat.day)
+            .all()
+        )
+        out = []
+        for r in rows:
+            mails = r.mails_sent + r.mails_failed
+            out.append({
+                "day": r.day.isoformat(),
+                "borrows_started": r.borrows_started,
+                "borrows_returned": r.borrows_returned,
+                "overdue_open": r.overdue_open,
+                "penalty_amount_accrued": float(r.penalty_amount_accrued or 0),
+                "penalties_paid": r.penalties_paid,
+                "penalty_amount_paid": float(r.penalty_amount_paid or 0),
+                "mails_sent": r.mails_sent,
+                "mails_failed": r.mails_failed,
+                "mail_success_rate": round(r.mails_sent / mails, 4) if mails else None,
+            })
+        return out
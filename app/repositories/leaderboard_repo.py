@@ -0,0 +1,122 @@
+from datetime import date, datetime, time
+
+from sqlalchemy import Date, bindparam, cast, func, literal, or_, select
+
+from app.models.book import Book
+from app.models.borrow import Borrow
+from app.models.leaderboard_bucket import LeaderboardBucket
+from app.models.user import User
+from app.extensions import db
+from app.utils.upsert import insert_ignore
+
+
+BOOKS_BORROWED = "books_borrowed"
+USERS_OVERDUE = "users_overdue"
+BOARDS = (BOOKS_BORROWED, USERS_OVERDUE)
+
+
+def _day(col):
+    # datetime -> gün (SQLite'ta CAST AS DATE sayıya döner)
+    return func.date(col) if db.engine.dialect.name == "sqlite" else cast(col, Date)
+
+
+class LeaderboardRepo:
+    @staticmethod
+    def bump(board: str, day: date, counts: dict[int, int]):
+        """
+        counts: entity_id -> artış. Eksik bucket'lar 0 ile eklenir, sonra count = count + n
+        (eşzamanlı yazıcılar birbirinin artışını ezmez). Commit yapmaz.
+        """
+        counts = {k: n for k, n in counts.items() if k is not None and n}
+        if not counts:
+            return
+        insert_ignore(
+            LeaderboardBucket.__table__,
+            [{"board": board, "bucket_day": day, "entity_id": eid, "count": 0} for eid in counts],
+            ["board", "bucket_day", "entity_id"],
+        )
+
+        t = LeaderboardBucket.__table__
+        db.session.execute(
+            t.update()
+            .where(
+                t.c.board == bindparam("b_board"),
+                t.c.bucket_day == bindparam("b_day"),
+                t.c.entity_id == bindparam("b_entity"),
+            )
+            .values(count=t.c.count + bindparam("b_n")),
+            [{"b_board": board, "b_day": day, "b_entity": eid, "b_n": n} for eid, n in counts.items()],
+        )
+
+    @staticmethod
+    def top(board: str, day_from: date, day_to: date, k: int) -> list[tuple[int, int]]:
+        """
+        [day_from, day_to] bucket'larının toplamına göre ilk k: (entity_id, adet).
+        PK (board, bucket_day, ...) range; okunan satır = pencerede aktif entity x gün.
+        """
+        total = func.sum(LeaderboardBucket.count).label("total")
+        rows = (
+            db.session.query(LeaderboardBucket.entity_id, total)
+            .filter(
+                LeaderboardBucket.board == board,
+                LeaderboardBucket.bucket_day >= day_from,
+                LeaderboardBucket.bucket_day <= day_to,
+            )
+            .group_by(LeaderboardBucket.entity_id)
+            .order_by(total.desc(), LeaderboardBucket.entity_id)
+            .limit(k)
+            .all()
+        )
+        return [(int(eid), int(n)) for eid, n in rows]
+
+    @staticmethod
+    def labels(board: str, ids: list[int]) -> dict[int, str]:
+        """Sadece top-k id'leri için başlık / kullanıcı adı (K satır)."""
+        if not ids:
+            return {}
+        if board == BOOKS_BORROWED:
+            rows = db.session.query(Book.id, Book.title).filter(Book.id.in_(ids)).all()
+        else:
+            rows = db.session.query(User.id, User.username).filter(User.id.in_(ids)).all()
+        return {int(i): label for i, label in rows}
+
+    @staticmethod
+    def prune(before: date) -> int:
+        """Saklama süresini aşan bucket'ları siler. Commit çağıranda."""
+        return LeaderboardBucket.query.filter(LeaderboardBucket.bucket_day < before).delete(
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def rebuild(since: date, now: datetime) -> dict:
+        """
+        since'ten itibaren bucket'ları borrows'tan yeniden üretir (ilk kurulum / düzeltme).
+        users_overdue için gecikmeye düşme günü = vade günü (açık ve vadesi geçmiş ya da geç iade);
+        canlı yol (LeaderboardService.record_overdue) da aynı günü kullanır.
+        Commit çağıranda.
+        """
+        start = datetime.combine(since, time.min)
+        LeaderboardBucket.query.filter(LeaderboardBucket.bucket_day >= since).delete(synchronize_session=False)
+
+        borrowed_day = _day(Borrow.borrowed_at)
+        due_day = _day(Borrow.due_date)
+        t = LeaderboardBucket.__table__
+        sources = {
+            BOOKS_BORROWED: select(
+                literal(BOOKS_BORROWED), borrowed_day, Borrow.book_id, func.count(Borrow.id)
+            ).where(Borrow.borrowed_at >= start).group_by(borrowed_day, Borrow.book_id),
+            USERS_OVERDUE: select(
+                literal(USERS_OVERDUE), due_day, Borrow.user_id, func.count(Borrow.id)
+            ).where(
+                Borrow.due_date >= start,
+                Borrow.due_date < now,
+                or_(Borrow.returned_at.is_(None), Borrow.returned_at > Borrow.due_date),
+            ).group_by(due_day, Borrow.user_id),
+        }
+        out = {}
+        for board, query in sources.items():
+            res = db.session.execute(
+                t.insert().from_select(["board", "bucket_day", "entity_id", "count"], query)
+            )
+            out[board] = res.rowcount
+        return out
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, case
+from sqlalchemy.exc import IntegrityError
+
+from app.models.scheduler_lease import SchedulerLease
+from app.extensions import db
+
+
+class LeaseRepo:
+    @staticmethod
+    def _ensure_row(name: str):
+        # satır yoksa süresi dolmuş boş lease olarak ekle; yarışta ikinci insert yok sayılır
+        if db.session.get(SchedulerLease, name) is not None:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(SchedulerLease(name=name, owner=None, expires_at=datetime(1900, 1, 1)))
+        except IntegrityError:
+            pass
+
+    @staticmethod
+    def try_acquire(name: str, owner: str, now: datetime, ttl_seconds: int) -> bool:
+        """
+        Lease boşsa / süresi dolduysa / zaten bizdeyse alır (veya uzatır) ve commit eder.
+        Koşullu tek UPDATE olduğu için iki process aynı anda alamaz.
+        """
+        LeaseRepo._ensure_row(name)
+        lease = SchedulerLease.__table__
+        res = db.session.execute(
+            lease.update()
+            .where(
+                lease.c.name == name,
+                or_(lease.c.owner == owner, lease.c.owner.is_(None), lease.c.expires_at < now),
+            )
+            .values(
+                # sahip değişiyorsa acquired_at yenilenir
+                acquired_at=case((lease.c.owner == owner, lease.c.acquired_at), else_=now),
+                owner=owner,
+                heartbeat_at=now,
+                expires_at=now + timedelta(seconds=ttl_seconds),
+            )
+        )
+        db.session.commit()
+        return res.rowcount == 1
+
+    @staticmethod
+    def heartbeat(names: list[str], owner: str, now: datetime, ttl_seconds: int) -> set[str]:
+        """
+        Sahip olunan lease'leri uzatır; return: hâlâ bizde olanlar.
+        Süresi dolup başkasına geçmiş lease uzatılmaz (sahip kontrolü WHERE'de).
+        """
+        if not names:
+            return set()
+        lease = SchedulerLease.__table__
+        db.session.execute(
+            lease.update()
+            .where(lease.c.name.in_(names), lease.c.owner == owner, lease.c.expires_at >= now)
+            .values(heartbeat_at=now, expires_at=now + timedelta(seconds=ttl_seconds))
+        )
+        held = {
+            r[0] for r in db.session.query(SchedulerLease.name)
+            .filter(SchedulerLease.name.in_(names), SchedulerLease.owner == owner)
+            .all()
+        }
+        db.session.commit()
+        return held
+
+    @staticmethod
+    def release(names: list[str], owner: str):
+        """Kapanışta: lease hemen serbest kalır, başka process beklemeden devralır."""
+        if not names:
+            return
+        SchedulerLease.query.filter(
+            SchedulerLease.name.in_(names), SchedulerLease.owner == owner
+        ).update({"owner": None, "expires_at": datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+
+    @staticmethod
+    def record_run(name: str, owner: str, started_at: datetime, duration_ms: int, ok: bool, error: str | None):
+        SchedulerLease.query.filter_by(name=name).update({
+            "last_run_owner": owner,
+            "last_run_started_at": started_at,
+            "last_run_finished_at": datetime.utcnow(),
+            "last_run_duration_ms": int(duration_ms),
+            "last_run_ok": bool(ok),
+            "last_error": (error or "")[:500] or None,
+        }, synchronize_session=False)
+        db.session.commit()
+
+    @staticmethod
+    def status(now: datetime) -> list[dict]:
+        rows = SchedulerLease.query.order_by(SchedulerLease.name.asc()).all()
+        return [
+            {
+                "name": r.name,
+                "leader": r.owner if r.owner and r.expires_at >= now else None,
+                "acquired_at": r.acquired_at.isoformat() if r.acquired_at else None,
+                "heartbeat_at": r.heartbeat_at.isoformat() if r.heartbeat_at else None,
+                "expires_at": r.expires_at.isoformat() if r.expires_at else None,
+                "last_run": {
+                    "owner": r.last_run_owner,
+                    "started_at": r.last_run_started_at.isoformat() if r.last_run_started_at else None,
+                    "finished_at": r.last_run_finished_at.isoformat() if r.last_run_finished_at else None,
+                    "duration_ms": r.last_run_duration_ms,
+                    "ok": r.last_run_ok,
+                    "error": r.last_error,
+                },
+            }
+            for r in rows
+        ]
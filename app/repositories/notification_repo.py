@@ -1,13 +1,27 @@
 from app.models.notification_log import NotificationLog
+from app.models.borrow import Borrow
+from app.models.book import Book
+from app.models.user import User
 from app.extensions import db
+from app.utils.pagination import keyset_page, DEFAULT_LIMIT
 
 class NotificationRepo:
-    @staticmethod
-    def already_sent(borrow_id: int, notif_type: str = "late_return") -> bool:
-        return NotificationLog.query.filter_by(borrow_id=borrow_id, type=notif_type).first() is not None
-
     @staticmethod
     def log(entry: NotificationLog):
         db.session.add(entry)
         db.session.commit()
         return entry
+
+    @staticmethod
+    def report_page(field_map: dict, fields: list, cursor=None, limit: int = DEFAULT_LIMIT):
+        """
+        Mail raporu: NotificationLog -> Borrow -> User/Book, sent_at DESC, id DESC.
+        return: (data, next_cursor)
+        """
+        q = (
+            NotificationLog.query
+            .outerjoin(Borrow, Borrow.id == NotificationLog.borrow_id)
+            .outerjoin(User, User.id == Borrow.user_id)
+            .outerjoin(Book, Book.id == Borrow.book_id)
+        )
+        return keyset_page(q, field_map, fields, [NotificationLog.sent_at, NotificationLog.id], cursor, limit)
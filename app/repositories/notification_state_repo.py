@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.models.notification_state import NotificationState
+from app.extensions import db
+from app.utils.upsert import insert_ignore
+
+
+# "bir daha asla": tek seferlik bildirimler için (MSSQL DATETIME üst sınırı)
+NEVER = datetime(9999, 12, 31)
+
+# MSSQL tek sorguda en fazla 2100 parametre kabul eder
+_IN_CHUNK = 1000
+
+
+class NotificationStateRepo:
+    @staticmethod
+    def claim(borrow_ids: list[int], notif_type: str, now: datetime, repeat: timedelta | None) -> set[int]:
+        """
+        borrow_ids içinden şu an bildirim gönderilebilecekleri atomik olarak claim eder.
+        - Durumu olmayanlar: insert-or-ignore
+        - next_eligible_at <= now olanlar: koşullu UPDATE
+        - repeat None ise tek seferlik (next_eligible_at = NEVER)
+        Commit yapmaz; claim, outbox kaydıyla aynı transaction'da kalmalı.
+        return: claim edilen borrow id'leri
+        """
+        if not borrow_ids:
+            return set()
+
+        token = uuid.uuid4().hex
+        next_at = now + repeat if repeat is not None else NEVER
+        state = NotificationState.__table__
+        claimed = set()
+
+        for i in range(0, len(borrow_ids), _IN_CHUNK):
+            part = borrow_ids[i:i + _IN_CHUNK]
+
+            # 1) chunk'ın mevcut durumları tek sorguda
+            known = {
+                r[0] for r in db.session.query(NotificationState.borrow_id)
+                .filter(NotificationState.type == notif_type, NotificationState.borrow_id.in_(part))
+                .all()
+            }
+
+            # 2) hiç gönderilmemişler
+            insert_ignore(state, [
+                {
+                    "borrow_id": bid,
+                    "type": notif_type,
+                    "last_sent_at": now,
+                    "next_eligible_at": next_at,
+                    "send_count": 1,
+                    "claim_token": token,
+                }
+                for bid in part if bid not in known
+            ], ["borrow_id", "type"])
+
+            # 3) süresi dolanlar
+            if known:
+                db.session.execute(
+                    state.update()
+                    .where(
+                        state.c.type == notif_type,
+                        state.c.borrow_id.in_(list(known)),
+                        state.c.next_eligible_at <= now,
+                    )
+                    .values(
+                        last_sent_at=now,
+                        next_eligible_at=next_at,
+                        send_count=state.c.send_count + 1,
+                        claim_token=token,
+                    )
+                )
+
+            # 4) bu koşunun aldıkları
+            claimed.update(
+                r[0] for r in db.session.query(NotificationState.borrow_id)
+                .filter(
+                    NotificationState.type == notif_type,
+                    NotificationState.borrow_id.in_(part),
+                    NotificationState.claim_token == token,
+                )
+                .all()
+            )
+
+        return claimed
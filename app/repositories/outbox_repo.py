@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text, or_, and_
+
+from app.models.mail_outbox import MailOutbox
+from app.models.mail_outbox_item import MailOutboxItem
+from app.extensions import db
+
+
+# MSSQL: READPAST ile başka worker'ın kilitlediği satırlar atlanır (SKIP LOCKED karşılığı)
+_CLAIM_MSSQL = """
+WITH cte AS (
+    SELECT TOP (:n) *
+    FROM dbo.mail_outbox WITH (UPDLOCK, READPAST, ROWLOCK)
+    WHERE (status = 'pending' AND next_attempt_at <= :now)
+       OR (status = 'sending' AND locked_until < :now)
+    ORDER BY next_attempt_at, id
+)
+UPDATE cte
+SET status = 'sending', locked_until = :lease
+OUTPUT inserted.id;
+"""
+
+_CLAIM_POSTGRES = """
+UPDATE mail_outbox
+SET status = 'sending', locked_until = :lease
+WHERE id IN (
+    SELECT id FROM mail_outbox
+    WHERE (status = 'pending' AND next_attempt_at <= :now)
+       OR (status = 'sending' AND locked_until < :now)
+    ORDER BY next_attempt_at, id
+    LIMIT :n
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING id;
+"""
+
+
+class OutboxRepo:
+    @staticmethod
+    def enqueue(borrow_id, notif_type: str, to_email: str, subject: str, body: str, items=None) -> MailOutbox:
+        """
+        Commit yapmaz: çağıranın transaction'ına dahil olur.
+        items: özet mail için kapsanan (borrow_id, notif_type) listesi
+        """
+        row = MailOutbox(
+            borrow_id=borrow_id,
+            notif_type=notif_type,
+            to_email=to_email,
+            subject=subject,
+            body=body,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        db.session.add(row)
+        if items:
+            row.items = [MailOutboxItem(borrow_id=bid, notif_type=t) for bid, t in items]
+        return row
+
+    @staticmethod
+    def _claimable(now: datetime):
+        return or_(
+            and_(MailOutbox.status == "pending", MailOutbox.next_attempt_at <= now),
+            and_(MailOutbox.status == "sending", MailOutbox.locked_until < now),
+        )
+
+    @staticmethod
+    def claim_batch(n: int, now: datetime, lease_seconds: int) -> list[dict]:
+        """
+        En fazla n mesajı "sending" durumuna alır ve hemen commit eder (kısa transaction).
+        Aynı anda çalışan worker'lar birbirinin satırını almaz; lease süresi dolan
+        "sending" kayıtları (worker çöktüyse) tekrar alınabilir.
+        return: SMTP sırasında DB'ye dokunmamak için düz dict listesi
+        """
+        lease = now + timedelta(seconds=lease_seconds)
+        params = {"n": int(n), "now": now, "lease": lease}
+        dialect = db.engine.dialect.name
+
+        if dialect == "mssql":
+            ids = [r[0] for r in db.session.execute(text(_CLAIM_MSSQL), params).fetchall()]
+        elif dialect == "postgresql":
+            ids = [r[0] for r in db.session.execute(text(_CLAIM_POSTGRES), params).fetchall()]
+        else:
+            # SQLite vb.: yazıcılar zaten seri; aday id'leri koşullu UPDATE ile al
+            candidates = [
+                r[0] for r in db.session.query(MailOutbox.id)
+                .filter(OutboxRepo._claimable(now))
+                .order_by(MailOutbox.next_attempt_at, MailOutbox.id)
+                .limit(n)
+                .all()
+            ]
+            ids = []
+            if candidates:
+                MailOutbox.query.filter(
+                    MailOutbox.id.in_(candidates), OutboxRepo._claimable(now)
+                ).update({"status": "sending", "locked_until": lease}, synchronize_session=False)
+                ids = [
+                    r[0] for r in db.session.query(MailOutbox.id)
+                    .filter(MailOutbox.id.in_(candidates), MailOutbox.locked_until == lease)
+                    .all()
+                ]
+
+        batch = []
+        if ids:
+            rows = (
+                db.session.query(
+                    MailOutbox.id, MailOutbox.borrow_id, MailOutbox.notif_type,
+                    MailOutbox.to_email, MailOutbox.subject, MailOutbox.body, MailOutbox.attempts
+                )
+                .filter(MailOutbox.id.in_(ids))
+                .order_by(MailOutbox.id)
+                .all()
+            )
+            batch = [dict(r._mapping, items=[]) for r in rows]
+
+            # özet mailler: kapsanan borrow'lar tek sorguda
+            by_id = {m["id"]: m for m in batch}
+            items = (
+                db.session.query(MailOutboxItem.outbox_id, MailOutboxItem.borrow_id, MailOutboxItem.notif_type)
+                .filter(MailOutboxItem.outbox_id.in_(ids))
+                .all()
+            )
+            for outbox_id, borrow_id, notif_type in items:
+                by_id[outbox_id]["items"].append((borrow_id, notif_type))
+        db.session.commit()
+        return batch
+
+    @staticmethod
+    def mark_sent(msg_id: int, now: datetime):
+        MailOutbox.query.filter_by(id=msg_id).update({
+            "status": "sent",
+            "sent_at": now,
+            "attempts": MailOutbox.attempts + 1,
+            "locked_until": None,
+            "last_error": None,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def mark_retry(msg_id: int, next_attempt_at: datetime, error: str | None):
+        MailOutbox.query.filter_by(id=msg_id).update({
+            "status": "pending",
+            "attempts": MailOutbox.attempts + 1,
+            "next_attempt_at": next_attempt_at,
+            "locked_until": None,
+            "last_error": (error or "")[:500] or None,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def mark_failed(msg_id: int, error: str | None):
+        MailOutbox.query.filter_by(id=msg_id).update({
+            "status": "failed",
+            "attempts": MailOutbox.attempts + 1,
+            "locked_until": None,
+            "last_error": (error or "")[:500] or None,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def release(msg_ids: list[int]):
+        """
+        Denenmeden bırakılan mesajlar (breaker açık / süre bütçesi doldu) tekrar pending olur.
+        attempts artmaz, hata sayılmaz.
+        """
+        if not msg_ids:
+            return
+        MailOutbox.query.filter(MailOutbox.id.in_(msg_ids)).update({
+            "status": "pending",
+            "locked_until": None,
+        }, synchronize_session=False)
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, and_
+
+from app.models.job_partition import JobPartition
+from app.extensions import db
+
+
+class PartitionRepo:
+    @staticmethod
+    def create_run(job_name: str, ranges: list[tuple[int, int]]):
+        """Yeni koşu: önceki koşunun partition'ları silinir. Commit çağıranda."""
+        JobPartition.query.filter_by(job_name=job_name).delete(synchronize_session=False)
+        db.session.add_all([
+            JobPartition(
+                job_name=job_name, part_no=i, user_id_from=lo, user_id_to=hi,
+                status="pending", last_id=0, rows_done=0, attempts=0
+            )
+            for i, (lo, hi) in enumerate(ranges)
+        ])
+
+    @staticmethod
+    def _claimable(now: datetime, max_attempts: int):
+        return and_(
+            JobPartition.attempts < max_attempts,
+            or_(
+                JobPartition.status == "pending",
+                and_(JobPartition.status == "running", JobPartition.locked_until < now),
+            ),
+        )
+
+    @staticmethod
+    def claim_next(job_name: str, owner: str, now: datetime, lease_seconds: int,
+                   max_attempts: int) -> dict | None:
+        """
+        Sıradaki boş (veya lease'i dolmuş) partition'ı koşullu UPDATE ile alır ve commit eder.
+        Aynı partition'ı iki worker alamaz (rowcount kontrolü). Her claim bir deneme sayılır.
+        """
+        candidates = [
+            r[0] for r in db.session.query(JobPartition.part_no)
+            .filter(JobPartition.job_name == job_name, PartitionRepo._claimable(now, max_attempts))
+            .order_by(JobPartition.part_no.asc())
+            .all()
+        ]
+        for part_no in candidates:
+            claimed = JobPartition.query.filter(
+                JobPartition.job_name == job_name,
+                JobPartition.part_no == part_no,
+                PartitionRepo._claimable(now, max_attempts),
+            ).update({
+                "status": "running",
+                "attempts": JobPartition.attempts + 1,
+                "owner": owner,
+                "locked_until": now + timedelta(seconds=lease_seconds),
+                "started_at": db.func.coalesce(JobPartition.started_at, now),
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed == 1:
+                p = db.session.get(JobPartition, (job_name, part_no))
+                return {
+                    "part_no": p.part_no,
+                    "user_id_from": p.user_id_from,
+                    "user_id_to": p.user_id_to,
+                    "last_id": p.last_id,
+                }
+        return None
+
+    @staticmethod
+    def progress(job_name: str, part_no: int, last_id: int, rows: int, locked_until: datetime):
+        """Chunk sonunda: ilerleme + lease uzatma. Commit chunk ile aynı transaction'da."""
+        JobPartition.query.filter_by(job_name=job_name, part_no=part_no).update({
+            "last_id": last_id,
+            "rows_done": JobPartition.rows_done + rows,
+            "locked_until": locked_until,
+        }, synchronize_session=False)
+
+    @staticmethod
+    def finish(job_name: str, part_no: int, now: datetime):
+        p = db.session.get(JobPartition, (job_name, part_no))
+        p.status = "done"
+        p.locked_until = None
+        p.finished_at = now
+        if p.started_at:
+            p.duration_ms = int((now - p.started_at).total_seconds() * 1000)
+
+    @staticmethod
+    def fail(job_name: str, part_no: int, error: str, max_attempts: int):
+        """
+        Hata: deneme hakkı kaldıysa pending'e döner (ilerlemesi korunur, tekrar claim edilir),
+        yoksa failed. Commit çağıranda.
+        """
+        p = db.session.get(JobPartition, (job_name, part_no))
+        p.status = "failed" if p.attempts >= max_attempts else "pending"
+        p.locked_until = None
+        p.last_error = error[:500]
+
+    @staticmethod
+    def fail_exhausted(job_name: str, now: datetime, max_attempts: int):
+        """Deneme hakkı bitmiş ve lease'i dolmuş (process'i ölmüş) partition'lar failed olur. Commit çağıranda."""
+        JobPartition.query.filter(
+            JobPartition.job_name == job_name,
+            JobPartition.status == "running",
+            JobPartition.locked_until < now,
+            JobPartition.attempts >= max_attempts,
+        ).update({"status": "failed", "locked_until": None}, synchronize_session=False)
+
+    @staticmethod
+    def counts(job_name: str) -> dict:
+        """status -> partition sayısı; koşu pending / running kalmayınca biter (failed'ler raporlanır)."""
+        rows = (
+            db.session.query(JobPartition.status, db.func.count(JobPartition.part_no))
+            .filter(JobPartition.job_name == job_name)
+            .group_by(JobPartition.status)
+            .all()
+        )
+        return {status: int(n) for status, n in rows}
+
+    @staticmethod
+    def status(job_name: str) -> list[dict]:
+        rows = JobPartition.query.filter_by(job_name=job_name).order_by(JobPartition.part_no.asc()).all()
+        return [
+            {
+                "part_no": p.part_no,
+                "user_id_from": p.user_id_from,
+                "user_id_to": p.user_id_to,
+                "status": p.status,
+                "attempts": p.attempts,
+                "last_error": p.last_error,
+                "owner": p.owner,
+                "rows_done": p.rows_done,
+                "started_at": p.started_at.isoformat() if p.started_at else None,
+                "finished_at": p.finished_at.isoformat() if p.finished_at else None,
+                "duration_ms": p.duration_ms,
+            }
+            for p in rows
+        ]
@@ -0,0 +1,30 @@
+from sqlalchemy import false
+
+from app.models.penalty import Penalty
+from app.models.borrow import Borrow
+from app.models.user import User
+from app.utils.pagination import keyset_page, DEFAULT_LIMIT
+
+class PenaltyRepo:
+    @staticmethod
+    def list_page(field_map: dict, fields: list, cursor=None, limit: int = DEFAULT_LIMIT):
+        """
+        Tüm cezalar, id DESC keyset sayfalama.
+        return: (data, next_cursor)
+        """
+        return keyset_page(Penalty.query, field_map, fields, [Penalty.id], cursor, limit)
+
+    @staticmethod
+    def admin_page(field_map: dict, fields: list, cursor=None, limit: int = DEFAULT_LIMIT, only_unpaid: bool = False):
+        """
+        Admin ceza listesi (Penalty + Borrow + User), updated_at DESC, id DESC.
+        return: (data, next_cursor)
+        """
+        q = (
+            Penalty.query
+            .join(Borrow, Borrow.id == Penalty.borrow_id)
+            .outerjoin(User, User.id == Borrow.user_id)
+        )
+        if only_unpaid:
+            q = q.filter(Penalty.is_paid == false())  # MSSQL uyumlu
+        return keyset_page(q, field_map, fields, [Penalty.updated_at, Penalty.id], cursor, limit)
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+from app.models.borrow import Borrow
+from app.models.resource_version import ResourceVersion
+from app.extensions import db
+from app.utils.upsert import insert_ignore
+
+
+# katalog listeleri: kitap ekleme / güncelleme / silme ve stok (ödünç / iade)
+BOOKS = "books"
+# kullanıcının /borrow/my ve /penalties/my listeleri: ödünç, iade, gecikme, ceza, ödeme
+LOANS = "loans"
+
+GLOBAL_SCOPE = 0
+
+
+class ResourceVersionRepo:
+    @staticmethod
+    def bump(resource: str, scope_ids=(GLOBAL_SCOPE,)):
+        """
+        Eksik satırlar 0 ile eklenir, sonra version = version + 1 (eşzamanlı yazıcılar ezişmez).
+        scope_id'ler sıralı güncellenir (kilit sırası sabit). Commit yapmaz: yazımla aynı transaction.
+        """
+        ids = sorted({int(i) for i in scope_ids if i is not None})
+        if not ids:
+            return
+        now = datetime.utcnow()
+        t = ResourceVersion.__table__
+        insert_ignore(
+            t,
+            [{"resource": resource, "scope_id": i, "version": 0, "updated_at": now} for i in ids],
+            ["resource", "scope_id"],
+        )
+        db.session.execute(
+            t.update()
+            .where(t.c.resource == resource, t.c.scope_id == bindparam("b_scope"))
+            .values(version=t.c.version + 1, updated_at=now),
+            [{"b_scope": i} for i in ids],
+        )
+
+    @staticmethod
+    def bump_borrowers(book_id: int):
+        """Kitabın başlığı değişti / silindi: onu ödünç almış kullanıcıların listeleri de değişti."""
+        user_ids = [
+            r[0] for r in db.session.query(Borrow.user_id).filter(Borrow.book_id == book_id).distinct()
+        ]
+        ResourceVersionRepo.bump(LOANS, user_ids)
+
+    @staticmethod
+    def version(resource: str, scope_id: int = GLOBAL_SCOPE) -> tuple[int, datetime | None]:
+        """
+        Tek PK lookup. return: (sürüm, son değişiklik zamanı)
+        Satır yoksa kaynak hiç yazılmamıştır: sürüm 0, zaman yok.
+        """
+        row = (
+            db.session.query(ResourceVersion.version, ResourceVersion.updated_at)
+            .filter(ResourceVersion.resource == resource, ResourceVersion.scope_id == scope_id)
+            .first()
+        )
+        return (int(row.version), row.updated_at) if row else (0, None)
+
+    @staticmethod
+    def tag_of(resource: str, scope_id: int, version: int) -> str:
+        return f"{resource}.{scope_id}.{version}"
+
+    @staticmethod
+    def tag(resource: str, scope_id: int = GLOBAL_SCOPE) -> tuple[str, datetime | None]:
+        """return: (ETag tabanı, Last-Modified)"""
+        version, updated_at = ResourceVersionRepo.version(resource, scope_id)
+        return ResourceVersionRepo.tag_of(resource, scope_id, version), updated_at
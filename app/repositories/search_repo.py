@@ -0,0 +1,182 @@
+from sqlalchemy import bindparam, case, func, literal, select
+
+from app.models.book import Book
+from app.models.search_posting import SearchPosting
+from app.models.search_term import SearchTerm
+from app.extensions import db
+from app.repositories.counter_repo import CounterRepo
+from app.utils.text_search import BM25_K1, BM25_B, bm25_tf
+from app.utils.upsert import insert_ignore
+
+
+# MSSQL tek sorguda en fazla 2100 parametre kabul eder
+_IN_CHUNK = 1000
+
+
+class SearchRepo:
+    @staticmethod
+    def postings_of(book_id: int) -> dict[str, int]:
+        rows = (
+            db.session.query(SearchPosting.token, SearchPosting.tf)
+            .filter(SearchPosting.book_id == book_id)
+            .all()
+        )
+        return {token: tf for token, tf in rows}
+
+    @staticmethod
+    def _adjust_df(tokens: list[str], delta: int):
+        t = SearchTerm.__table__
+        if delta > 0:
+            insert_ignore(t, [{"token": tok, "df": 0} for tok in tokens], ["token"])
+        db.session.execute(
+            t.update().where(t.c.token == bindparam("b_token")).values(df=t.c.df + delta),
+            [{"b_token": tok} for tok in tokens],
+        )
+        if delta < 0:
+            # hiçbir kitapta geçmeyen token sözlükte kalmasın (öneri / prefix aramada çıkmasın)
+            for i in range(0, len(tokens), _IN_CHUNK):
+                db.session.execute(t.delete().where(t.c.token.in_(tokens[i:i + _IN_CHUNK]), t.c.df <= 0))
+
+    @staticmethod
+    def apply(book_id: int, old: dict[str, int], new: dict[str, int], avgdl: float):
+        """
+        Kitabın posting'lerini old -> new farkı kadar günceller (df ve toplam token sayacı dahil).
+        Commit yapmaz: kitap yazmasıyla aynı transaction'da kalmalı.
+        """
+        p = SearchPosting.__table__
+        old_len, new_len = sum(old.values()), sum(new.values())
+        removed = [tok for tok in old if tok not in new]
+        added = [tok for tok in new if tok not in old]
+        # uzunluk değiştiyse kalan tüm posting'lerin doc_len / impact'i değişir
+        changed = [
+            tok for tok in new
+            if tok in old and (old[tok] != new[tok] or new_len != old_len)
+        ]
+
+        for i in range(0, len(removed), _IN_CHUNK):
+            db.session.execute(p.delete().where(p.c.book_id == book_id, p.c.token.in_(removed[i:i + _IN_CHUNK])))
+        if added:
+            db.session.execute(p.insert(), [
+                {"token": tok, "book_id": book_id, "tf": new[tok], "doc_len": new_len,
+                 "impact": bm25_tf(new[tok], new_len, avgdl)}
+                for tok in added
+            ])
+        if changed:
+            db.session.execute(
+                p.update().where(p.c.book_id == book_id, p.c.token == bindparam("b_token"))
+                .values(tf=bindparam("b_tf"), doc_len=new_len, impact=bindparam("b_impact")),
+                [{"b_token": tok, "b_tf": new[tok], "b_impact": bm25_tf(new[tok], new_len, avgdl)}
+                 for tok in changed],
+            )
+
+        if added:
+            SearchRepo._adjust_df(added, +1)
+        if removed:
+            SearchRepo._adjust_df(removed, -1)
+        CounterRepo.add({"search_token_total": new_len - old_len})
+
+    @staticmethod
+    def dfs(tokens: list[str]) -> dict[str, int]:
+        rows = db.session.query(SearchTerm.token, SearchTerm.df).filter(SearchTerm.token.in_(tokens)).all()
+        return {token: df for token, df in rows}
+
+    @staticmethod
+    def terms_with_prefix(prefix: str, limit: int) -> list[tuple[str, int]]:
+        """
+        Sözlük PK'sında range okuma: prefix <= token < prefix'in ardılı (SQLite'ta LIKE büyük/küçük
+        harf duyarsız olduğu için index kullanmaz). En yaygınlar önce.
+        """
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = (
+            db.session.query(SearchTerm.token, SearchTerm.df)
+            .filter(SearchTerm.token >= prefix, SearchTerm.token < upper, SearchTerm.df > 0)
+            .order_by(SearchTerm.df.desc(), SearchTerm.token)
+            .limit(limit)
+            .all()
+        )
+        return [(token, df) for token, df in rows]
+
+    @staticmethod
+    def rank(weights: dict[str, float], avgdl: float, limit: int, offset: int) -> list[tuple[int, float]]:
+        """
+        Tam BM25: sum(w(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avgdl))).
+        weights: token -> idf (x prefix ağırlığı). Sorgu token'larının tüm posting'leri okunur.
+        return: (book_id, score) sırası score DESC, book_id
+        """
+        P = SearchPosting
+        k1, b = BM25_K1, BM25_B
+        tf = P.tf * literal(1.0)
+        norm = tf * (k1 + 1) / (tf + k1 * (1 - b + b * P.doc_len / avgdl))
+        weight = case(weights, value=P.token, else_=0.0)
+        score = func.sum(weight * norm).label("score")
+        rows = db.session.execute(
+            select(P.book_id, score)
+            .where(P.token.in_(list(weights)))
+            .group_by(P.book_id)
+            .order_by(score.desc(), P.book_id)
+            .limit(limit)
+            .offset(offset)
+        ).all()
+        return [(int(bid), float(s)) for bid, s in rows]
+
+    @staticmethod
+    def top_by_impact(token: str, m: int) -> list[int]:
+        """Token'ın en yüksek impact'li m posting'i (ix_search_postings_token_impact range; m satır)."""
+        rows = (
+            db.session.query(SearchPosting.book_id)
+            .filter(SearchPosting.token == token)
+            .order_by(SearchPosting.impact.desc())
+            .limit(m)
+            .all()
+        )
+        return [r[0] for r in rows]
+
+    @staticmethod
+    def postings_for(tokens: list[str], book_ids: list[int]) -> list[tuple[str, int, int, int]]:
+        """Aday kitapların sorgu token'larındaki posting'leri: (token, book_id, tf, doc_len)."""
+        out = []
+        for i in range(0, len(book_ids), _IN_CHUNK):
+            out.extend(
+                db.session.query(SearchPosting.token, SearchPosting.book_id, SearchPosting.tf, SearchPosting.doc_len)
+                .filter(SearchPosting.token.in_(tokens), SearchPosting.book_id.in_(book_ids[i:i + _IN_CHUNK]))
+                .all()
+            )
+        return [tuple(r) for r in out]
+
+    @staticmethod
+    def recompute_impacts(avgdl: float):
+        """Rebuild sonunda: tüm impact'leri güncel ortalama uzunlukla yeniden yazar. Commit çağıranda."""
+        P = SearchPosting.__table__
+        k1, b = BM25_K1, BM25_B
+        tf = P.c.tf * literal(1.0)
+        db.session.execute(
+            P.update().values(impact=tf * (k1 + 1) / (tf + k1 * (1 - b + b * P.c.doc_len / avgdl)))
+        )
+
+    @staticmethod
+    def books_by_ids(ids: list[int]) -> dict[int, dict]:
+        if not ids:
+            return {}
+        rows = (
+            db.session.query(Book.id, Book.title, Book.author, Book.isbn, Book.available_copies)
+            .filter(Book.id.in_(ids))
+            .all()
+        )
+        return {r.id: dict(r._mapping) for r in rows}
+
+    @staticmethod
+    def clear():
+        """Rebuild öncesi; commit çağıranda."""
+        SearchPosting.query.delete(synchronize_session=False)
+        SearchTerm.query.delete(synchronize_session=False)
+
+    @staticmethod
+    def bulk_insert(postings: list[dict]):
+        if postings:
+            db.session.execute(SearchPosting.__table__.insert(), postings)
+
+    @staticmethod
+    def bulk_insert_terms(df: dict[str, int]):
+        rows = [{"token": tok, "df": n} for tok, n in df.items()]
+        for i in range(0, len(rows), _IN_CHUNK):
+            db.session.execute(SearchTerm.__table__.insert(), rows[i:i + _IN_CHUNK])
@@ -1,11 +1,35 @@
+from flask import g
+
 from app.models.book import Book
 from app.repositories.book_repo import BookRepo
+from app.repositories.counter_repo import CounterRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, BOOKS, GLOBAL_SCOPE
+from app.services.facet_service import FacetService
+from app.services.search_service import SearchService
+from app.services.suggest_service import SuggestService
 
 class BookService:
     @staticmethod
     def list_books():
         return BookRepo.list_all()
 
+    @staticmethod
+    def list_tag():
+        """
+        Katalog listelerinin conditional_get lookup'ı. Okunan books sürümü g'ye de yazılır;
+        list_books_page sayfayı bu sürümle eşleşen cache'ten / snapshot'tan verir (ETag ile gövde aynı sürüm).
+        """
+        version, updated_at = ResourceVersionRepo.version(BOOKS)
+        g.books_version = version
+        return ResourceVersionRepo.tag_of(BOOKS, GLOBAL_SCOPE, version), updated_at
+
+    @staticmethod
+    def list_books_page(field_map: dict, fields: list, cursor=None, limit: int = 50,
+                        author: str | None = None, available: bool | None = None):
+        return BookRepo.list_page(
+            field_map, fields, cursor, limit, author, available, books_version=g.get("books_version")
+        )
+
     @staticmethod
     def get_book(book_id: int):
         book = BookRepo.get(book_id)
@@ -13,6 +37,14 @@ class BookService:
             raise ValueError("Kitap bulunamadı")
         return book
 
+    @staticmethod
+    def get_book_data(book_id: int) -> dict:
+        """Salt okunur (cache'ten dict); değiştirilecekse get_book kullanılır."""
+        book = BookRepo.get_cached(book_id)
+        if not book:
+            raise ValueError("Kitap bulunamadı")
+        return book
+
     @staticmethod
     def create_book(data: dict):
         book = Book(
@@ -24,11 +56,22 @@ class BookService:
         )
         if book.available_copies > book.total_copies:
             book.available_copies = book.total_copies
-        return BookRepo.create(book)
+        BookRepo.add(book)
+        SearchService.index_book(book)
+        CounterRepo.add({"total_books": 1, "total_copies": book.total_copies})
+        ResourceVersionRepo.bump(BOOKS)
+        change = SuggestService.stage_save(book)
+        BookRepo.update()
+        SuggestService.apply(change)
+        FacetService.catalog_changed()
+        BookRepo.invalidate(book.id)
+        return book
 
     @staticmethod
     def update_book(book_id: int, data: dict):
         book = BookService.get_book(book_id)
+        old_total = book.total_copies or 0
+        old_title = book.title
         for k in ["title", "author", "isbn"]:
             if k in data:
                 setattr(book, k, data[k])
@@ -41,10 +84,28 @@ class BookService:
         if book.available_copies > book.total_copies:
             book.available_copies = book.total_copies
 
+        SearchService.index_book(book)
+        CounterRepo.add({"total_copies": book.total_copies - old_total})
+        ResourceVersionRepo.bump(BOOKS)
+        if book.title != old_title:
+            # ödünç listeleri kitap başlığını gösterir
+            ResourceVersionRepo.bump_borrowers(book.id)
+        change = SuggestService.stage_save(book)
         BookRepo.update()
+        SuggestService.apply(change)
+        FacetService.catalog_changed()
+        BookRepo.invalidate(book_id)
         return book
 
     @staticmethod
     def delete_book(book_id: int):
         book = BookService.get_book(book_id)
+        SearchService.remove_book(book.id)
+        CounterRepo.add({"total_books": -1, "total_copies": -(book.total_copies or 0)})
+        ResourceVersionRepo.bump(BOOKS)
+        ResourceVersionRepo.bump_borrowers(book.id)
+        change = SuggestService.stage_delete(book.id)
         BookRepo.delete(book)
+        SuggestService.apply(change)
+        FacetService.catalog_changed()
+        BookRepo.invalidate(book_id)
@@ -6,6 +6,10 @@ from flask_jwt_extended import get_jwt_identity, get_jwt
 from app.extensions import db
 from app.repositories.book_repo import BookRepo
 from app.repositories.borrow_repo import BorrowRepo
+from app.repositories.counter_repo import CounterRepo, OVERDUE_STATUSES
+from app.repositories.resource_version_repo import ResourceVersionRepo, BOOKS, LOANS
+from app.services.facet_service import FacetService
+from app.services.leaderboard_service import LeaderboardService
 from app.models.borrow import Borrow
 from app.models.penalty import Penalty
 
@@ -38,13 +42,20 @@ class BorrowService:
         overdue_days = BorrowService._compute_overdue_days(borrow.due_date)
 
         p = Penalty.query.filter_by(borrow_id=borrow.id).first()
+        before = p.amount if p and not p.is_paid else None
 
+        p = BorrowService._upsert_penalty_values(p, borrow, overdue_days)
+        after = p.amount if p and not p.is_paid else None
+        CounterRepo.add(CounterRepo.unpaid_penalty_delta(before, after))
+
+    @staticmethod
+    def _upsert_penalty_values(p, borrow: Borrow, overdue_days: int):
         if overdue_days <= 0:
             # gecikme yoksa: varsa sıfırla (istersen dokunmayabiliriz)
             if p and not p.is_paid:
                 p.days_overdue = 0
                 p.amount = Decimal("0.00")
-            return
+            return p
 
         if not p:
             # yeni penalty oluştur
@@ -65,6 +76,7 @@ class BorrowService:
             p.days_overdue = overdue_days
             p.amount = amount
             # p.is_paid aynen kalır
+        return p
 
     @staticmethod
     def borrow_book(book_id: int, days: int = 14):
@@ -95,11 +107,21 @@ class BorrowService:
             status="active"
         )
 
-        # transaction gibi davranması için tek commit noktası
+        # transaction gibi davranması için tek commit noktası (sayaç da aynı transaction'da)
+        CounterRepo.add({"active_borrows": 1})
+        LeaderboardService.record_borrow(book_id)
+        ResourceVersionRepo.bump(BOOKS)
+        ResourceVersionRepo.bump(LOANS, [user_id])
+        emptied = book.available_copies == 0
         BorrowRepo.create(borrow)
         BookRepo.update()
         BorrowRepo.commit()  # commit yoksa borrows kaydı db’ye yazılmayabilir
 
+        # müsaitlik facet'i sadece son kopya gidince değişir
+        if emptied:
+            FacetService.availability_changed()
+        BookRepo.invalidate(book_id)
+
         return borrow
 
     @staticmethod
@@ -117,11 +139,17 @@ class BorrowService:
         if borrow.returned_at is not None:
             raise ValueError("Bu kitap zaten iade edilmiş")
 
+        CounterRepo.add({
+            "active_borrows": -1,
+            "overdue_borrows": -1 if borrow.status in OVERDUE_STATUSES else 0,
+        })
         borrow.returned_at = datetime.utcnow()
         borrow.status = "returned"
 
         # stok iade
-        book = BookRepo.get(borrow.book_id)
+        book_id = borrow.book_id
+        book = BookRepo.get(book_id)
+        was_empty = bool(book) and book.available_copies == 0
         if book:
             # min(total, available+1)
             if book.total_copies is not None and book.available_copies is not None:
@@ -131,10 +159,16 @@ class BorrowService:
 
         # penalty create/update (senin modeline göre)
         BorrowService._upsert_penalty_for_borrow(borrow)
+        ResourceVersionRepo.bump(BOOKS)
+        ResourceVersionRepo.bump(LOANS, [borrow.user_id])
 
         # tek commit
         BorrowRepo.commit()
         BookRepo.update()
         db.session.commit()  # penalty db.session ile eklendiği için garanti olsun
 
+        if was_empty:
+            FacetService.availability_changed()
+        BookRepo.invalidate(book_id)
+
         return borrow
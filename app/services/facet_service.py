@@ -0,0 +1,73 @@
+# app/services/facet_service.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.book_repo import BookRepo
+from app.utils.snapshot_cache import SnapshotCache
+
+
+# Process genelinde facet snapshot'ları. Yazar dağılımı sadece katalog yazımlarında değişir;
+# müsaitlik ödünç / iadede de değiştiği için ayrı cache (ödünç yazar facet'ini yeniden hesaplatmasın)
+author_facets_cache = SnapshotCache("author_facets")
+availability_facets_cache = SnapshotCache("availability_facets")
+
+
+def _get(cache: SnapshotCache, name: str, query):
+    app = current_app._get_current_object()
+    cache.configure(
+        app.config.get("FACETS_TTL_SECONDS", 60),
+        app.config.get("FACETS_MAX_STALE_SECONDS", 300),
+    )
+
+    def _load():
+        # arka plan thread'inde de çalışır: kendi app context'i / session'ı
+        with app.app_context():
+            try:
+                return dict(query(app), generated_at=datetime.utcnow().isoformat())
+            except Exception as e:
+                db.session.rollback()
+                app.logger.warning(f"[facets] {name} yüklenemedi: {e}")
+                raise
+
+    return cache.get(_load)
+
+
+def _authors(app) -> dict:
+    rows, distinct = BookRepo.author_facets(app.config.get("FACETS_AUTHOR_LIMIT", 100))
+    return {"authors": [{"author": a, "count": n} for a, n in rows], "total_authors": distinct}
+
+
+def _availability(app) -> dict:
+    return BookRepo.availability_facets()
+
+
+class FacetService:
+    @staticmethod
+    def facets(author_limit: int) -> tuple[dict, float]:
+        """
+        return: (yazar + müsaitlik bucket'ları, en eski snapshot'ın yaşı saniye)
+        Gruplu sorgular FACETS_TTL_SECONDS'ta bir (ya da invalidate sonrası ilk istekte) çalışır.
+        Invalidation process içidir; diğer process'ler en geç TTL sonunda yeni değeri görür.
+        """
+        authors, authors_age = _get(author_facets_cache, "authors", _authors)
+        availability, availability_age = _get(availability_facets_cache, "availability", _availability)
+        return {
+            "authors": authors["authors"][:author_limit],
+            "total_authors": authors["total_authors"],
+            "availability": {k: v for k, v in availability.items() if k != "generated_at"},
+        }, max(authors_age, availability_age)
+
+    @staticmethod
+    def catalog_changed():
+        """Kitap eklendi / güncellendi / silindi (commit sonrası)."""
+        author_facets_cache.invalidate()
+        availability_facets_cache.invalidate()
+
+    @staticmethod
+    def availability_changed():
+        """Ödünç / iade bir kitabın müsaitliğini değiştirdi (commit sonrası)."""
+        availability_facets_cache.invalidate()
@@ -0,0 +1,82 @@
+# app/services/leaderboard_service.py
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.leaderboard_repo import LeaderboardRepo, BOARDS, BOOKS_BORROWED, USERS_OVERDUE
+from app.utils.snapshot_cache import SnapshotCache
+
+
+# kayan pencereler: bugün dahil son N gün
+WINDOWS = {"day": 1, "week": 7, "month": 30}
+
+# (board, window) başına bellekte top-K; bucket tablosundan TTL ile yenilenir
+_caches: dict[tuple[str, str], SnapshotCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _cache(board: str, window: str) -> SnapshotCache:
+    with _caches_lock:
+        cache = _caches.get((board, window))
+        if cache is None:
+            cache = _caches[(board, window)] = SnapshotCache(f"leaderboard-{board}-{window}")
+        return cache
+
+
+class LeaderboardService:
+    @staticmethod
+    def record_borrow(book_id: int, now: datetime | None = None):
+        """Ödünç açıldığında; commit yapmaz (ödünçle aynı transaction)."""
+        LeaderboardRepo.bump(BOOKS_BORROWED, (now or datetime.utcnow()).date(), {book_id: 1})
+
+    @staticmethod
+    def record_overdue(borrows):
+        """
+        Bu koşuda ilk kez gecikmiş işaretlenen ödünçler; commit yapmaz.
+        Bucket günü = vade günü (tespit günü değil): LeaderboardRepo.rebuild ile aynı kural,
+        job'un ne zaman çalıştığı sonucu değiştirmez.
+        """
+        per_day: dict = {}
+        for b in borrows:
+            per_user = per_day.setdefault(b.due_date.date(), {})
+            per_user[b.user_id] = per_user.get(b.user_id, 0) + 1
+        for day in sorted(per_day):
+            LeaderboardRepo.bump(USERS_OVERDUE, day, per_day[day])
+
+    @staticmethod
+    def top(board: str, window: str) -> tuple[list[dict], float]:
+        """
+        return: (ilk LEADERBOARD_TOP_K kayıt, snapshot yaşı saniye)
+        Bellekteki liste LEADERBOARD_TTL_SECONDS boyunca döner; istek maliyeti O(K).
+        """
+        if board not in BOARDS:
+            raise ValueError(f"Geçersiz board: {board}")
+        if window not in WINDOWS:
+            raise ValueError(f"Geçersiz window: {window} ({', '.join(WINDOWS)})")
+
+        app = current_app._get_current_object()
+        ttl = app.config.get("LEADERBOARD_TTL_SECONDS", 60)
+        k = app.config.get("LEADERBOARD_TOP_K", 10)
+        cache = _cache(board, window)
+        cache.configure(ttl, ttl * 5)
+
+        def _load():
+            with app.app_context():
+                try:
+                    today = datetime.utcnow().date()
+                    rows = LeaderboardRepo.top(board, today - timedelta(days=WINDOWS[window] - 1), today, k)
+                    labels = LeaderboardRepo.labels(board, [eid for eid, _ in rows])
+                    return [
+                        {"rank": i, "id": eid, "label": labels.get(eid), "count": n}
+                        for i, (eid, n) in enumerate(rows, start=1)
+                    ]
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f"[leaderboard] {board}/{window} yüklenemedi: {e}")
+                    raise
+
+        return cache.get(_load)
@@ -1,27 +1,195 @@
 # app/services/mail_service.py
 from __future__ import annotations
 
+import queue
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import current_app
 from flask_mail import Message
 
 from app.extensions import db, mail
 from app.models.notification_log import NotificationLog
+from app.repositories.outbox_repo import OutboxRepo
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+# Process genelinde tek SMTP breaker: sunucu erişilemezken her mail kendi timeout'unu beklemesin
+smtp_breaker = CircuitBreaker("smtp")
+
+# Gönderilmeden atlanan mailler (hata sayılmaz, outbox'ta pending kalır)
+SKIPPED_BREAKER = "skipped:circuit_open"
+SKIPPED_BUDGET = "skipped:budget"
+
+# Sunucuya ulaşıldığını gösteren (alıcı/içerik kaynaklı) hatalar breaker'ı tetiklemez
+_NON_INFRA_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+    AssertionError,
+)
 
 
 class MailService:
+    @staticmethod
+    def is_skipped(error: str | None) -> bool:
+        return bool(error) and error.startswith("skipped:")
+
+    @staticmethod
+    def breaker() -> CircuitBreaker:
+        cfg = current_app.config
+        smtp_breaker.configure(
+            cfg.get("MAIL_BREAKER_FAILURES", 5),
+            cfg.get("MAIL_BREAKER_RESET_SECONDS", 60),
+        )
+        return smtp_breaker
+
+    @staticmethod
+    def _open_conn():
+        """
+        Flask-Mail Connection açar; farkı MAIL_TIMEOUT ile socket timeout vermesi
+        (Flask-Mail smtplib'e timeout geçmiyor, erişilemeyen host'ta OS varsayılanı bekleniyor).
+        """
+        conn = mail.connect()
+        state = conn.mail
+        conn.num_emails = 0
+        conn.host = None
+        if state.suppress:
+            return conn
+
+        timeout = current_app.config.get("MAIL_TIMEOUT", 10)
+        if state.use_ssl:
+            host = smtplib.SMTP_SSL(state.server, state.port, timeout=timeout)
+        else:
+            host = smtplib.SMTP(state.server, state.port, timeout=timeout)
+        host.set_debuglevel(int(state.debug))
+        if state.use_tls:
+            host.starttls()
+        if state.username and state.password:
+            host.login(state.username, state.password)
+        conn.host = host
+        return conn
+
+    @staticmethod
+    def _close_conn(conn):
+        try:
+            conn.__exit__(None, None, None)
+        except Exception:
+            pass  # zaten kopmuş olabilir
+
     @staticmethod
     def send_email(to_email: str, subject: str, body: str) -> tuple[bool, str | None]:
         """
         return: (success, error_text)
+        Breaker açıksa denemez: (False, SKIPPED_BREAKER)
         """
+        breaker = MailService.breaker()
+        if not breaker.allow():
+            return False, SKIPPED_BREAKER
+
+        conn = None
         try:
             msg = Message(subject=subject, recipients=[to_email], body=body)
-            mail.send(msg)
+            conn = MailService._open_conn()
+            conn.send(msg)
+            breaker.record_success()
             return True, None
         except Exception as e:
+            if isinstance(e, _NON_INFRA_ERRORS):
+                breaker.record_success()
+            else:
+                breaker.record_failure()
             current_app.logger.warning(f"[MailService] Mail gönderilemedi: {e}")
             return False, str(e)
+        finally:
+            if conn is not None:
+                MailService._close_conn(conn)
+
+    @staticmethod
+    def send_many(
+        messages: list[tuple[str, str, str]],
+        connections: int = 1,
+        per_connection: int = 50,
+        deadline: float | None = None,
+    ) -> list[tuple[bool, str | None]]:
+        """
+        (to_email, subject, body) listesini az sayıda SMTP oturumuyla gönderir.
+        - connections: paralel SMTP bağlantısı (thread) sayısı
+        - per_connection: bir oturumda en fazla kaç mail; sonra QUIT + yeni oturum
+        - Tekrar kullanılan bağlantı koparsa yeniden bağlanıp o maili bir kez daha dener
+        - deadline (time.monotonic): aşılınca kalanlar SKIPPED_BUDGET
+        - Breaker açıksa kalanlar SKIPPED_BREAKER (denenmez)
+        return: messages ile aynı sırada (success, error_text)
+        """
+        results: list[tuple[bool, str | None]] = [(False, SKIPPED_BUDGET)] * len(messages)
+        if not messages:
+            return results
+
+        app = current_app._get_current_object()
+        breaker = MailService.breaker()
+        work = queue.Queue()
+        for i in range(len(messages)):
+            work.put(i)
+
+        def _worker():
+            with app.app_context():
+                conn = None
+                sent_on_conn = 0
+                while True:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break  # kalanlar SKIPPED_BUDGET olarak kalır
+                    try:
+                        idx = work.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    to_email, subject, body = messages[idx]
+                    msg = Message(subject=subject, recipients=[to_email], body=body)
+
+                    for attempt in (1, 2):
+                        reused = conn is not None and sent_on_conn > 0
+                        if conn is None and not breaker.allow():
+                            results[idx] = (False, SKIPPED_BREAKER)
+                            break
+                        try:
+                            if conn is None:
+                                conn = MailService._open_conn()
+                                sent_on_conn = 0
+                            conn.send(msg)
+                            sent_on_conn += 1
+                            breaker.record_success()
+                            results[idx] = (True, None)
+                            break
+                        except Exception as e:
+                            if isinstance(e, _NON_INFRA_ERRORS):
+                                # sunucu ayakta, sorun bu mailde: bağlantıyı koru
+                                breaker.record_success()
+                                results[idx] = (False, str(e))
+                                break
+                            breaker.record_failure()
+                            if conn is not None:
+                                MailService._close_conn(conn)
+                            conn = None
+                            # eski oturum düşmüş olabilir: yeni bağlantıyla bir kez daha dene
+                            if attempt == 1 and reused:
+                                continue
+                            app.logger.warning(f"[MailService] Mail gönderilemedi: {e}")
+                            results[idx] = (False, str(e))
+                            break
+
+                    if conn is not None and sent_on_conn >= per_connection:
+                        MailService._close_conn(conn)
+                        conn = None
+
+                if conn is not None:
+                    MailService._close_conn(conn)
+
+        workers = max(1, min(int(connections), len(messages)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as pool:
+            for f in [pool.submit(_worker) for _ in range(workers)]:
+                f.result()
+        return results
 
     @staticmethod
     def log_notification(
@@ -32,21 +200,94 @@ class MailService:
         success: bool,
         error: str | None = None,
         commit: bool = False,  # loop içinde commit yapma
+        outbox_id: int | None = None,
     ) -> NotificationLog:
         row = NotificationLog(
             borrow_id=borrow_id,
             type=notif_type,
             email=to_email,
-            message=message,
+            message=(message or "")[:1000],
             success=bool(success),
-            error_message=error,
+            error_message=(error or "")[:500] or None,
             sent_at=datetime.utcnow(),
+            outbox_id=outbox_id,
         )
         db.session.add(row)
         if commit:
             db.session.commit()
         return row
 
+    @staticmethod
+    def queue_email(
+        borrow_id: int | None,
+        notif_type: str,
+        to_email: str | None,
+        subject: str,
+        body: str,
+    ) -> bool:
+        """
+        Maili SMTP'ye göndermez, outbox'a yazar (commit yok: çağıranın transaction'ı).
+        Gönderim + NotificationLog kaydı delivery worker'da (app/tasks/mail_worker.py).
+        Email yoksa kuyruğa almadan başarısız log atar.
+        """
+        if not to_email:
+            MailService.log_notification(
+                borrow_id=borrow_id,
+                notif_type=notif_type,
+                to_email=None,
+                message="Kullanıcı email bulunamadı",
+                success=False,
+                error="missing_email",
+                commit=False,
+            )
+            return False
+
+        OutboxRepo.enqueue(borrow_id, notif_type, to_email, subject, body)
+        return True
+
+    @staticmethod
+    def queue_digest(user, overdue: list, due_soon: list) -> bool:
+        """
+        Bir kullanıcının geciken + yaklaşan tüm ödünçleri için tek özet mail (outbox'a).
+        Her borrow mail_outbox_items'a yazılır; worker gönderince borrow başına
+        NotificationLog atar (hepsi aynı outbox_id'yi gösterir).
+        """
+        if not overdue and not due_soon:
+            return False
+
+        to_email = getattr(user, "email", None) if user else None
+        username = getattr(user, "username", "Kullanıcı") if user else "Kullanıcı"
+        items = [(b.id, "overdue") for b in overdue] + [(b.id, "due_soon") for b in due_soon]
+
+        if not to_email:
+            for borrow_id, notif_type in items:
+                MailService.log_notification(
+                    borrow_id=borrow_id,
+                    notif_type=notif_type,
+                    to_email=None,
+                    message="Kullanıcı email bulunamadı",
+                    success=False,
+                    error="missing_email",
+                )
+            return False
+
+        lines = [f"Merhaba {username},", ""]
+        if overdue:
+            lines.append("Teslim tarihi geçen kitaplar:")
+            for b in overdue:
+                lines.append(f"- '{MailService._borrow_labels(b)[2]}' (teslim tarihi: {b.due_date})")
+            lines.append("")
+        if due_soon:
+            lines.append("Teslim tarihi yaklaşan kitaplar:")
+            for b in due_soon:
+                lines.append(f"- '{MailService._borrow_labels(b)[2]}' (teslim tarihi: {b.due_date})")
+            lines.append("")
+        lines.append("Lütfen iade etmeyi unutmayınız.")
+
+        subject = f"Kütüphane: Ödünç hatırlatması ({len(items)} kitap)"
+        OutboxRepo.enqueue(None, "digest", to_email, subject, "\n".join(lines) + "\n", items=items)
+        return True
+
     @staticmethod
     def _borrow_labels(borrow):
         user = getattr(borrow, "user", None)
@@ -62,8 +303,8 @@ class MailService:
     @staticmethod
     def send_overdue_mail(borrow) -> bool:
         """
-        Borrow üzerinden kullanıcı mailini bulup gecikme maili yollar ve loglar.
-        commit=False bırak: dışarıda tek commit yapılmalı.
+        Borrow üzerinden kullanıcı mailini bulup gecikme mailini outbox'a yazar.
+        Commit yok: dışarıda tek commit yapılmalı.
         """
         to_email, username, book_title, due_date = MailService._borrow_labels(borrow)
 
@@ -75,35 +316,12 @@ class MailService:
             f"Lütfen en kısa sürede iade ediniz.\n"
         )
 
-        if not to_email:
-            MailService.log_notification(
-                borrow_id=getattr(borrow, "id", None),
-                notif_type="overdue_mail",
-                to_email=None,
-                message="Kullanıcı email bulunamadı",
-                success=False,
-                error="missing_email",
-                commit=False,
-            )
-            return False
-
-        ok, err = MailService.send_email(to_email, subject, body)
-
-        MailService.log_notification(
-            borrow_id=getattr(borrow, "id", None),
-            notif_type="overdue_mail",
-            to_email=to_email,
-            message="Mail gönderildi" if ok else "Mail gönderilemedi",
-            success=ok,
-            error=err,
-            commit=False,
-        )
-        return ok
+        return MailService.queue_email(getattr(borrow, "id", None), "overdue_mail", to_email, subject, body)
 
     @staticmethod
     def send_due_soon_mail(borrow) -> bool:
         """
-        Teslim tarihi yaklaşanlar için mail + log.
+        Teslim tarihi yaklaşanlar için maili outbox'a yazar.
         """
         to_email, username, book_title, due_date = MailService._borrow_labels(borrow)
 
@@ -115,27 +333,4 @@ class MailService:
             f"İade etmeyi unutmayınız.\n"
         )
 
-        if not to_email:
-            MailService.log_notification(
-                borrow_id=getattr(borrow, "id", None),
-                notif_type="due_soon_mail",
-                to_email=None,
-                message="Kullanıcı email bulunamadı",
-                success=False,
-                error="missing_email",
-                commit=False,
-            )
-            return False
-
-        ok, err = MailService.send_email(to_email, subject, body)
-
-        MailService.log_notification(
-            borrow_id=getattr(borrow, "id", None),
-            notif_type="due_soon_mail",
-            to_email=to_email,
-            message="Mail gönderildi" if ok else "Mail gönderilemedi",
-            success=ok,
-            error=err,
-            commit=False,
-        )
-        return ok
+        return MailService.queue_email(getattr(borrow, "id", None), "due_soon_mail", to_email, subject, body)
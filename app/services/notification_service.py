@@ -1,44 +1,71 @@
-from datetime import datetime
-from flask_mail import Message
-from app.extensions import mail
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
 from app.repositories.borrow_repo import BorrowRepo
-from app.repositories.notification_repo import NotificationRepo
-from app.models.notification_log import NotificationLog
+from app.repositories.checkpoint_repo import CheckpointRepo
+from app.repositories.counter_repo import CounterRepo, OVERDUE_STATUSES
+from app.repositories.notification_state_repo import NotificationStateRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, LOANS
+from app.services.leaderboard_service import LeaderboardService
+from app.services.mail_service import MailService
+
+
+JOB_NAME = "late_return"
+
 
 class NotificationService:
     @staticmethod
     def check_and_notify_late_returns():
+        """
+        Gecikenlerin status'unu günceller ve bildirim maillerini outbox'a yazar.
+        SMTP gönderimi delivery worker'da; burada tek transaction + tek commit.
+        Artımlı: sadece önceki başarılı çağrıdan bu yana gecikmeye düşenler taranır
+        (late_return tek seferlik olduğu için eskiler zaten işlendi). İlk çağrı ve
+        LATE_CHECK_FULL_PASS_HOURS'ta bir tam tarama: pencere dışında kalan değişiklikler
+        (ör. geriye çekilen due_date) burada yakalanır.
+        """
         now = datetime.utcnow()
-        overdue = BorrowRepo.find_overdue(now)
+        cp = CheckpointRepo.get_or_create(JOB_NAME)
+        full_every = timedelta(hours=current_app.config.get("LATE_CHECK_FULL_PASS_HOURS", 24))
+        if cp.run_started_at is None or cp.last_full_at is None or now - cp.last_full_at >= full_every:
+            since = None
+        else:
+            since = cp.run_started_at
+        overdue = BorrowRepo.find_overdue(now, since=since)
+
+        # daha önce mail atılmamış olanlar: tek seferlik, toplu claim
+        claimed = NotificationStateRepo.claim([b.id for b in overdue], "late_return", now, repeat=None)
 
+        newly_late = [b for b in overdue if b.status not in OVERDUE_STATUSES]
+        CounterRepo.add({"overdue_borrows": len(newly_late)})
+        LeaderboardService.record_overdue(newly_late)
+        ResourceVersionRepo.bump(LOANS, [b.user_id for b in newly_late])
         for b in overdue:
             # status güncelle
             b.status = "late"
 
-            # daha önce mail atıldı mı?
-            if NotificationRepo.already_sent(b.id, "late_return"):
+            if b.id not in claimed:
                 continue
 
-            try:
-                # Mail config yoksa crash etmesin diye:
-                if not b.user or not b.user.email:
-                    raise RuntimeError("Kullanıcı e-postası yok")
-
-                msg = Message(
-                    subject="Kütüphane Bildirimi: Gecikmiş İade",
-                    recipients=[b.user.email],
-                    body=(
-                        f"Merhaba {b.user.username},\n\n"
-                        f"'{b.book.title}' kitabının iade tarihi geçti.\n"
-                        f"Son iade tarihi: {b.due_date}\n\n"
-                        f"Lütfen en kısa sürede iade ediniz."
-                    ),
-                )
-                mail.send(msg)
-
-                NotificationRepo.log(NotificationLog(borrow_id=b.id, success=True))
-            except Exception as e:
-                NotificationRepo.log(NotificationLog(borrow_id=b.id, success=False, error_message=str(e)))
-
-        # status commit
-        BorrowRepo.commit()
+            MailService.queue_email(
+                b.id,
+                "late_return",
+                b.user.email if b.user else None,
+                "Kütüphane Bildirimi: Gecikmiş İade",
+                (
+                    f"Merhaba {b.user.username if b.user else 'Kullanıcı'},\n\n"
+                    f"'{b.book.title if b.book else 'Kitap'}' kitabının iade tarihi geçti.\n"
+                    f"Son iade tarihi: {b.due_date}\n\n"
+                    f"Lütfen en kısa sürede iade ediniz."
+                ),
+            )
+
+        # status + outbox + checkpoint tek commit; sonraki çağrı run_started_at'ten itibaren tarar
+        cp.watermark = since
+        cp.run_started_at = now
+        cp.finished_at = now
+        if since is None:
+            cp.last_full_at = now
+        db.session.commit()
@@ -0,0 +1,119 @@
+# app/services/penalty_service.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from app.extensions import db
+from app.models.penalty import Penalty
+from app.repositories.counter_repo import CounterRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, LOANS
+
+
+DAILY_FEE = 5  # istersen config'e al
+
+# MSSQL tek sorguda en fazla 2100 parametre kabul eder; IN listesi bunun altında kalsın
+_IN_CHUNK = 1000
+
+
+class PenaltyService:
+    @staticmethod
+    def calc_days_overdue(due_date, now_utc: datetime) -> int:
+        if not due_date:
+            return 0
+        # due_date datetime ise sadece date bazında fark alalım
+        return max(0, (now_utc.date() - due_date.date()).days)
+
+    @staticmethod
+    def _existing_by_borrow(borrow_ids: list[int]) -> dict:
+        """
+        borrow_id -> (penalty_id, days_overdue, is_paid, amount)
+        Tek tek Penalty.query.filter_by(...) yerine parça parça toplu okuma.
+        """
+        existing = {}
+        for i in range(0, len(borrow_ids), _IN_CHUNK):
+            part = borrow_ids[i:i + _IN_CHUNK]
+            rows = (
+                db.session.query(Penalty.id, Penalty.borrow_id, Penalty.days_overdue, Penalty.is_paid, Penalty.amount)
+                .filter(Penalty.borrow_id.in_(part))
+                .all()
+            )
+            for pid, bid, days, is_paid, amount in rows:
+                existing[bid] = (pid, days, bool(is_paid), amount)
+        return existing
+
+    @staticmethod
+    def accrue(rows, now_utc: datetime) -> dict:
+        """
+        rows: (borrow_id, due_date, user_id) üçlüleri.
+        - Gecikme yoksa dokunmaz
+        - Ceza yoksa toplu INSERT
+        - Ceza var, ödenmemiş ve gün sayısı değiştiyse toplu UPDATE
+        - Ödenmiş ya da gün sayısı aynıysa unchanged
+        Commit yapmaz; çağıran tarafta tek commit (ödenmemiş ceza sayaçları ve cezası değişen
+        kullanıcıların liste sürümleri de aynı transaction'da).
+        return: {"created": n, "updated": n, "unchanged": n}
+        """
+        days_by_borrow = {}
+        user_by_borrow = {}
+        for borrow_id, due_date, user_id in rows:
+            days = PenaltyService.calc_days_overdue(due_date, now_utc)
+            if days > 0:
+                days_by_borrow[borrow_id] = days
+                user_by_borrow[borrow_id] = user_id
+
+        stats = {"created": 0, "updated": 0, "unchanged": 0}
+        if not days_by_borrow:
+            return stats
+
+        existing = PenaltyService._existing_by_borrow(list(days_by_borrow.keys()))
+
+        inserts = []
+        updates = []
+        amount_delta = 0
+        for borrow_id, days in days_by_borrow.items():
+            amount = days * DAILY_FEE
+            current = existing.get(borrow_id)
+            if current is None:
+                inserts.append({
+                    "borrow_id": borrow_id,
+                    "days_overdue": days,
+                    "daily_fee": DAILY_FEE,
+                    "amount": amount,
+                    "is_paid": False,
+                    "created_at": now_utc,
+                    "updated_at": now_utc,
+                })
+                amount_delta += amount
+                continue
+
+            pid, current_days, is_paid, current_amount = current
+            # ödendiyse ya da gün sayısı değişmediyse elleme
+            if is_paid or current_days == days:
+                stats["unchanged"] += 1
+                continue
+
+            updates.append({
+                "id": pid,
+                "days_overdue": days,
+                "daily_fee": DAILY_FEE,
+                "amount": amount,
+                "updated_at": now_utc,
+            })
+            amount_delta += amount - (current_amount or 0)
+
+        if inserts:
+            db.session.bulk_insert_mappings(Penalty, inserts)
+        if updates:
+            db.session.bulk_update_mappings(Penalty, updates)
+        if inserts or updates:
+            CounterRepo.add({"unpaid_penalty_count": len(inserts), "unpaid_penalty_amount": amount_delta})
+            pid_to_borrow = {pid: bid for bid, (pid, *_rest) in existing.items()}
+            ResourceVersionRepo.bump(
+                LOANS,
+                [user_by_borrow[r["borrow_id"]] for r in inserts]
+                + [user_by_borrow[pid_to_borrow[r["id"]]] for r in updates],
+            )
+
+        stats["created"] = len(inserts)
+        stats["updated"] = len(updates)
+        return stats
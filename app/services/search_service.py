@@ -0,0 +1,143 @@
+# app/services/search_service.py
+from __future__ import annotations
+
+import math
+
+from flask import current_app
+
+from app.repositories.counter_repo import CounterRepo
+from app.repositories.search_repo import SearchRepo
+from app.utils.pagination import encode_cursor
+from app.utils.text_search import tokenize, isbn_token, bm25_tf
+
+
+# başlıkta geçen token yazar / ISBN'dekinden daha ağır sayılır (tf'ye x2 eklenir)
+TITLE_WEIGHT = 2
+
+# sorgunun son kelimesi önek olarak da aranır ("dostoy" -> "dostoyevski"); tam eşleşme önde kalsın
+PREFIX_WEIGHT = 0.5
+MAX_QUERY_TOKENS = 10
+
+
+def book_terms(title: str | None, author: str | None, isbn: str | None) -> dict[str, int]:
+    terms: dict[str, int] = {}
+    for tok in tokenize(title):
+        terms[tok] = terms.get(tok, 0) + TITLE_WEIGHT
+    for tok in tokenize(author) + tokenize(isbn):
+        terms[tok] = terms.get(tok, 0) + 1
+    compact = isbn_token(isbn)
+    if compact:
+        terms[compact] = terms.get(compact, 0) + 1
+    return terms
+
+
+def _corpus() -> tuple[int, float]:
+    """(kitap sayısı, ortalama doküman uzunluğu) sayaçlardan; tablo taranmaz."""
+    counters = CounterRepo.get_all(("total_books", "search_token_total"))
+    n_docs = max(counters["total_books"], 1)
+    return n_docs, max(counters["search_token_total"] / n_docs, 1.0)
+
+
+class SearchService:
+    @staticmethod
+    def index_book(book):
+        """Kitap eklendi / güncellendi: sadece değişen token'lar yazılır. Commit yapmaz (book.id flush edilmiş olmalı)."""
+        new = book_terms(book.title, book.author, book.isbn)
+        old = SearchRepo.postings_of(book.id)
+        if new != old:
+            SearchRepo.apply(book.id, old, new, _corpus()[1])
+
+    @staticmethod
+    def remove_book(book_id: int):
+        """Kitap silinmeden önce (aynı transaction'da) çağrılır."""
+        old = SearchRepo.postings_of(book_id)
+        if old:
+            SearchRepo.apply(book_id, old, {}, 1.0)
+
+    @staticmethod
+    def _weights(q: str, n_docs: int) -> tuple[dict[str, float], int]:
+        """return: (token -> idf ağırlığı, toplam posting sayısı)"""
+        tokens = list(dict.fromkeys(tokenize(q)))[:MAX_QUERY_TOKENS]
+        compact = isbn_token(q)
+        if compact and compact not in tokens:
+            # tireli ISBN sorgusu index'teki birleşik ISBN token'ıyla da eşleşsin
+            tokens.insert(0, compact)
+        if not tokens:
+            return {}, 0
+
+        def idf(d: int) -> float:
+            return math.log(1 + (n_docs - d + 0.5) / (d + 0.5))
+
+        df = SearchRepo.dfs(tokens)
+        weights = {tok: idf(df[tok]) for tok in tokens if df.get(tok)}
+        postings = sum(df[tok] for tok in weights)
+
+        last = tokens[-1]
+        if len(last) >= 2 and not last.isdigit():
+            limit = current_app.config.get("SEARCH_PREFIX_EXPANSIONS", 20)
+            for tok, d in SearchRepo.terms_with_prefix(last, limit):
+                if tok not in weights:
+                    weights[tok] = idf(d) * PREFIX_WEIGHT
+                    postings += d
+        return weights, postings
+
+    @staticmethod
+    def _rank_candidates(weights: dict[str, float], avgdl: float, per_token: int) -> list[tuple[int, float]]:
+        """
+        Sık token'lar: her token'ın impact sırasıyla ilk per_token posting'i aday olur, adaylar
+        tüm sorgu token'larıyla tam BM25 ile yeniden puanlanır. Okunan satır
+        ~ token x per_token; posting listesinin tamamı okunmaz (yaklaşık top-k).
+        """
+        candidates: set[int] = set()
+        for tok in weights:
+            candidates.update(SearchRepo.top_by_impact(tok, per_token))
+
+        scores: dict[int, float] = {}
+        for tok, book_id, tf, doc_len in SearchRepo.postings_for(list(weights), list(candidates)):
+            scores[book_id] = scores.get(book_id, 0.0) + weights[tok] * bm25_tf(tf, doc_len, avgdl)
+        return sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+
+    @staticmethod
+    def search(q: str, cursor, limit: int) -> tuple[list[dict], str | None]:
+        """
+        BM25 sıralı arama. cursor sonuç listesindeki konum (sıralama skora göre olduğu için
+        keyset değil offset; SEARCH_MAX_RESULTS ile sınırlı).
+        Toplam posting SEARCH_EXACT_MAX_POSTINGS altındaysa tam sıralama SQL'de, üstündeyse
+        impact sıralı aday kümesi üzerinden.
+        return: (data, next_cursor)
+        """
+        offset = 0
+        if cursor is not None:
+            if len(cursor) != 1 or not isinstance(cursor[0], int) or cursor[0] < 0:
+                raise ValueError("Geçersiz cursor")
+            offset = cursor[0]
+
+        cfg = current_app.config
+        max_results = cfg.get("SEARCH_MAX_RESULTS", 1000)
+        limit = min(limit, max(max_results - offset, 0))
+        if limit <= 0:
+            return [], None
+
+        n_docs, avgdl = _corpus()
+        weights, postings = SearchService._weights(q, n_docs)
+        if not weights:
+            return [], None
+
+        if postings <= cfg.get("SEARCH_EXACT_MAX_POSTINGS", 50_000):
+            ranked = SearchRepo.rank(weights, avgdl, limit + 1, offset)
+        else:
+            per_token = max(cfg.get("SEARCH_CANDIDATES", 1000) // len(weights), offset + limit + 1)
+            ranked = SearchService._rank_candidates(weights, avgdl, per_token)[offset:offset + limit + 1]
+
+        next_cursor = None
+        if len(ranked) > limit:
+            ranked = ranked[:limit]
+            if offset + limit < max_results:
+                next_cursor = encode_cursor([offset + limit])
+
+        books = SearchRepo.books_by_ids([bid for bid, _ in ranked])
+        data = [
+            dict(books[bid], score=round(score, 4))
+            for bid, score in ranked if bid in books
+        ]
+        return data, next_cursor
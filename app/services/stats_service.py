@@ -0,0 +1,50 @@
+# app/services/stats_service.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.borrow_repo import BorrowRepo
+from app.repositories.counter_repo import CounterRepo, DASHBOARD_COUNTERS
+from app.utils.snapshot_cache import SnapshotCache
+
+
+# Process genelinde tek admin stats snapshot'ı: her dashboard yenilemesi tabloları saymasın
+admin_stats_cache = SnapshotCache("admin_stats")
+
+
+class StatsService:
+    @staticmethod
+    def admin_stats() -> tuple[dict, float]:
+        """
+        return: (snapshot, yaş saniye)
+        Değerler library_counters'tan okunur (yazma yollarında transaction içinde güncellenir; sadece
+        DASHBOARD_COUNTERS, iç sayaçlar dönmez); taban tabloları sayan sorgu sadece reconcile'da çalışır.
+        İstisna overdue_borrows: zamanla değiştiği için açık ödünç index'inden sayılır.
+        ADMIN_STATS_TTL_SECONDS içinde cache'ten; sonrası ADMIN_STATS_MAX_STALE_SECONDS'a kadar
+        eski snapshot dönüp arka planda yenilenir (stale-while-revalidate).
+        """
+        app = current_app._get_current_object()
+        admin_stats_cache.configure(
+            app.config.get("ADMIN_STATS_TTL_SECONDS", 30),
+            app.config.get("ADMIN_STATS_MAX_STALE_SECONDS", 300),
+        )
+
+        def _load():
+            # arka plan thread'inde de çalışır: kendi app context'i / session'ı
+            with app.app_context():
+                try:
+                    now = datetime.utcnow()
+                    data = CounterRepo.get_all(DASHBOARD_COUNTERS)
+                    # overdue_borrows: açık + due_date < now (late check çalışmamış olsa da güncel);
+                    # sayaç late check'in işaretlediklerini sayar, sadece reconcile / izleme için
+                    data["overdue_borrows"] = BorrowRepo.count_overdue(now)
+                    return dict(data, generated_at=now.isoformat())
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.warning(f"[stats] admin_stats yüklenemedi: {e}")
+                    raise
+
+        return admin_stats_cache.get(_load)
@@ -0,0 +1,124 @@
+# app/services/suggest_service.py
+from __future__ import annotations
+
+import threading
+import time
+
+from flask import current_app
+
+from app.repositories.book_repo import BookRepo
+from app.repositories.counter_repo import CounterRepo, CATALOG_VERSION
+from app.utils.prefix_index import PrefixIndex
+
+
+# process başına tek index; _version index'in yansıttığı catalog_version sayacı
+_lock = threading.Lock()
+_index: PrefixIndex | None = None
+_version: int | None = None
+_checked_at = 0.0
+_syncing = False
+
+
+def _rows(batch_size: int):
+    last_id = 0
+    while True:
+        chunk = BookRepo.titles_after(last_id, batch_size)
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1][0]
+
+
+def _sync(app):
+    """
+    Arka plan thread'i: catalog_version değiştiyse (başka process yazdıysa) index baştan kurulur.
+    Sürüm kitaplardan önce okunur; arada gelen yazım bir sonraki kontrolde tekrar kurulumu tetikler.
+    """
+    global _index, _version, _syncing
+    try:
+        with app.app_context():
+            version = CounterRepo.get(CATALOG_VERSION)
+            with _lock:
+                current = _version if _index is not None else None
+            if version == current:
+                return
+            started = time.monotonic()
+            index = PrefixIndex.build(_rows(app.config.get("SUGGEST_BUILD_BATCH_SIZE", 5000)))
+            with _lock:
+                _index, _version = index, version
+            app.logger.info(
+                f"[suggest] Index kuruldu: books={len(index)} version={version} "
+                f"({time.monotonic() - started:.2f}s)"
+            )
+    except Exception as e:
+        app.logger.exception(f"[suggest] Index kurulamadı: {e}")
+    finally:
+        with _lock:
+            _syncing = False
+
+
+def _start_sync(app, force: bool = False):
+    global _checked_at, _syncing
+    with _lock:
+        now = time.monotonic()
+        if _syncing or (not force and now - _checked_at < app.config.get("SUGGEST_SYNC_SECONDS", 60)):
+            return
+        _syncing = True
+        _checked_at = now
+    threading.Thread(target=_sync, args=(app,), name="suggest-sync", daemon=True).start()
+
+
+def _bump() -> int:
+    CounterRepo.add({CATALOG_VERSION: 1})
+    return CounterRepo.get(CATALOG_VERSION)
+
+
+class SuggestService:
+    @staticmethod
+    def warm(app):
+        """Uygulama açılışında index'i arka planda kurar; istekler hazır olana kadar boş döner."""
+        _start_sync(app, force=True)
+
+    @staticmethod
+    def suggest(q: str, limit: int) -> list[dict] | None:
+        """
+        DB'ye gitmez; sürüm kontrolü SUGGEST_SYNC_SECONDS aralıkla arka planda yapılır.
+        return: öneriler; index henüz kurulmadıysa None
+        """
+        app = current_app._get_current_object()
+        _start_sync(app)
+        index = _index
+        if index is None:
+            return None
+        return index.suggest(q, limit, app.config.get("SUGGEST_MAX_SCAN", 5000))
+
+    @staticmethod
+    def stage_save(book) -> tuple:
+        """
+        Kitap eklendi / güncellendi; commit'ten önce, yazımla aynı transaction'da çağrılır
+        (catalog_version artar). Dönen değer commit sonrası apply()'a verilir.
+        """
+        return ("put", book.id, book.title, book.author, _bump())
+
+    @staticmethod
+    def stage_delete(book_id: int) -> tuple:
+        return ("remove", book_id, None, None, _bump())
+
+    @staticmethod
+    def apply(change: tuple):
+        """
+        Commit sonrası yerel index'e uygular. Sürüm sıradaki değilse (araya başka process'in
+        yazımı girdi) index senkron sayılmaz; sonraki kontrolde baştan kurulur.
+        """
+        global _version
+        op, book_id, title, author, version = change
+        with _lock:
+            index = _index
+            if index is None:
+                return
+            if op == "put":
+                index.put(book_id, title, author)
+            else:
+                index.remove(book_id)
+            if _version is not None and version == _version + 1:
+                _version = version
@@ -0,0 +1,90 @@
+# app/tasks/catalog_snapshot.py
+"""
+Katalog mmap snapshot'ının (CATALOG_SNAPSHOT_PATH) kurucusu. Web process'leri snapshot'ı okur
+(BookRepo.get_cached / list_page); makine başına tek process (dosya kilidi) books sürümünü izleyip
+değiştiğinde dosyayı yeniden yazar.
+"""
+import os
+import threading
+import time
+
+from app.repositories.book_repo import BookRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, BOOKS
+from app.utils.catalog_snapshot import write_snapshot, read_header
+
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yok, builder çalışmaz (snapshot CLI ile kurulabilir)
+    fcntl = None
+
+
+def _rows(batch_size: int):
+    last_id = 0
+    while True:
+        chunk = BookRepo.snapshot_rows_after(last_id, batch_size)
+        if not chunk:
+            return
+        yield from chunk
+        last_id = chunk[-1][0]
+
+
+def build_catalog_snapshot(app, path: str | None = None, force: bool = False) -> dict | None:
+    """
+    books sürümü dosyadakiyle aynıysa (force değilse) yazmaz.
+    built_at sürüm / satırlar okunmadan önce alınır: okuyucular bu zamandan sonra kendi yazdıkları
+    kitapları snapshot yerine DB'den okur.
+    return: {"books", "books_version", "seconds"}; yazılmadıysa None
+    """
+    path = path or app.config.get("CATALOG_SNAPSHOT_PATH")
+    if not path:
+        raise ValueError("CATALOG_SNAPSHOT_PATH ayarlı değil")
+
+    # salt okuma; app context kapanınca session kapanır
+    with app.app_context():
+        built_at = time.time()
+        version, _ = ResourceVersionRepo.version(BOOKS)
+        header = read_header(path)
+        if not force and header is not None and header["books_version"] == version:
+            return None
+
+        started = time.monotonic()
+        n = write_snapshot(
+            path, _rows(app.config.get("CATALOG_SNAPSHOT_BATCH_SIZE", 10_000)), version, built_at
+        )
+    stats = {"books": n, "books_version": version, "seconds": round(time.monotonic() - started, 2)}
+    app.logger.info(f"[catalog-snapshot] Yazıldı: {path} {stats}")
+    return stats
+
+
+def run_snapshot_builder(app):
+    """
+    Bloklar. Kilidi alamayan process (aynı makinede başka builder var) beklemeye devam eder;
+    kilit sahibi ölürse OS kilidi bırakır ve bekleyenlerden biri devralır.
+    """
+    path = app.config["CATALOG_SNAPSHOT_PATH"]
+    poll = app.config.get("CATALOG_SNAPSHOT_POLL_SECONDS", 30)
+
+    lock_file = open(f"{path}.lock", "a+")
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except OSError:
+            time.sleep(poll)
+
+    app.logger.info(f"[catalog-snapshot] Builder başladı (pid={os.getpid()}).")
+    while True:
+        try:
+            build_catalog_snapshot(app, path)
+        except Exception as e:
+            app.logger.exception(f"[catalog-snapshot] Kurulamadı: {e}")
+        time.sleep(poll)
+
+
+def start_snapshot_builder(app):
+    if fcntl is None:
+        app.logger.warning("[catalog-snapshot] fcntl yok; builder başlatılmadı.")
+        return
+    threading.Thread(
+        target=run_snapshot_builder, args=(app,), name="catalog-snapshot", daemon=True
+    ).start()
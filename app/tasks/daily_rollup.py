@@ -0,0 +1,74 @@
+# app/tasks/daily_rollup.py
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.checkpoint_repo import CheckpointRepo
+from app.repositories.daily_stats_repo import DailyStatsRepo
+from app.services.penalty_service import DAILY_FEE
+
+
+JOB_NAME = "daily_stats"
+
+
+def run_daily_rollup_job(app) -> dict:
+    """
+    Tamamlanmış UTC günlerini daily_stats'a yazar (bugün hariç).
+    - Artımlı: checkpoint.watermark bir sonraki işlenecek günün başı; her gün ayrı commit
+    - İlk koşu en fazla DAILY_STATS_BACKFILL_DAYS geriye gider
+    - Kesilirse kaldığı günden devam eder; zaten yazılmış gün tekrar hesaplanmaz
+    - overdue_open backfill'de önceki günden artımlı, son günde tam hesaplanır
+    return: {"days": n, "from": "YYYY-MM-DD" | None, "to": ... }
+    """
+    stats = {"days": 0, "from": None, "to": None}
+    with app.app_context():
+        try:
+            today = datetime.utcnow().date()
+            cp = CheckpointRepo.get_or_create(JOB_NAME)
+
+            if cp.watermark is not None:
+                day = cp.watermark.date()
+            else:
+                first = DailyStatsRepo.first_activity_day()
+                if first is None:
+                    db.session.commit()
+                    return stats
+                backfill = int(app.config.get("DAILY_STATS_BACKFILL_DAYS", 365))
+                day = max(first, today - timedelta(days=backfill))
+
+            # backfill'de gün başı gecikmiş sayısı önceki günün değerinden olay farkıyla yürür (gün başına
+            # O(o günün olayları)); son gün (dün) tam sayılır, olası kayma her gün sıfırlanır
+            prev_overdue = DailyStatsRepo.overdue_open_on(day - timedelta(days=1))
+            while day < today:
+                carry = prev_overdue if day < today - timedelta(days=1) else None
+                values = DailyStatsRepo.compute(day, carry)
+                prev_overdue = values["overdue_open"]
+                # gecikmiş her ödünç o gün bir günlük ceza işletir (PenaltyService ile aynı ücret)
+                values["penalty_amount_accrued"] = Decimal(values["overdue_open"] * DAILY_FEE)
+                now = datetime.utcnow()
+                DailyStatsRepo.upsert(day, values, now)
+
+                cp.watermark = datetime.combine(day + timedelta(days=1), time.min)
+                cp.finished_at = now
+                db.session.commit()
+
+                stats["days"] += 1
+                stats["from"] = stats["from"] or day.isoformat()
+                stats["to"] = day.isoformat()
+                day += timedelta(days=1)
+
+            db.session.commit()
+            if stats["days"]:
+                current_app.logger.info(f"[daily_stats] {stats['days']} gün yazıldı ({stats['from']} .. {stats['to']}).")
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"[daily_stats] Hata: {e}")
+    return stats
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.daily_rollup
+    from app import create_app
+    print(run_daily_rollup_job(create_app(role="worker")))
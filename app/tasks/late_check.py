@@ -1,63 +1,284 @@
 # app/tasks/late_check.py
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import os
+import socket
+import time
+
 from flask import current_app
+from sqlalchemy import func, or_, and_
 
 from app.extensions import db
 from app.models.borrow import Borrow
-from app.models.penalty import Penalty
+from app.repositories.borrow_repo import BorrowRepo
+from app.repositories.checkpoint_repo import CheckpointRepo
+from app.repositories.counter_repo import CounterRepo, OVERDUE_STATUSES
+from app.repositories.notification_state_repo import NotificationStateRepo
+from app.repositories.partition_repo import PartitionRepo
+from app.repositories.resource_version_repo import ResourceVersionRepo, LOANS
+from app.services.leaderboard_service import LeaderboardService
 from app.services.mail_service import MailService
+from app.services.penalty_service import PenaltyService
+
+
+JOB_NAME = "late_check"
+# özet modunda partition keyset'i user_id'dir; borrow id'li koşu ile karışmasın
+DIGEST_JOB_NAME = "late_check_digest"
+
+
+def _due_window(now: datetime, since: datetime | None):
+    """
+    since None: tam tarama (due_date <= now + 1 gün; tüm açık gecikmeler + yaklaşanlar).
+    since verilirse sadece önceki koşudan (since) bu yana durum değiştirenler:
+    - [since, now) aralığında vadesi geçenler (overdue'ya geçiş + ilk bildirim)
+    - (since + 1 gün, now + 1 gün] aralığında due_soon penceresine girenler
+    - since'ten sonra açılıp vadesi zaten pencerede olanlar (kısa süreli ödünç)
+    """
+    until = now + timedelta(days=1)
+    if since is None:
+        return Borrow.due_date <= until
+    return or_(
+        and_(Borrow.due_date >= since, Borrow.due_date < now),
+        and_(Borrow.due_date >= now, Borrow.due_date > since + timedelta(days=1), Borrow.due_date <= until),
+        and_(Borrow.borrowed_at >= since, Borrow.due_date <= until),
+    )
+
+
+def _open_filter(due_window, user_range: tuple[int, int]):
+    lo, hi = user_range
+    return (
+        Borrow.returned_at.is_(None),
+        due_window,
+        Borrow.user_id >= lo,
+        Borrow.user_id < hi,
+    )
+
+
+def _iter_open_borrow_chunks(due_window, after_id: int, chunk_size: int, user_range: tuple[int, int]):
+    """
+    returned_at IS NULL ve due_date'i pencerede olan (partition'ın user_id aralığındaki)
+    borrow'ları id ASC keyset ile chunk chunk döner. Her chunk ayrı sorgu olduğu için
+    chunk arası commit güvenli.
+    """
+    last_id = after_id
+    while True:
+        q = (
+            Borrow.query
+            .filter(*_open_filter(due_window, user_range), Borrow.id > last_id)
+            .order_by(Borrow.id.asc())
+            .limit(chunk_size)
+        )
+        rows = BorrowRepo.with_refs(q).all()
+        if not rows:
+            return
+        # yield sonrası çağıran expunge edebilir; id'yi önceden al
+        last_id = rows[-1].id
+        yield last_id, rows
+
+
+def _iter_open_user_chunks(due_window, after_user_id: int, chunk_size: int, user_range: tuple[int, int]):
+    """
+    Açık borrow'u olan kullanıcıları SQL'de gruplayarak (GROUP BY user_id) user_id ASC
+    keyset ile chunk chunk döner; her chunk'ta o kullanıcıların tüm açık borrow'ları
+    (user_id, due_date) sırasıyla tek sorguda gelir. Keyset olarak user_id kullanılır.
+    """
+    last_user_id = after_user_id
+    open_filter = _open_filter(due_window, user_range)
+    while True:
+        user_ids = [
+            r[0] for r in db.session.query(Borrow.user_id)
+            .filter(*open_filter, Borrow.user_id > last_user_id)
+            .group_by(Borrow.user_id)
+            .order_by(Borrow.user_id.asc())
+            .limit(chunk_size)
+            .all()
+        ]
+        if not user_ids:
+            return
+        q = (
+            Borrow.query
+            .filter(*open_filter, Borrow.user_id.in_(user_ids))
+            .order_by(Borrow.user_id.asc(), Borrow.due_date.asc(), Borrow.id.asc())
+        )
+        rows = BorrowRepo.with_refs(q).all()
+        last_user_id = user_ids[-1]
+        yield last_user_id, rows
+
 
+def _user_ranges(due_window, partitions: int) -> list[tuple[int, int]]:
+    """
+    Açık borrow'ların user_id aralığını eşit genişlikte [lo, hi) parçalara böler.
+    Bir kullanıcının tüm borrow'ları aynı partition'a düşer (özet mail için şart).
+    """
+    lo, hi = (
+        db.session.query(func.min(Borrow.user_id), func.max(Borrow.user_id))
+        .filter(Borrow.returned_at.is_(None), due_window)
+        .one()
+    )
+    if lo is None:
+        return []
+    span = hi - lo + 1
+    step = -(-span // max(1, partitions))
+    return [(start, min(start + step, hi + 1)) for start in range(lo, hi + 1, step)]
 
-DAILY_FEE = 5  # istersen config'e al
 
+def _notify(b: Borrow, notif_type: str) -> bool:
+    user_email = b.user.email if b.user else None
+    book_title = b.book.title if b.book else "Kitap"
+
+    if notif_type == "overdue":
+        subject = "Kütüphane: Geciken ödünç hatırlatması"
+        body = (
+            "Merhaba,\n\n"
+            f"'{book_title}' adlı kitabın teslim tarihi geçti.\n"
+            f"Teslim tarihi: {b.due_date}\n\n"
+            "Lütfen en kısa sürede iade ediniz."
+        )
+    else:
+        subject = "Kütüphane: Teslim tarihi yaklaşıyor"
+        body = (
+            "Merhaba,\n\n"
+            f"'{book_title}' adlı kitabın teslim tarihi yaklaşıyor.\n"
+            f"Teslim tarihi: {b.due_date}\n\n"
+            "İade etmeyi unutma."
+        )
 
-def _calc_days_overdue(due_date, now_utc: datetime) -> int:
-    if not due_date:
-        return 0
-    # due_date datetime ise sadece date bazında fark alalım
-    return max(0, (now_utc.date() - due_date.date()).days)
+    # SMTP burada yapılmaz: outbox'a yazılır, chunk ile aynı transaction'da commit edilir
+    return MailService.queue_email(b.id, notif_type, user_email, subject, body)
 
 
-def _upsert_penalty_for_borrow(b: Borrow, now_utc: datetime) -> bool:
+def _notify_digests(overdue_rows: list, due_soon_rows: list) -> tuple[int, int]:
     """
-    Returns: True if created/updated, False if no action
-    - Eğer gecikme yoksa hiç dokunmaz
-    - Eğer ceza var ve is_paid=True ise dokunmaz
-    - Eğer ceza yoksa oluşturur
-    - Eğer ceza var ve ödenmemişse günceller
+    Claim edilmiş borrow'ları kullanıcıya göre toplar, kullanıcı başına tek özet mail kuyruğa yazar.
+    return: (overdue_queued, due_soon_queued) borrow sayıları
     """
-    if not b or not b.due_date:
-        return False
-
-    days_overdue = _calc_days_overdue(b.due_date, now_utc)
-    if days_overdue <= 0:
-        return False
-
-    amount = days_overdue * DAILY_FEE
-
-    p = Penalty.query.filter_by(borrow_id=b.id).first()
-    if not p:
-        p = Penalty(
-            borrow_id=b.id,
-            days_overdue=days_overdue,
-            daily_fee=DAILY_FEE,
-            amount=amount,
-            is_paid=False
+    by_user = {}
+    for b in overdue_rows:
+        by_user.setdefault(b.user_id, ([], []))[0].append(b)
+    for b in due_soon_rows:
+        by_user.setdefault(b.user_id, ([], []))[1].append(b)
+
+    overdue_queued = 0
+    due_soon_queued = 0
+    for overdue, due_soon in by_user.values():
+        user = (overdue or due_soon)[0].user
+        if MailService.queue_digest(user, overdue, due_soon):
+            overdue_queued += len(overdue)
+            due_soon_queued += len(due_soon)
+    return overdue_queued, due_soon_queued
+
+
+def _new_stats() -> dict:
+    return {
+        "chunks": 0, "overdue": 0, "due_soon": 0,
+        "penalty_created": 0, "penalty_updated": 0, "penalty_unchanged": 0,
+        "mail_overdue_queued": 0, "mail_due_soon_queued": 0,
+    }
+
+
+def _process_chunk(rows: list, now: datetime, digest: bool, repeats: tuple[timedelta, timedelta], stats: dict):
+    overdue_repeat, due_soon_repeat = repeats
+    overdue_rows = [b for b in rows if b.due_date < now]
+    due_soon_rows = [b for b in rows if b.due_date >= now]
+
+    # ✅ penalty: chunk için toplu oluştur/güncelle
+    chunk_stats = PenaltyService.accrue([(b.id, b.due_date, b.user_id) for b in overdue_rows], now)
+    for k, v in chunk_stats.items():
+        stats[f"penalty_{k}"] += v
+
+    # ✅ bildirim uygunluğu: chunk için tek seferde claim (tekrar gönderim aralığı dolmamışlar atlanır)
+    overdue_claimed = NotificationStateRepo.claim(
+        [b.id for b in overdue_rows], "overdue", now, overdue_repeat
+    )
+    due_soon_claimed = NotificationStateRepo.claim(
+        [b.id for b in due_soon_rows], "due_soon", now, due_soon_repeat
+    )
+
+    # sayaç + leaderboard: sadece bu koşuda ilk kez gecikmiş işaretlenenler (chunk commit'iyle birlikte)
+    newly_overdue = [b for b in overdue_rows if b.status not in OVERDUE_STATUSES]
+    CounterRepo.add({"overdue_borrows": len(newly_overdue)})
+    LeaderboardService.record_overdue(newly_overdue)
+    ResourceVersionRepo.bump(LOANS, [b.user_id for b in newly_overdue])
+    for b in overdue_rows:
+        b.status = "overdue"
+
+    if digest:
+        # kullanıcı başına tek özet mail
+        queued_overdue, queued_due_soon = _notify_digests(
+            [b for b in overdue_rows if b.id in overdue_claimed],
+            [b for b in due_soon_rows if b.id in due_soon_claimed],
         )
-        db.session.add(p)
-        return True
+        stats["mail_overdue_queued"] += queued_overdue
+        stats["mail_due_soon_queued"] += queued_due_soon
+    else:
+        # Overdue: outbox
+        for b in overdue_rows:
+            if b.id in overdue_claimed and _notify(b, "overdue"):
+                stats["mail_overdue_queued"] += 1
+
+        # Due soon: outbox (ceza yok)
+        for b in due_soon_rows:
+            if b.id in due_soon_claimed and _notify(b, "due_soon"):
+                stats["mail_due_soon_queued"] += 1
+
+    stats["overdue"] += len(overdue_rows)
+    stats["due_soon"] += len(due_soon_rows)
+    stats["chunks"] += 1
+
+
+def _partition_worker(app, job_name: str, now: datetime, since: datetime | None, owner: str) -> dict:
+    """
+    Partition kalmayana kadar claim eder ve işler (her thread kendi app context'i / session'ı ile).
+    Hata alan partition kaldığı chunk'tan tekrar denenir; LATE_CHECK_PARTITION_MAX_ATTEMPTS denemeden
+    sonra failed olur ve koşunun bitmesini engellemez.
+    """
+    cfg = app.config
+    chunk_size = max(1, int(cfg.get("LATE_CHECK_CHUNK_SIZE", 500)))
+    lease = int(cfg.get("LATE_CHECK_PARTITION_LEASE_SECONDS", 300))
+    max_attempts = max(1, int(cfg.get("LATE_CHECK_PARTITION_MAX_ATTEMPTS", 3)))
+    digest = job_name == DIGEST_JOB_NAME
+    iter_chunks = _iter_open_user_chunks if digest else _iter_open_borrow_chunks
+    due_window = _due_window(now, since)
+    repeats = (
+        timedelta(hours=cfg.get("NOTIFY_OVERDUE_REPEAT_HOURS", 24)),
+        timedelta(hours=cfg.get("NOTIFY_DUE_SOON_REPEAT_HOURS", 24)),
+    )
 
-    # varsa ve ödendiyse elleme
-    if getattr(p, "is_paid", False):
-        return False
+    stats = _new_stats()
+    with app.app_context():
+        while True:
+            part = PartitionRepo.claim_next(job_name, owner, datetime.utcnow(), lease, max_attempts)
+            if not part:
+                return stats
+            part_no = part["part_no"]
+            t0 = time.monotonic()
+            try:
+                user_range = (part["user_id_from"], part["user_id_to"])
+                for last_key, rows in iter_chunks(due_window, part["last_id"], chunk_size, user_range):
+                    _process_chunk(rows, now, digest, repeats, stats)
+
+                    # ✅ chunk sonu: partition ilerlemesi + lease uzatma + commit, identity map'i boşalt
+                    PartitionRepo.progress(
+                        job_name, part_no, last_key, len(rows), datetime.utcnow() + timedelta(seconds=lease)
+                    )
+                    db.session.commit()
+                    db.session.expunge_all()
 
-    # ödenmemişse güncelle
-    p.days_overdue = days_overdue
-    p.daily_fee = DAILY_FEE
-    p.amount = amount
-    if hasattr(p, "updated_at"):
-        p.updated_at = now_utc
-    return True
+                PartitionRepo.finish(job_name, part_no, datetime.utcnow())
+                db.session.commit()
+                current_app.logger.info(
+                    f"[late_check] partition={part_no} range={user_range} "
+                    f"süre={int((time.monotonic() - t0) * 1000)}ms"
+                )
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.exception(f"[late_check] partition={part_no} hata: {e}")
+                try:
+                    PartitionRepo.fail(job_name, part_no, f"{type(e).__name__}: {e}", max_attempts)
+                    db.session.commit()
+                except Exception:
+                    # yazılamazsa lease dolunca tekrar alınır (deneme sayısı claim'de arttı)
+                    db.session.rollback()
 
 
 def run_late_check_job(app):
@@ -65,112 +286,104 @@ def run_late_check_job(app):
     Geciken / yaklaşan due_date kayıtlarını kontrol eder.
     - overdue: due_date geçmiş ve returned_at None
     - due_soon: due_date 1 gün içinde
-    Ek: overdue borrows için Penalty upsert yapar (ödenmemişse günceller).
+    Mailler gönderilmez, outbox'a yazılır (bkz. app/tasks/mail_worker.py).
+    Aynı borrow + tip için tekrar gönderim notification_states ile sınırlanır
+    (NOTIFY_OVERDUE_REPEAT_HOURS / NOTIFY_DUE_SOON_REPEAT_HOURS).
+    Ek: overdue borrows için Penalty'leri chunk başına toplu upsert eder
+    (PenaltyService.accrue; gün sayısı değişmeyenler atlanır).
+
+    Artımlı: her koşu sadece önceki koşunun "now"ından (job_checkpoints.watermark) bu yana
+    vadesi geçen / due_soon penceresine giren borrow'ları işler (O(yeni vadesi gelen)).
+    LATE_CHECK_FULL_PASS_HOURS'ta bir tam tarama yapılır: penalty gün artışları, overdue
+    tekrar hatırlatmaları ve pencere dışında kalmış değişiklikler (ör. geriye çekilen due_date) burada işlenir.
+
+    Koşu başında açık borrow'lar user_id aralıklarına göre LATE_CHECK_PARTITIONS parçaya
+    bölünür (job_partitions); LATE_CHECK_WORKERS thread partition'ları claim edip paralel işler.
+    Her partition içinde borrow'lar LATE_CHECK_CHUNK_SIZE'lık parçalar halinde okunur;
+    her chunk sonunda commit + partition ilerlemesi yazılır ve session temizlenir.
+    Yarıda kalan koşu bir sonraki çağrıda aynı "now" ile kalan partition'lardan devam eder.
+    LATE_CHECK_PARTITION_MAX_ATTEMPTS kez hata alan (ya da lease'i dolan) partition failed olur; koşu
+    yine biter (sonraki koşular yeni "now" ile başlar), failed partition'lar log'a ve
+    /web/api/admin/late-check/partitions'a düşer. Failed varsa tam tarama tamamlanmış sayılmaz.
+
+    NOTIFY_DIGEST açıksa chunk'lar kullanıcı bazlıdır (LATE_CHECK_CHUNK_SIZE kullanıcı) ve
+    her kullanıcıya geciken + yaklaşan kitaplarını listeleyen tek mail gider;
+    NotificationLog yine borrow başına yazılır (aynı outbox mesajına bağlı).
     """
     with app.app_context():
         try:
-            now = datetime.utcnow()
-            due_soon_limit = now + timedelta(days=1)
-
-            # Gecikenler
-            overdue_rows = Borrow.query.filter(
-                Borrow.returned_at.is_(None),
-                Borrow.due_date < now
-            ).all()
-
-            # Yaklaşanlar
-            due_soon_rows = Borrow.query.filter(
-                Borrow.returned_at.is_(None),
-                Borrow.due_date >= now,
-                Borrow.due_date <= due_soon_limit
-            ).all()
-
-            penalty_changed = 0
-            mail_overdue_sent = 0
-            mail_due_soon_sent = 0
-
-            # Overdue: penalty upsert + mail + log + status
-            for b in overdue_rows:
-                # ✅ penalty oluştur/güncelle
-                if _upsert_penalty_for_borrow(b, now):
-                    penalty_changed += 1
-
-                # (opsiyonel) status güncelle
-                try:
-                    b.status = "overdue"
-                except Exception:
-                    pass
-
-                # mail + log
-                user_email = b.user.email if b.user else None
-                subject = "Kütüphane: Geciken ödünç hatırlatması"
-                body = (
-                    "Merhaba,\n\n"
-                    f"'{b.book.title if b.book else 'Kitap'}' adlı kitabın teslim tarihi geçti.\n"
-                    f"Teslim tarihi: {b.due_date}\n\n"
-                    "Lütfen en kısa sürede iade ediniz."
-                )
+            cfg = app.config
+            digest = bool(cfg.get("NOTIFY_DIGEST", False))
+            job_name = DIGEST_JOB_NAME if digest else JOB_NAME
+            partitions = max(1, int(cfg.get("LATE_CHECK_PARTITIONS", 1)))
+            workers = max(1, int(cfg.get("LATE_CHECK_WORKERS", 1)))
 
-                ok = False
-                err = None
-                if user_email:
-                    ok = MailService.send_email(user_email, subject, body)
-                    if ok:
-                        mail_overdue_sent += 1
-                    else:
-                        err = "Mail gönderilemedi (mail config eksik olabilir)."
+            cp = CheckpointRepo.get_or_create(job_name)
+            if CheckpointRepo.is_unfinished(cp):
+                now = cp.run_started_at
+                since = cp.watermark
+                current_app.logger.info("[late_check] Yarım kalan koşu devam ediyor.")
+            else:
+                now = datetime.utcnow()
+                full_every = timedelta(hours=cfg.get("LATE_CHECK_FULL_PASS_HOURS", 24))
+                if cp.run_started_at is None or cp.last_full_at is None or now - cp.last_full_at >= full_every:
+                    since = None
                 else:
-                    err = "Kullanıcı email bulunamadı."
-
-                MailService.log_notification(
-                    borrow_id=b.id,
-                    notif_type="overdue",
-                    to_email=user_email,
-                    message=body,
-                    success=ok,
-                    error=err
-                )
+                    # önceki (bitmiş) koşu due_date < run_started_at olanları zaten işledi
+                    since = cp.run_started_at
+                cp.watermark = since
+                cp.run_started_at = now
+                cp.finished_at = None
+                PartitionRepo.create_run(job_name, _user_ranges(_due_window(now, since), partitions))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"[late_check] Hata: {e}")
+            return
 
-            # Due soon: mail + log (ceza yok)
-            for b in due_soon_rows:
-                user_email = b.user.email if b.user else None
-                subject = "Kütüphane: Teslim tarihi yaklaşıyor"
-                body = (
-                    "Merhaba,\n\n"
-                    f"'{b.book.title if b.book else 'Kitap'}' adlı kitabın teslim tarihi yaklaşıyor.\n"
-                    f"Teslim tarihi: {b.due_date}\n\n"
-                    "İade etmeyi unutma."
-                )
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    t0 = time.monotonic()
+    if workers == 1:
+        results = [_partition_worker(app, job_name, now, since, owner)]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="late_check") as pool:
+            futures = [pool.submit(_partition_worker, app, job_name, now, since, owner) for _ in range(workers)]
+            results = [f.result() for f in futures]
 
-                ok = False
-                err = None
-                if user_email:
-                    ok = MailService.send_email(user_email, subject, body)
-                    if ok:
-                        mail_due_soon_sent += 1
-                    else:
-                        err = "Mail gönderilemedi (mail config eksik olabilir)."
-                else:
-                    err = "Kullanıcı email bulunamadı."
-
-                MailService.log_notification(
-                    borrow_id=b.id,
-                    notif_type="due_soon",
-                    to_email=user_email,
-                    message=body,
-                    success=ok,
-                    error=err
-                )
+    totals = _new_stats()
+    for r in results:
+        for k, v in r.items():
+            totals[k] += v
 
-            # ✅ tek commit
+    with app.app_context():
+        try:
+            max_attempts = max(1, int(app.config.get("LATE_CHECK_PARTITION_MAX_ATTEMPTS", 3)))
+            PartitionRepo.fail_exhausted(job_name, datetime.utcnow(), max_attempts)
             db.session.commit()
 
+            counts = PartitionRepo.counts(job_name)
+            failed = counts.get("failed", 0)
+            done = not counts.get("pending") and not counts.get("running")
+            if done:
+                cp = CheckpointRepo.get_or_create(job_name)
+                cp.finished_at = datetime.utcnow()
+                # failed partition'lar taranmadı: tam tarama bir sonraki koşuda tekrarlanır
+                if cp.watermark is None and not failed:
+                    cp.last_full_at = cp.run_started_at
+                db.session.commit()
+            if failed:
+                current_app.logger.warning(
+                    f"[late_check] {failed} partition failed (deneme hakkı bitti); "
+                    "ayrıntı: /web/api/admin/late-check/partitions"
+                )
+
             current_app.logger.info(
-                f"[late_check] overdue={len(overdue_rows)} due_soon={len(due_soon_rows)} "
-                f"penalty_changed={penalty_changed} mail_overdue_sent={mail_overdue_sent} "
-                f"mail_due_soon_sent={mail_due_soon_sent}"
+                f"[late_check] mode={'full' if since is None else 'incremental'} workers={workers} partitions_done={done} partitions_failed={failed} süre={int((time.monotonic() - t0) * 1000)}ms "
+                f"chunks={totals['chunks']} overdue={totals['overdue']} due_soon={totals['due_soon']} "
+                f"penalty_created={totals['penalty_created']} penalty_updated={totals['penalty_updated']} "
+                f"penalty_unchanged={totals['penalty_unchanged']} mail_overdue_queued={totals['mail_overdue_queued']} "
+                f"mail_due_soon_queued={totals['mail_due_soon_queued']}"
             )
-
         except Exception as e:
             db.session.rollback()
             current_app.logger.exception(f"[late_check] Hata: {e}")
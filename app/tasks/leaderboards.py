@@ -0,0 +1,46 @@
+# app/tasks/leaderboards.py
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.leaderboard_repo import LeaderboardRepo
+
+
+def run_leaderboard_prune_job(app) -> int:
+    """En uzun pencereden (ay) eski bucket'ları siler; tablo gün x aktif entity ile sınırlı kalır."""
+    with app.app_context():
+        try:
+            keep = int(app.config.get("LEADERBOARD_RETENTION_DAYS", 35))
+            deleted = LeaderboardRepo.prune(datetime.utcnow().date() - timedelta(days=keep))
+            db.session.commit()
+            if deleted:
+                current_app.logger.info(f"[leaderboard] {deleted} eski bucket silindi.")
+            return deleted
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"[leaderboard] Hata: {e}")
+            return 0
+
+
+def run_leaderboard_rebuild(app, days: int | None = None) -> dict:
+    """
+    Son `days` günün bucket'larını borrows'tan yeniden üretir (ilk kurulum / kayma düzeltme).
+    Tek transaction; yoğun saatte çalıştırma.
+    """
+    with app.app_context():
+        try:
+            days = days or int(app.config.get("LEADERBOARD_RETENTION_DAYS", 35))
+            now = datetime.utcnow()
+            out = LeaderboardRepo.rebuild(now.date() - timedelta(days=days - 1), now)
+            db.session.commit()
+            return out
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.leaderboards  (rebuild)
+    from app import create_app
+    print(run_leaderboard_rebuild(create_app(role="worker")))
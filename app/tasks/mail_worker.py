@@ -0,0 +1,132 @@
+# app/tasks/mail_worker.py
+from datetime import datetime, timedelta
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.repositories.outbox_repo import OutboxRepo
+from app.services.mail_service import MailService
+
+
+def _backoff(attempts: int, base_seconds: int) -> timedelta:
+    # 1., 2., 3. deneme sonrası: base, 2*base, 4*base ... (en fazla 1 gün)
+    return timedelta(seconds=min(base_seconds * (2 ** max(0, attempts - 1)), 86400))
+
+
+def deliver_batch(batch: list[dict], deadline: float | None = None) -> list[tuple[dict, bool, str | None]]:
+    """
+    Claim edilmiş mesajları gönderir. DB'ye dokunmaz; açık transaction yokken çağrılır.
+    SMTP oturumları paylaşılır (MAIL_POOL_CONNECTIONS x MAIL_MAX_PER_CONNECTION).
+    return: (msg, ok, err) listesi
+    """
+    cfg = current_app.config
+    sent = MailService.send_many(
+        [(m["to_email"], m["subject"], m["body"]) for m in batch],
+        connections=cfg.get("MAIL_POOL_CONNECTIONS", 4),
+        per_connection=cfg.get("MAIL_MAX_PER_CONNECTION", 50),
+        deadline=deadline,
+    )
+    return [(msg, ok, err) for msg, (ok, err) in zip(batch, sent)]
+
+
+def run_mail_delivery_job(app) -> dict:
+    """
+    Outbox'tan bir batch mesaj alır, SMTP ile gönderir, sonuçları outbox + NotificationLog'a yazar.
+    - Claim kısa bir transaction'da commit edilir; SMTP sırasında hiçbir satır kilitli kalmaz
+    - Başarısız mesaj backoff ile tekrar "pending" olur; MAX_ATTEMPTS aşılırsa "failed"
+    - SMTP breaker açıksa ya da MAIL_SEND_BUDGET_SECONDS dolduysa denenmeyen mesajlar
+      hata sayılmadan pending'e döner (sonraki koşuda gönderilir)
+    - NotificationLog'a sadece nihai sonuç (gönderildi / kalıcı hata) yazılır
+    """
+    stats = {"claimed": 0, "sent": 0, "retry": 0, "failed": 0, "skipped": 0}
+    with app.app_context():
+        try:
+            cfg = app.config
+            now = datetime.utcnow()
+            deadline = time.monotonic() + cfg.get("MAIL_SEND_BUDGET_SECONDS", 120)
+
+            if MailService.breaker().is_open():
+                current_app.logger.info("[mail_worker] SMTP breaker açık, bu koşu atlandı.")
+                return stats
+
+            batch = OutboxRepo.claim_batch(
+                cfg.get("MAIL_OUTBOX_BATCH_SIZE", 100), now, cfg.get("MAIL_OUTBOX_LEASE_SECONDS", 300)
+            )
+            stats["claimed"] = len(batch)
+            if not batch:
+                return stats
+
+            results = deliver_batch(batch, deadline)
+
+            max_attempts = cfg.get("MAIL_OUTBOX_MAX_ATTEMPTS", 5)
+            backoff_base = cfg.get("MAIL_OUTBOX_BACKOFF_SECONDS", 60)
+            done_at = datetime.utcnow()
+
+            skipped_ids = []
+            for msg, ok, err in results:
+                if not ok and MailService.is_skipped(err):
+                    skipped_ids.append(msg["id"])
+                    continue
+
+                attempts = msg["attempts"] + 1
+                if ok:
+                    OutboxRepo.mark_sent(msg["id"], done_at)
+                    stats["sent"] += 1
+                elif attempts < max_attempts:
+                    OutboxRepo.mark_retry(msg["id"], done_at + _backoff(attempts, backoff_base), err)
+                    stats["retry"] += 1
+                    continue
+                else:
+                    OutboxRepo.mark_failed(msg["id"], err)
+                    stats["failed"] += 1
+
+                # özet mailde kapsanan her borrow için ayrı log, hepsi aynı outbox mesajını gösterir
+                targets = msg["items"] or (
+                    [(msg["borrow_id"], msg["notif_type"])] if msg["borrow_id"] is not None else []
+                )
+                for borrow_id, notif_type in targets:
+                    MailService.log_notification(
+                        borrow_id=borrow_id,
+                        notif_type=notif_type,
+                        to_email=msg["to_email"],
+                        message=msg["body"],
+                        success=ok,
+                        error=err,
+                        outbox_id=msg["id"],
+                    )
+
+            OutboxRepo.release(skipped_ids)
+            stats["skipped"] = len(skipped_ids)
+
+            db.session.commit()
+
+            current_app.logger.info(
+                f"[mail_worker] claimed={stats['claimed']} sent={stats['sent']} "
+                f"retry={stats['retry']} failed={stats['failed']} skipped={stats['skipped']} "
+                f"breaker={MailService.breaker().state}"
+            )
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f"[mail_worker] Hata: {e}")
+    return stats
+
+
+def run_mail_worker(app, poll_seconds: int | None = None):
+    """
+    Bağımsız delivery worker döngüsü. Birden fazla process aynı anda çalışabilir;
+    claim READPAST / SKIP LOCKED ile yapıldığı için aynı mesajı iki worker almaz.
+    """
+    poll = poll_seconds or app.config.get("MAIL_OUTBOX_POLL_SECONDS", 30)
+    app.logger.info(f"[mail_worker] Başladı (poll={poll}s).")
+    while True:
+        stats = run_mail_delivery_job(app)
+        # batch doluysa beklemeden devam et
+        if stats["claimed"] < app.config.get("MAIL_OUTBOX_BATCH_SIZE", 100):
+            time.sleep(poll)
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.mail_worker
+    from app import create_app
+    run_mail_worker(create_app(role="worker"))
@@ -0,0 +1,41 @@
+# app/tasks/reconcile_counters.py
+from datetime import datetime
+
+from app.extensions import db
+from app.repositories.counter_repo import CounterRepo
+
+
+def run_counter_reconcile(app, fix: bool = False) -> dict:
+    """
+    library_counters'ı taban tablolardan yeniden hesaplar ve kaymayı raporlar.
+    fix=True ise gerçek değerler yazılır.
+    Not: sayım ile yazma arasında gelen işlemler kısa süreli fark gösterebilir; düşük trafikte çalıştır.
+    return: {name: {"stored", "actual", "drift"}}
+    """
+    with app.app_context():
+        try:
+            stored = CounterRepo.get_all()
+            actual = CounterRepo.compute_actual(datetime.utcnow())
+            report = {
+                name: {"stored": stored[name], "actual": actual[name], "drift": round(stored[name] - actual[name], 2)}
+                for name in actual
+            }
+
+            drifted = {k: v for k, v in report.items() if v["drift"]}
+            if drifted:
+                app.logger.warning(f"[counters] Kayma: {drifted}")
+            if fix:
+                CounterRepo.set_all(actual)
+            db.session.commit()
+            return report
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.reconcile_counters [--fix]
+    import sys
+    from app import create_app
+    for name, r in run_counter_reconcile(create_app(role="worker"), fix="--fix" in sys.argv).items():
+        print(f"{name:24} stored={r['stored']:<14} actual={r['actual']:<14} drift={r['drift']}")
@@ -1,42 +1,162 @@
 # app/services/scheduler.py
 from __future__ import annotations
 
-def start_scheduler(app):
+import atexit
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.repositories.borrow_repo import BorrowRepo
+from app.repositories.lease_repo import LeaseRepo
+
+
+def _make_owner() -> str:
+    # fork sonrası çağrılmalı (gunicorn preload): pid her worker için farklı olsun
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def start_scheduler(app, blocking: bool = False):
     """
     Scheduler opsiyonel: APScheduler yoksa uygulama yine çalışır.
+    - blocking=True: ayrı worker process'i için (python -m app.worker); start() bloklar,
+      APScheduler yoksa hata yutulmaz.
     - App context ile job çalıştırır (DB erişimleri patlamasın diye).
     - Debug reloader'da çift çalışmayı engeller.
     - Uygulama kapanırken scheduler'ı kapatır.
+    - Job'lar DB lease ile korunur: kaç process başlatırsa başlatsın her job'ı aynı anda
+      tek process çalıştırır; sahip ölürse SCHEDULER_LEASE_TTL_SECONDS sonra başkası devralır.
     """
     try:
         from apscheduler.schedulers.background import BackgroundScheduler
+        from apscheduler.schedulers.blocking import BlockingScheduler
+        from apscheduler.triggers.cron import CronTrigger
+        from apscheduler.triggers.date import DateTrigger
         from apscheduler.triggers.interval import IntervalTrigger
 
         # ✅ Debug reloader çift process çalıştırır; sadece "asıl" process'te başlat
         # Werkzeug reloader varsa WERKZEUG_RUN_MAIN=true olan process gerçek process'tir.
-        if app.debug:
-            import os
+        if app.debug and not blocking:
             if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
                 app.logger.info("[scheduler] Debug reloader secondary process: scheduler skipped.")
                 return
 
         # ✅ Job fonksiyonunu burada import etmek circular import riskini azaltır
         from app.tasks.late_check import run_late_check_job
+        from app.tasks.mail_worker import run_mail_delivery_job
+        from app.tasks.daily_rollup import run_daily_rollup_job
+        from app.tasks.leaderboards import run_leaderboard_prune_job
+
+        scheduler = BlockingScheduler(timezone="UTC") if blocking else BackgroundScheduler(timezone="UTC")
+
+        # ✅ Cluster-safe: her job scheduler_leases tablosunda bir lease'e bağlı;
+        # tüm worker/replica'lar arasında job'ı sadece lease sahibi çalıştırır
+        owner = _make_owner()
+        ttl = int(app.config.get("SCHEDULER_LEASE_TTL_SECONDS", 60))
+        held: set[str] = set()
+        # aynı lease'e bağlı birden çok job (ör. interval + tek seferlik) bu process'te üst üste binmesin
+        locks: dict[str, threading.Lock] = {}
+
+        def _leased(name: str, fn, after=None):
+            lock = locks.setdefault(name, threading.Lock())
+
+            def _wrapper():
+                if not lock.acquire(blocking=False):
+                    return
+                try:
+                    _run()
+                finally:
+                    lock.release()
+                # job sonrası (ör. bir sonraki olayı kur); lease sahibi değilsek çağrılmaz
+                if after and name in held:
+                    after()
+
+            def _run():
+                with app.app_context():
+                    try:
+                        if not LeaseRepo.try_acquire(name, owner, datetime.utcnow(), ttl):
+                            held.discard(name)
+                            return
+                    except Exception as ex:
+                        db.session.rollback()
+                        app.logger.warning(f"[scheduler] {name} lease alınamadı: {ex}")
+                        return
+                if name not in held:
+                    app.logger.info(f"[scheduler] {name} lease alındı (owner={owner}).")
+                held.add(name)
 
-        scheduler = BackgroundScheduler(timezone="UTC")
+                started_at = datetime.utcnow()
+                t0 = time.monotonic()
+                ok, err = True, None
+                try:
+                    fn(app)
+                except Exception as ex:
+                    ok, err = False, str(ex)
+                    app.logger.exception(f"[scheduler] {name} error: {ex}")
+
+                with app.app_context():
+                    try:
+                        LeaseRepo.record_run(name, owner, started_at, (time.monotonic() - t0) * 1000, ok, err)
+                    except Exception as ex:
+                        db.session.rollback()
+                        app.logger.warning(f"[scheduler] {name} son koşu yazılamadı: {ex}")
+            return _wrapper
 
-        def _job_wrapper():
-            # ✅ Flask app context ile çalıştır
+        # ✅ Late check olay bazlı: bir sonraki vade / due_soon sınırı için tek seferlik tetik kurulur.
+        # Sabit aralıklı job sadece emniyet ağı (LATE_CHECK_SAFETY_MINUTES); boşta sorgu atılmaz.
+        safety = timedelta(minutes=app.config.get("LATE_CHECK_SAFETY_MINUTES", 60))
+        min_delay = timedelta(seconds=app.config.get("LATE_CHECK_MIN_DELAY_SECONDS", 5))
+
+        def _arm_next_late_check():
+            now = datetime.utcnow()
             with app.app_context():
                 try:
-                    run_late_check_job(app)
+                    nxt = BorrowRepo.next_due_event(now, timedelta(days=1))
                 except Exception as ex:
-                    app.logger.exception(f"[scheduler] late_check_job error: {ex}")
+                    db.session.rollback()
+                    app.logger.warning(f"[scheduler] Sonraki late check zamanı okunamadı: {ex}")
+                    return
+            if nxt is None:
+                return
+            # due_date < now koşulu için vadenin hemen sonrası
+            run_at = max(nxt + timedelta(seconds=1), now + min_delay)
+            if run_at >= now + safety:
+                return
+            scheduler.add_job(
+                func=late_check,
+                trigger=DateTrigger(run_date=run_at),
+                id="late_check_next",
+                replace_existing=True,
+                misfire_grace_time=120,
+            )
+            app.logger.info(f"[scheduler] Sonraki late check: {run_at.isoformat()} UTC")
 
-        # ✅ 10 dakikada bir (test için iyi). İstersen dakikayı artır/azalt.
+        late_check = _leased("late_check_job", run_late_check_job, after=_arm_next_late_check)
+
+        def _heartbeat():
+            # uzun süren job sırasında da lease'i canlı tut; başkasına geçtiyse bırak
+            if not held:
+                return
+            with app.app_context():
+                try:
+                    still = LeaseRepo.heartbeat(list(held), owner, datetime.utcnow(), ttl)
+                except Exception as ex:
+                    db.session.rollback()
+                    app.logger.warning(f"[scheduler] heartbeat hatası: {ex}")
+                    return
+            lost = held - still
+            if lost:
+                app.logger.warning(f"[scheduler] Lease kaybedildi: {sorted(lost)}")
+                held.difference_update(lost)
+
+        # ✅ Emniyet aralığı; ilk koşu hemen (bir sonraki olayı da kurar)
         scheduler.add_job(
-            func=_job_wrapper,
-            trigger=IntervalTrigger(minutes=10),
+            func=late_check,
+            trigger=IntervalTrigger(seconds=int(safety.total_seconds())),
+            next_run_time=datetime.utcnow(),
             id="late_check_job",
             replace_existing=True,
             max_instances=1,        # aynı job üst üste binmesin
@@ -44,24 +164,79 @@ def start_scheduler(app):
             misfire_grace_time=120  # 2 dk tolerans
         )
 
-        scheduler.start()
-        app.logger.info("[scheduler] Late check job started (every 10 minutes).")
+        # ✅ Outbox delivery: SMTP gönderimi late check transaction'ından bağımsız
+        scheduler.add_job(
+            func=_leased("mail_delivery_job", run_mail_delivery_job),
+            trigger=IntervalTrigger(seconds=app.config.get("MAIL_OUTBOX_POLL_SECONDS", 30)),
+            id="mail_delivery_job",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60
+        )
+
+        # ✅ Günlük rollup: gün bittikten sonra bir kez; açılışta da kaçırılan günleri tamamlar
+        scheduler.add_job(
+            func=_leased("daily_stats_job", run_daily_rollup_job),
+            trigger=CronTrigger(hour=0, minute=app.config.get("DAILY_STATS_RUN_MINUTE", 15)),
+            next_run_time=datetime.utcnow(),
+            id="daily_stats_job",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=3600
+        )
+
+        scheduler.add_job(
+            func=_leased("leaderboard_prune_job", run_leaderboard_prune_job),
+            trigger=CronTrigger(hour=0, minute=app.config.get("DAILY_STATS_RUN_MINUTE", 15)),
+            id="leaderboard_prune_job",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=3600
+        )
+
+        scheduler.add_job(
+            func=_heartbeat,
+            trigger=IntervalTrigger(seconds=app.config.get("SCHEDULER_LEASE_HEARTBEAT_SECONDS", 15)),
+            id="lease_heartbeat",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
 
         # ✅ app içine referans koy (gerekirse başka yerden erişirsin)
         app.extensions = getattr(app, "extensions", {})
         app.extensions["apscheduler"] = scheduler
+        app.extensions["scheduler_owner"] = owner
 
-        # ✅ Uygulama kapanınca scheduler dursun
-        @app.teardown_appcontext
-        def _shutdown_scheduler(exc=None):
-            sch = app.extensions.get("apscheduler")
-            if sch and getattr(sch, "running", False):
+        # ✅ Process kapanınca scheduler dursun, lease'ler beklemeden devredilsin
+        # (teardown_appcontext her app context sonunda çalıştığı için burada kullanılamaz)
+        def _shutdown_scheduler():
+            if getattr(scheduler, "running", False):
                 try:
-                    sch.shutdown(wait=False)
+                    scheduler.shutdown(wait=False)
                     app.logger.info("[scheduler] Scheduler shutdown.")
                 except Exception:
                     pass
+            if held:
+                with app.app_context():
+                    try:
+                        LeaseRepo.release(list(held), owner)
+                    except Exception:
+                        db.session.rollback()
+
+        atexit.register(_shutdown_scheduler)
+
+        app.logger.info(
+            f"[scheduler] Late check job started (event based, safety every {safety}), "
+            f"mail delivery job and daily stats rollup started (owner={owner})."
+        )
+        scheduler.start()
 
     except Exception as e:
+        if blocking:
+            raise
         # APScheduler yüklü değilse bile app açılsın
         app.logger.warning(f"[scheduler] Scheduler başlatılamadı (opsiyonel): {e}")
@@ -0,0 +1,75 @@
+# app/tasks/search_index.py
+from flask import current_app
+
+from app.extensions import db
+from app.models.book import Book
+from app.repositories.counter_repo import CounterRepo
+from app.repositories.search_repo import SearchRepo
+from app.services.search_service import book_terms
+from app.utils.text_search import bm25_tf
+
+
+def run_search_index_rebuild(app, batch_size: int = 1000) -> dict:
+    """
+    Arama index'ini books'tan baştan üretir (ilk kurulum / kayma düzeltme).
+    Kitaplar id sırasıyla batch batch okunur, her batch ayrı commit; sözlük (df),
+    search_token_total sayacı ve son ortalama uzunlukla impact'ler en sonda yazılır. Çalışırken kitap yazmaları index'i kaydırabilir;
+    bakım zamanında çalıştır.
+    return: {"books": n, "postings": n, "terms": n}
+    """
+    stats = {"books": 0, "postings": 0, "terms": 0}
+    with app.app_context():
+        try:
+            SearchRepo.clear()
+            db.session.commit()
+
+            df: dict[str, int] = {}
+            total_tokens = 0
+            last_id = 0
+            while True:
+                rows = (
+                    db.session.query(Book.id, Book.title, Book.author, Book.isbn)
+                    .filter(Book.id > last_id)
+                    .order_by(Book.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not rows:
+                    break
+
+                postings = []
+                for book_id, title, author, isbn in rows:
+                    terms = book_terms(title, author, isbn)
+                    doc_len = sum(terms.values())
+                    total_tokens += doc_len
+                    for tok, tf in terms.items():
+                        postings.append({"token": tok, "book_id": book_id, "tf": tf, "doc_len": doc_len})
+                        df[tok] = df.get(tok, 0) + 1
+                # geçici impact: şu ana kadarki ortalama uzunluk (sonda düzeltilir)
+                avgdl = total_tokens / (stats["books"] + len(rows))
+                for row in postings:
+                    row["impact"] = bm25_tf(row["tf"], row["doc_len"], avgdl)
+                SearchRepo.bulk_insert(postings)
+                db.session.commit()
+
+                stats["books"] += len(rows)
+                stats["postings"] += len(postings)
+                last_id = rows[-1][0]
+
+            SearchRepo.bulk_insert_terms(df)
+            if stats["books"]:
+                SearchRepo.recompute_impacts(max(total_tokens / stats["books"], 1.0))
+            CounterRepo.set_all({"search_token_total": total_tokens})
+            db.session.commit()
+            stats["terms"] = len(df)
+            current_app.logger.info(f"[search] Index yeniden üretildi: {stats}")
+            return stats
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+if __name__ == "__main__":
+    # python -m app.tasks.search_index
+    from app import create_app
+    print(run_search_index_rebuild(create_app(role="worker")))
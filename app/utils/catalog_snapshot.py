@@ -0,0 +1,171 @@
+# app/utils/catalog_snapshot.py
+"""
+books tablosunun salt okunur ikili snapshot'ı; aynı makinedeki tüm process'ler dosyayı mmap ile
+paylaşır (kopya process başına değil, OS page cache'te bir kez).
+
+Düzen (little-endian):
+    header  : magic, format, books sürümü, kurulum zamanı, kitap sayısı, bölüm offset'leri
+    ids     : int32 x n, artan sıralı (id -> kayıt sırası: bisect; kayıt i'nin id'si ids[i])
+    records : sabit genişlik x n (total_copies, available_copies, title/author/isbn arena offset + uzunluk)
+    arena   : UTF-8 metinler arka arkaya
+Dosya geçici isimle yazılıp os.replace ile atomik olarak değiştirilir; açık mmap'ler eski inode'u
+okumaya devam eder.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+MAGIC = b"BKS1"
+FORMAT = 1
+
+_HEADER = struct.Struct("<4sHHQdQQQQ")
+_RECORD = struct.Struct("<iiIHIHIH")
+_NULL_LEN = 0xFFFF
+
+FIELDS = ("id", "title", "author", "isbn", "total_copies", "available_copies", "available")
+
+
+def write_snapshot(path: str, rows, books_version: int, built_at: float) -> int:
+    """
+    rows: id artan sırada (id, title, author, isbn, total_copies, available_copies).
+    built_at: okumaya başlamadan önceki zaman (bundan önceki commit'ler snapshot'ta).
+    return: kitap sayısı
+    """
+    ids = array("i")
+    records = bytearray()
+    arena = bytearray()
+
+    def _put(text: str | None) -> tuple[int, int]:
+        if text is None:
+            return 0, _NULL_LEN
+        raw = text.encode("utf-8")[:_NULL_LEN - 1]
+        off = len(arena)
+        arena.extend(raw)
+        return off, len(raw)
+
+    for book_id, title, author, isbn, total, available in rows:
+        ids.append(book_id)
+        records.extend(_RECORD.pack(total or 0, available or 0, *_put(title), *_put(author), *_put(isbn)))
+
+    n = len(ids)
+    ids_off = _HEADER.size
+    records_off = ids_off + n * ids.itemsize
+    arena_off = records_off + len(records)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT, 0, books_version, built_at, n, ids_off, records_off, arena_off))
+        f.write(ids.tobytes())
+        f.write(records)
+        f.write(arena)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return n
+
+
+def read_header(path: str) -> dict | None:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, fmt, _, books_version, built_at, n, *_ = _HEADER.unpack(raw)
+    if magic != MAGIC or fmt != FORMAT:
+        return None
+    return {"books_version": books_version, "built_at": built_at, "books": n}
+
+
+class CatalogSnapshot:
+    """Tek bir snapshot dosyasının mmap'i. Okumalar kopyasız (metinler hariç: str'e decode edilir)."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, self.books_version, self.built_at, self.n, ids_off, records_off, arena_off = (
+            _HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f"Geçersiz snapshot: {path}")
+        self._ids = memoryview(self._mm)[ids_off:ids_off + self.n * 4].cast("i")
+        self._records_off = records_off
+        self._arena_off = arena_off
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _text(self, off: int, length: int) -> str | None:
+        if length == _NULL_LEN:
+            return None
+        start = self._arena_off + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _row(self, i: int) -> dict:
+        total, available, t_off, t_len, a_off, a_len, i_off, i_len = _RECORD.unpack_from(
+            self._mm, self._records_off + i * _RECORD.size
+        )
+        return {
+            "id": self._ids[i],
+            "title": self._text(t_off, t_len),
+            "author": self._text(a_off, a_len),
+            "isbn": self._text(i_off, i_len),
+            "total_copies": total,
+            "available_copies": available,
+        }
+
+    def get(self, book_id: int) -> dict | None:
+        i = bisect_left(self._ids, book_id)
+        if i < self.n and self._ids[i] == book_id:
+            return self._row(i)
+        return None
+
+    def iter_desc(self, before_id: int | None = None):
+        """id DESC; before_id verilirse ondan küçük id'lerden başlar (keyset cursor)."""
+        i = self.n if before_id is None else bisect_left(self._ids, before_id)
+        while i > 0:
+            i -= 1
+            yield self._row(i)
+
+
+class SnapshotReader:
+    """
+    Dosyayı izler: en fazla check_seconds'ta bir os.stat; inode değiştiyse (builder os.replace ile
+    yeni dosya koydu) yeni mmap açılır. Eski mmap, onu okuyan kalmayınca GC ile kapanır.
+    """
+
+    def __init__(self, check_seconds: float = 1.0):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._path: str | None = None
+        self._snapshot: CatalogSnapshot | None = None
+        self._inode = None
+        self._checked_at = 0.0
+
+    def current(self, path: str | None) -> CatalogSnapshot | None:
+        if not path:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if path == self._path and now - self._checked_at < self.check_seconds:
+                return self._snapshot
+            self._path = path
+            self._checked_at = now
+            try:
+                inode = os.stat(path).st_ino
+            except OSError:
+                self._snapshot, self._inode = None, None
+                return None
+            if inode != self._inode or self._snapshot is None:
+                try:
+                    self._snapshot, self._inode = CatalogSnapshot(path), inode
+                except (OSError, ValueError, struct.error):
+                    self._snapshot, self._inode = None, None
+            return self._snapshot
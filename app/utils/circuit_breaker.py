@@ -0,0 +1,73 @@
+# app/utils/circuit_breaker.py
+from __future__ import annotations
+
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Basit, thread-safe circuit breaker.
+    - closed: çağrılar serbest; art arda failure_threshold hata -> open
+    - open: reset_seconds boyunca çağrı yapılmaz
+    - half_open: süre dolunca tek bir deneme (probe) çağrısına izin verilir;
+      başarılıysa closed, başarısızsa tekrar open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def configure(self, failure_threshold: int, reset_seconds: float):
+        with self._lock:
+            self.failure_threshold = max(1, int(failure_threshold))
+            self.reset_seconds = float(reset_seconds)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """Şu an deneme yapılmayacak mı (open ve bekleme süresi dolmamış)."""
+        with self._lock:
+            return self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_seconds
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # half_open: aynı anda tek probe
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
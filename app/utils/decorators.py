@@ -1,6 +1,9 @@
+import zlib
+from datetime import timezone
 from functools import wraps
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
-from flask import jsonify
+from flask import jsonify, make_response, request
+from werkzeug.http import http_date, quote_etag
 
 def role_required(*roles):
     def decorator(fn):
@@ -14,3 +17,41 @@ def role_required(*roles):
             return fn(*args, **kwargs)
         return wrapper
     return decorator
+
+
+def conditional_get(lookup):
+    """
+    ETag / Last-Modified ile koşullu GET. lookup() -> (etag tabanı, last_modified) ya da None
+    (None: koşulsuz çalışır, ör. oturum yoksa handler 401 dönsün).
+    Eşleşirse handler çalışmadan 304 döner; sorgu ve serileştirme yapılmaz.
+    ETag query string'i de içerir (aynı kaynağın farklı sayfa / alan seçimleri ayrı temsil).
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            found = lookup()
+            if found is None:
+                return fn(*args, **kwargs)
+
+            base, last_modified = found
+            etag = f"{base}.{zlib.crc32(request.full_path.encode('utf-8')):08x}"
+            headers = {"ETag": quote_etag(etag), "Cache-Control": "private, no-cache"}
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+                headers["Last-Modified"] = http_date(last_modified)
+
+            # If-None-Match varsa If-Modified-Since'e bakılmaz (RFC 9110)
+            if request.if_none_match:
+                fresh = request.if_none_match.contains(etag) or request.if_none_match.star_tag
+            else:
+                since = request.if_modified_since
+                fresh = last_modified is not None and since is not None and last_modified <= since
+            if fresh:
+                return make_response("", 304, headers)
+
+            resp = make_response(fn(*args, **kwargs))
+            if resp.status_code == 200:
+                resp.headers.update(headers)
+            return resp
+        return wrapper
+    return decorator
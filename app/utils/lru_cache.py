@@ -0,0 +1,83 @@
+# app/utils/lru_cache.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Boyutu sınırlı, thread-safe, read-through kullanım için LRU cache.
+    - Kayıtlar ttl_seconds sonra geçersiz (invalidation process içi; diğer process'lerin yazımları
+      en geç bu sürede görünür)
+    - version her invalidate'te artar: çağıran yüklemeye başlamadan önce version'ı alır, put()'a verir;
+      arada invalidate olduysa eski veri cache'e yazılmaz
+    - hits / misses / evictions / invalidations izleme için sayılır
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: float = 30.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()
+        self._version = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def configure(self, max_size: int, ttl_seconds: float):
+        with self._lock:
+            self.max_size = max(int(max_size), 1)
+            self.ttl_seconds = float(ttl_seconds)
+            self._evict()
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._version
+
+    def _evict(self):
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key) -> tuple[bool, object]:
+        """return: (bulundu mu, değer)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl_seconds:
+                self._data.move_to_end(key)
+                self._stats["hits"] += 1
+                return True, entry[0]
+            if entry is not None:
+                del self._data[key]
+            self._stats["misses"] += 1
+            return False, None
+
+    def put(self, key, value, version: int):
+        with self._lock:
+            if version != self._version:
+                return
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            self._evict()
+
+    def invalidate(self, key=None):
+        """key verilirse tek kayıt, verilmezse hepsi silinir."""
+        with self._lock:
+            self._version += 1
+            self._stats["invalidations"] += 1
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                size=len(self._data),
+                max_size=self.max_size,
+                hit_ratio=round(self._stats["hits"] / lookups, 4) if lookups else None,
+            )
@@ -0,0 +1,134 @@
+# app/utils/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def encode_cursor(values: list) -> str:
+    """
+    Son satırın sıralama değerlerini opak bir token'a çevirir.
+    datetime değerleri JSON'da taşınabilsin diye {"dt": iso} olarak saklanır.
+    """
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str | None) -> list | None:
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list):
+            raise ValueError
+        return [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) and "dt" in v else v
+            for v in payload
+        ]
+    except Exception:
+        raise ValueError("Geçersiz cursor")
+
+
+def parse_page_args(default_limit: int = DEFAULT_LIMIT, max_limit: int = MAX_LIMIT):
+    """
+    Query string'den cursor + limit okur.
+    return: (cursor_values | None, limit)
+    """
+    try:
+        limit = int(request.args.get("limit", default_limit))
+    except Exception:
+        limit = default_limit
+    limit = max(1, min(limit, max_limit))
+    return decode_cursor(request.args.get("cursor")), limit
+
+
+def parse_bool_arg(name: str) -> bool | None:
+    """?available=1 / 0 (true / false); parametre yoksa None."""
+    raw = (request.args.get(name) or "").strip().lower()
+    if not raw:
+        return None
+    if raw in ("1", "true"):
+        return True
+    if raw in ("0", "false"):
+        return False
+    raise ValueError(f"Geçersiz {name}")
+
+
+def parse_fields(field_map: dict, default: list[str] | None = None) -> list[str]:
+    """
+    ?fields=id,title gibi sparse fieldset parametresini doğrular.
+    Parametre yoksa default (yoksa tüm alanlar) döner.
+    """
+    raw = (request.args.get("fields") or "").strip()
+    if not raw:
+        return list(default or field_map.keys())
+
+    names = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in field_map:
+            raise ValueError(f"Bilinmeyen alan: {name}")
+        if name not in names:
+            names.append(name)
+    if not names:
+        raise ValueError("fields boş olamaz")
+    return names
+
+
+def _after(sort_cols: list, values: list):
+    """
+    Hepsi DESC sıralı (c1, c2, ..., id) için "cursor'dan sonra" koşulu.
+    MSSQL row-value karşılaştırmayı desteklemediği için OR/AND açılımı kullanılır.
+    """
+    clauses = []
+    for i, col in enumerate(sort_cols):
+        eq = [sort_cols[j] == values[j] for j in range(i)]
+        clauses.append(and_(*eq, col < values[i]))
+    return or_(*clauses)
+
+
+def keyset_page(query, field_map: dict, fields: list[str], sort_cols: list, cursor, limit: int):
+    """
+    Query'yi sadece istenen kolonlara indirger, cursor sonrasından limit+1 satır okur.
+    field_map: {alan_adı: (kolon, formatter)}
+    sort_cols: DESC sıralanacak kolonlar, son eleman benzersiz olmalı (genelde id).
+    return: (data, next_cursor)
+    """
+    if cursor is not None and len(cursor) != len(sort_cols):
+        raise ValueError("Geçersiz cursor")
+
+    cols = [field_map[name][0].label(name) for name in fields]
+    keys = [col.label(f"_k{i}") for i, col in enumerate(sort_cols)]
+
+    q = query.with_entities(*cols, *keys)
+    if cursor is not None:
+        q = q.filter(_after(sort_cols, cursor))
+    rows = q.order_by(*[c.desc() for c in sort_cols]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor([last[f"_k{i}"] for i in range(len(sort_cols))])
+
+    data = []
+    for r in rows:
+        m = r._mapping
+        item = {}
+        for name in fields:
+            value = m[name]
+            fmt = field_map[name][1]
+            item[name] = fmt(value) if (fmt and value is not None) else value
+        data.append(item)
+    return data, next_cursor
@@ -0,0 +1,127 @@
+# app/utils/prefix_index.py
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from functools import lru_cache
+
+from app.utils.text_search import tokenize, prefix_query
+
+
+@lru_cache(maxsize=100_000)
+def _chunk_words(chunk: str) -> tuple[str, ...]:
+    # token'lar boşluk içermez; kelime kelime normalize edip cache'lemek sonucu değiştirmez,
+    # kurulumda aynı kelimeler tekrar tekrar normalize edilmez
+    return tuple(tokenize(chunk))
+
+
+class PrefixIndex:
+    """
+    Başlık / yazar kelimeleri üzerinde bellek içi önek index'i (autocomplete).
+    - _words: normalize edilmiş kelimelerin sıralı listesi; önek aralığı bisect ile bulunur
+    - _ids: kelime -> o kelimeyi içeren kitap id'leri (artan sıralı liste)
+    - _docs: kitap id -> (title, author, kelimeler); güncellemede eski kelimeler buradan silinir
+    Okuma ve tek kitap yazımları aynı lock altında; toplu kurulum build() ile yeni nesneye yapılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._words: list[str] = []
+        self._ids: dict[str, list[int]] = {}
+        self._docs: dict[int, tuple[str, str, tuple[str, ...]]] = {}
+
+    @staticmethod
+    def words_of(title: str | None, author: str | None) -> tuple[str, ...]:
+        words: dict[str, None] = {}
+        for chunk in f"{title or ''} {author or ''}".split():
+            words.update(dict.fromkeys(_chunk_words(chunk)))
+        return tuple(words)
+
+    @classmethod
+    def build(cls, rows) -> PrefixIndex:
+        """rows: id artan sırada (id, title, author); id listeleri ekleme sırasıyla zaten sıralı olur."""
+        index = cls()
+        for book_id, title, author in rows:
+            words = cls.words_of(title, author)
+            index._docs[book_id] = (title, author, words)
+            for w in words:
+                index._ids.setdefault(w, []).append(book_id)
+        index._words = sorted(index._ids)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _remove(self, book_id: int):
+        doc = self._docs.pop(book_id, None)
+        if doc is None:
+            return
+        for w in doc[2]:
+            ids = self._ids[w]
+            del ids[bisect_left(ids, book_id)]
+            if not ids:
+                del self._ids[w]
+                del self._words[bisect_left(self._words, w)]
+
+    def put(self, book_id: int, title: str | None, author: str | None):
+        """Kitap eklendi / güncellendi: eski kelimeleri çıkarıp yenilerini ekler."""
+        with self._lock:
+            self._remove(book_id)
+            words = self.words_of(title, author)
+            self._docs[book_id] = (title, author, words)
+            for w in words:
+                ids = self._ids.get(w)
+                if ids is None:
+                    self._ids[w] = [book_id]
+                    insort(self._words, w)
+                else:
+                    insort(ids, book_id)
+
+    def remove(self, book_id: int):
+        with self._lock:
+            self._remove(book_id)
+
+    def suggest(self, text: str, limit: int, max_scan: int) -> list[dict]:
+        """
+        Son kelime önek, öncekiler tam kelime olarak eşleşir ("suc ve c" -> "Suç ve Ceza").
+        Sıra: eşleşen kelime (alfabetik, tam eşleşme önce), sonra id. max_scan incelenen
+        id sayısını sınırlar; kısa / çok yaygın öneklerde istek süresi sabit kalır.
+        """
+        full, prefix = prefix_query(text)
+        if not prefix or limit <= 0:
+            return []
+
+        found: list[int] = []
+        with self._lock:
+            if full:
+                # en az kitaplı tam kelimenin listesi aday kümesi; diğer koşullar kitap kelimelerinden
+                lists = [self._ids.get(w) for w in full]
+                if not all(lists):
+                    return []
+                for book_id in min(lists, key=len)[:max_scan]:
+                    words = self._docs[book_id][2]
+                    if all(w in words for w in full) and any(w.startswith(prefix) for w in words):
+                        found.append(book_id)
+                        if len(found) >= limit:
+                            break
+            else:
+                seen: set[int] = set()
+                scanned = 0
+                i = bisect_left(self._words, prefix)
+                while i < len(self._words) and scanned < max_scan and len(found) < limit:
+                    word = self._words[i]
+                    if not word.startswith(prefix):
+                        break
+                    for book_id in self._ids[word][:max_scan - scanned]:
+                        scanned += 1
+                        if book_id not in seen:
+                            seen.add(book_id)
+                            found.append(book_id)
+                            if len(found) >= limit:
+                                break
+                    i += 1
+
+            return [
+                {"id": book_id, "title": self._docs[book_id][0], "author": self._docs[book_id][1]}
+                for book_id in found
+            ]
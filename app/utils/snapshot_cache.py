@@ -0,0 +1,86 @@
+# app/utils/snapshot_cache.py
+from __future__ import annotations
+
+import threading
+import time
+
+
+class SnapshotCache:
+    """
+    Tek değerlik, thread-safe stale-while-revalidate cache.
+    - age < ttl: cache'ten döner
+    - ttl <= age < max_stale: eski değer hemen döner, arka planda tek bir yenileme başlar
+    - değer yok / age >= max_stale: çağıran senkron yükler (aynı anda tek yükleme)
+    Yükleme hatasında eski değer (varsa) dönmeye devam eder.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 30.0, max_stale_seconds: float = 300.0):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._value = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+
+    def configure(self, ttl_seconds: float, max_stale_seconds: float):
+        with self._lock:
+            self.ttl_seconds = float(ttl_seconds)
+            self.max_stale_seconds = max(float(max_stale_seconds), self.ttl_seconds)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _store(self, value):
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+
+    def _load(self, loader):
+        # aynı anda tek yükleme; bekleyenler yüklenen değeri kullanır
+        with self._load_lock:
+            with self._lock:
+                if self._value is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                    return
+            self._store(loader())
+
+    def _refresh_in_background(self, loader):
+        def _run():
+            try:
+                self._load(loader)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=_run, name=f"{self.name}-refresh", daemon=True).start()
+
+    def get(self, loader):
+        """
+        loader: argümansız, yeni değeri dönen fonksiyon (arka plan thread'inde de çağrılabilir).
+        return: (value, age_seconds)
+        """
+        with self._lock:
+            value, age = self._value, time.monotonic() - self._loaded_at
+            has_value = value is not None
+            if has_value and self.ttl_seconds <= age < self.max_stale_seconds and not self._refreshing:
+                self._refreshing = True
+                start_refresh = True
+            else:
+                start_refresh = False
+
+        if has_value and age < self.max_stale_seconds:
+            if start_refresh:
+                self._refresh_in_background(loader)
+            return value, age
+
+        try:
+            self._load(loader)
+        except Exception:
+            if not has_value:
+                raise
+        with self._lock:
+            return self._value, time.monotonic() - self._loaded_at
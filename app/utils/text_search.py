@@ -0,0 +1,59 @@
+# app/utils/text_search.py
+"""
+Katalog araması için normalizasyon ve tokenizasyon.
+Türkçe büyük/küçük harf (I -> ı, İ -> i) ve aksan duyarsız: "IŞIK", "ışık", "Isik" -> "isik".
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+MAX_TOKEN_LEN = 64
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# str.lower() "I"yı "i", "İ"yi "i̇" (i + nokta) yapar; Türkçe kuralı önce uygula
+_TR_UPPER = str.maketrans({"I": "ı", "İ": "i"})
+# alt çizgi \w içinde; token'larda olmasın (LIKE joker karakteri)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize(text: str | None) -> str:
+    if not text:
+        return ""
+    s = text.translate(_TR_UPPER).lower().replace("ı", "i")
+    s = unicodedata.normalize("NFKD", s)
+    return "".join(ch for ch in s if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Tek harfli token'lar (sayı hariç) atılır; çok uzunlar kesilir."""
+    return [
+        t[:MAX_TOKEN_LEN] for t in _WORD.findall(normalize(text))
+        if len(t) > 1 or t.isdigit()
+    ]
+
+
+def isbn_token(isbn: str | None) -> str | None:
+    # "978-975-07-1938-7" -> "9789750719387" (tireli / tiresiz arama aynı token'a düşsün)
+    compact = re.sub(r"[^0-9xX]", "", isbn or "").lower()
+    return compact if len(compact) >= 10 else None
+
+
+def bm25_tf(tf: float, doc_len: float, avgdl: float) -> float:
+    """BM25'in terim frekansı bileşeni (idf hariç); SearchRepo'daki SQL ifadesiyle aynı."""
+    return tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / max(avgdl, 1.0)))
+
+
+def prefix_query(text: str | None) -> tuple[list[str], str]:
+    """
+    Autocomplete sorgusu: (tam kelimeler, önek olarak aranacak son kelime).
+    Son kelime yazılmakta olduğu için tek harf olabilir; tam kelimeler tokenize kuralına uyar.
+    """
+    words = _WORD.findall(normalize(text))
+    if not words:
+        return [], ""
+    full = [t[:MAX_TOKEN_LEN] for t in words[:-1] if len(t) > 1 or t.isdigit()]
+    return full, words[-1][:MAX_TOKEN_LEN]
@@ -0,0 +1,41 @@
+# app/utils/upsert.py
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+
+
+def insert_ignore(table, rows: list[dict], key_cols: list[str]):
+    """
+    Anahtarı zaten olan satırları atlayarak ekler (eşzamanlı yazıcılarda PK hatası vermez).
+    MSSQL: NOT EXISTS + UPDLOCK/HOLDLOCK, PostgreSQL/SQLite: ON CONFLICT DO NOTHING,
+    diğerleri: satır satır savepoint. Commit yapmaz.
+    """
+    if not rows:
+        return
+    dialect = db.engine.dialect.name
+    if dialect == "mssql":
+        q = db.engine.dialect.identifier_preparer.quote
+        cols = list(rows[0].keys())
+        sql = (
+            f"INSERT INTO dbo.{q(table.name)} ({', '.join(q(c) for c in cols)}) "
+            f"SELECT {', '.join(':' + c for c in cols)} "
+            f"WHERE NOT EXISTS (SELECT 1 FROM dbo.{q(table.name)} WITH (UPDLOCK, HOLDLOCK) "
+            f"WHERE {' AND '.join(f'{q(k)} = :{k}' for k in key_cols)})"
+        )
+        db.session.execute(text(sql), rows)
+    elif dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.session.execute(insert(table).on_conflict_do_nothing(index_elements=key_cols), rows)
+    else:
+        for row in rows:
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(table.insert(), [row])
+            except IntegrityError:
+                pass
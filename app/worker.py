@@ -0,0 +1,28 @@
+# app/worker.py
+"""
+Ayrı job process'i: scheduler + background job'lar (late check, mail delivery).
+Web process'leri APP_ROLE=web ile çalıştırılır; bu process kendi (küçük) DB pool'unu kullanır.
+
+    python -m app.worker
+    APP_ROLE=worker flask --app app worker
+"""
+
+
+def run_worker(app):
+    from app.tasks.scheduler import start_scheduler
+
+    app.logger.info("[worker] Scheduler başlatılıyor.")
+    try:
+        # bloklar; lease sayesinde birden çok worker güvenle çalışır
+        start_scheduler(app, blocking=True)
+    except (KeyboardInterrupt, SystemExit):
+        app.logger.info("[worker] Durduruldu.")
+
+
+def main():
+    from app import create_app
+    run_worker(create_app(role="worker"))
+
+
+if __name__ == "__main__":
+    main()
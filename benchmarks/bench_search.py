@@ -0,0 +1,146 @@
+# benchmarks/bench_search.py
+"""
+/books/search (ters index + BM25) ile LIKE '%...%' taramasının karşılaştırması.
+
+    python -m benchmarks.bench_search                       # 1M kitap, /tmp/bench_search.db
+    python -m benchmarks.bench_search --books 100000 --db /tmp/x.db
+
+LIKE tarafı sadece ilk kelimeyi arar, sıralama yapmaz (tüm eşleşmeleri sayar);
+Türkçe harf / aksan duyarsızlığı da yoktur, yani alt sınırdır.
+
+Sentetik katalog Zipf dağılımlı bir kelime havuzundan üretilir (sık ve nadir kelimeler karışık).
+Index run_search_index_rebuild ile kurulur; sonra her sorgu için p50 / p95 ölçülür ve
+tek kitabın artımlı güncellemesi (index_book) zamanlanır.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+
+from flask import Flask
+from sqlalchemy import or_
+
+from app.config import Config
+from app.extensions import db
+from app.models.book import Book
+from app.repositories.counter_repo import CounterRepo
+from app.services.search_service import SearchService
+from app.tasks.search_index import run_search_index_rebuild
+from app.utils.text_search import normalize
+
+_SYLLABLES = ["ka", "ra", "de", "niz", "gül", "şe", "hir", "ay", "dın", "ış", "ık", "ço", "cuk",
+              "öy", "kü", "ta", "rih", "ev", "sa", "vaş", "yol", "su", "ğu", "an", "la", "mı"]
+
+
+def _make_app(uri: str) -> Flask:
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(SQLALCHEMY_DATABASE_URI=uri, SQLALCHEMY_ENGINE_OPTIONS={})
+    db.init_app(app)
+    return app
+
+
+def _vocab(n: int, rnd: random.Random) -> list[str]:
+    words = set()
+    while len(words) < n:
+        w = "".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        words.add(w.capitalize())
+    return sorted(words)  # aynı seed -> aynı sıra
+
+
+def _seed(n_books: int, rnd: random.Random) -> list[str]:
+    vocab = _vocab(50_000, rnd)
+    # sıklık alfabetik sırayla ilişkili olmasın (önek genişlemesi sadece sık kelimelere düşmesin)
+    rnd.shuffle(vocab)
+    # Zipf: ilk kelimeler çok sık, kuyruk nadir
+    cum, total = [], 0.0
+    for i in range(len(vocab)):
+        total += 1.0 / (i + 1)
+        cum.append(total)
+    authors = [f"{rnd.choice(vocab)} {rnd.choice(vocab)}" for _ in range(20_000)]
+    batch = []
+    for i in range(1, n_books + 1):
+        title = " ".join(rnd.choices(vocab, cum_weights=cum, k=rnd.randint(2, 6)))
+        batch.append({
+            "id": i, "title": title, "author": rnd.choice(authors), "isbn": f"978{i:010d}",
+            "total_copies": 1, "available_copies": 1,
+        })
+        if len(batch) == 20_000:
+            db.session.execute(Book.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(Book.__table__.insert(), batch)
+    db.session.commit()
+    CounterRepo.set_all(CounterRepo.compute_actual(None))
+    db.session.commit()
+    return vocab
+
+
+def _time(fn, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--db", default="/tmp/bench_search.db")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--like-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+    app = _make_app(f"sqlite:///{args.db}")
+    rnd = random.Random(42)
+    with app.app_context():
+        db.create_all()
+        t0 = time.perf_counter()
+        vocab = _seed(args.books, rnd)
+        print(f"seed: {args.books} kitap, {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    stats = run_search_index_rebuild(app, batch_size=5000)
+    print(f"rebuild: {stats}, {time.perf_counter() - t0:.1f}s")
+
+    queries = {
+        "sık kelime": vocab[0],
+        "orta kelime": vocab[500],
+        "nadir kelime": vocab[-1],
+        "iki kelime": f"{vocab[3]} {vocab[800]}",
+        "önek": normalize(vocab[1200])[:4],
+        "isbn": f"978{args.books // 2:010d}",
+    }
+
+    with app.test_request_context():
+        print(f"{'sorgu':14} {'q':24} {'index p50':>10} {'p95':>8} {'LIKE p50':>10}")
+        for name, q in queries.items():
+            p50, p95 = _time(lambda: SearchService.search(q, None, 20), args.repeat)
+            # sıralama için tüm eşleşmeler gerekir: LIKE tarafında eşleşenlerin hepsini say
+            like = f"%{q.split()[0]}%"
+            l50, _ = _time(
+                lambda: Book.query
+                .filter(or_(Book.title.like(like), Book.author.like(like), Book.isbn.like(like)))
+                .count(),
+                args.like_repeat,
+            )
+            print(f"{name:14} {q[:24]:24} {p50:>8.1f}ms {p95:>6.1f}ms {l50:>8.1f}ms")
+
+        book = db.session.get(Book, args.books // 3)
+        book.title = f"{vocab[7]} {vocab[9000]} yeni baskı"
+        t0 = time.perf_counter()
+        SearchService.index_book(book)
+        db.session.commit()
+        print(f"index_book (artımlı güncelleme + commit): {(time.perf_counter() - t0) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_smtp_pool.py
+"""
+MailService.send_many için throughput ölçümü (yerel aiosmtpd sunucusuna karşı).
+
+    pip install aiosmtpd
+    python -m benchmarks.bench_smtp_pool --messages 400
+
+Gerçek SMTP'deki TLS/AUTH kurulum maliyetini taklit etmek için EHLO'ya,
+sunucu tarafı işleme süresini taklit etmek için DATA'ya gecikme eklenir.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from flask import Flask
+
+from app.extensions import mail
+from app.services.mail_service import MailService
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # pragma: no cover
+    Controller = None
+
+
+class _SlowHandler:
+    def __init__(self, ehlo_latency: float, data_latency: float):
+        self.ehlo_latency = ehlo_latency
+        self.data_latency = data_latency
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.ehlo_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.data_latency)
+        self.received += 1
+        return "250 OK"
+
+
+def _make_app(port: int) -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USE_SSL=False,
+        MAIL_DEFAULT_SENDER="noreply@library.local",
+    )
+    mail.init_app(app)
+    return app
+
+
+def main():
+    if Controller is None:
+        raise SystemExit("aiosmtpd gerekli: pip install aiosmtpd")
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=400)
+    ap.add_argument("--per-connection", type=int, default=50)
+    ap.add_argument("--ehlo-latency-ms", type=float, default=20.0)
+    ap.add_argument("--data-latency-ms", type=float, default=5.0)
+    ap.add_argument("--port", type=int, default=8025)
+    args = ap.parse_args()
+
+    handler = _SlowHandler(args.ehlo_latency_ms / 1000.0, args.data_latency_ms / 1000.0)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    try:
+        app = _make_app(args.port)
+        batch = [(f"user{i}@library.local", "Bench", "Merhaba") for i in range(args.messages)]
+
+        with app.app_context():
+            # eski yol: her mail için ayrı SMTP oturumu
+            t0 = time.perf_counter()
+            for to, subject, body in batch:
+                MailService.send_email(to, subject, body)
+            base = time.perf_counter() - t0
+            print(f"send_email (oturum/mail)      : {args.messages / base:8.1f} msg/s")
+
+            for conns in (1, 4, 16):
+                t0 = time.perf_counter()
+                res = MailService.send_many(batch, connections=conns, per_connection=args.per_connection)
+                took = time.perf_counter() - t0
+                ok = sum(1 for r in res if r[0])
+                print(f"send_many connections={conns:<2}     : {args.messages / took:8.1f} msg/s (ok={ok})")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
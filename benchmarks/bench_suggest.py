@@ -0,0 +1,98 @@
+# benchmarks/bench_suggest.py
+"""
+/books/suggest'in kullandığı bellek içi önek index'inin (PrefixIndex) ölçümü. DB kullanmaz.
+
+    python -m benchmarks.bench_suggest                  # 1M kitap
+    python -m benchmarks.bench_suggest --books 100000
+
+Sentetik katalog bench_search'teki gibi Zipf dağılımlı kelime havuzundan üretilir. Kurulum süresi,
+process RSS artışı, önek uzunluğuna göre p50 / p95 ve tek kitap put / remove süresi yazdırılır.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import statistics
+import time
+
+from app.utils.prefix_index import PrefixIndex
+from app.utils.text_search import normalize
+
+_SYLLABLES = ["ka", "ra", "de", "niz", "gül", "şe", "hir", "ay", "dın", "ış", "ık", "ço", "cuk",
+              "öy", "kü", "ta", "rih", "ev", "sa", "vaş", "yol", "su", "ğu", "an", "la", "mı"]
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _catalog(n_books: int, rnd: random.Random) -> tuple[list[tuple], list[str]]:
+    words = set()
+    while len(words) < 50_000:
+        words.add("".join(rnd.choice(_SYLLABLES) for _ in range(rnd.randint(2, 4))).capitalize())
+    vocab = sorted(words)
+    rnd.shuffle(vocab)
+    cum, total = [], 0.0
+    for i in range(len(vocab)):
+        total += 1.0 / (i + 1)
+        cum.append(total)
+    authors = [f"{rnd.choice(vocab)} {rnd.choice(vocab)}" for _ in range(20_000)]
+    rows = [
+        (i, " ".join(rnd.choices(vocab, cum_weights=cum, k=rnd.randint(2, 6))), rnd.choice(authors))
+        for i in range(1, n_books + 1)
+    ]
+    return rows, vocab
+
+
+def _measure(index: PrefixIndex, queries: list[str], limit: int, max_scan: int) -> tuple[float, float]:
+    times = []
+    for q in queries:
+        started = time.perf_counter()
+        index.suggest(q, limit, max_scan)
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--max-scan", type=int, default=5000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    rows, vocab = _catalog(args.books, rnd)
+    words = [normalize(w) for w in vocab]
+
+    rss = _rss_mb()
+    started = time.perf_counter()
+    index = PrefixIndex.build(rows)
+    print(f"build: {len(index)} kitap, {time.perf_counter() - started:.1f} s, RSS +{_rss_mb() - rss:.0f} MB")
+
+    cases = {
+        "1 harf": [rnd.choice(words)[:1] for _ in range(args.queries)],
+        "2 harf": [rnd.choice(words)[:2] for _ in range(args.queries)],
+        "4 harf": [rnd.choice(words)[:4] for _ in range(args.queries)],
+        "tam kelime": [rnd.choice(words) for _ in range(args.queries)],
+        "kelime + önek": [f"{rnd.choice(words)} {rnd.choice(words)[:3]}" for _ in range(args.queries)],
+    }
+    print(f"{'sorgu':<16}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, queries in cases.items():
+        p50, p95 = _measure(index, queries, args.limit, args.max_scan)
+        print(f"{name:<16}{p50:>10.3f}{p95:>10.3f}")
+
+    times = []
+    for i in range(1000):
+        book_id = args.books + i + 1
+        started = time.perf_counter()
+        index.put(book_id, f"{rnd.choice(vocab)} {rnd.choice(vocab)}", rnd.choice(vocab))
+        index.remove(book_id)
+        times.append((time.perf_counter() - started) * 1000)
+    print(f"put + remove p50: {statistics.median(times):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
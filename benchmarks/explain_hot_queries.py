@@ -0,0 +1,136 @@
+# benchmarks/explain_hot_queries.py
+"""
+Sık çalışan sorguların planlarını yazdırır (index seek/search mi, tablo taraması mı).
+
+    python -m benchmarks.explain_hot_queries                 # SQLite (bellek), sentetik veri
+    python -m benchmarks.explain_hot_queries --uri "mssql+pyodbc://..."   # mevcut veritabanı
+
+SQLite'ta "SEARCH ... USING INDEX", MSSQL'de "Index Seek", PostgreSQL'de "Index Scan"
+beklenir; "SCAN borrows" / "Clustered Index Scan" / "Seq Scan" index kullanılmadığını gösterir.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from flask import Flask
+from sqlalchemy import func, select, text
+
+from app.extensions import db
+from app.models.book import Book
+from app.models.borrow import Borrow
+from app.models.notification_log import NotificationLog
+from app.models.penalty import Penalty
+from app.models.user import User
+
+
+def _make_app(uri: str) -> Flask:
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI=uri, SQLALCHEMY_TRACK_MODIFICATIONS=False)
+    db.init_app(app)
+    return app
+
+
+def _seed(rows: int):
+    now = datetime.utcnow()
+    rnd = random.Random(42)
+    db.session.execute(User.__table__.insert(), [
+        {"id": i, "username": f"u{i}", "email": f"u{i}@x.com", "password_hash": "x", "role": "user"}
+        for i in range(1, 1001)
+    ])
+    db.session.execute(Book.__table__.insert(), [
+        {"id": i, "title": f"Kitap {i}", "author": f"Yazar {i % 50}", "isbn": f"isbn{i}",
+         "total_copies": 3, "available_copies": 3}
+        for i in range(1, 1001)
+    ])
+    borrows, penalties, logs = [], [], []
+    for i in range(1, rows + 1):
+        borrowed = now - timedelta(days=rnd.randint(0, 720))
+        due = borrowed + timedelta(days=14)
+        # ~%5 açık ödünç
+        returned = None if rnd.random() < 0.05 else due - timedelta(days=rnd.randint(-5, 10))
+        borrows.append({
+            "id": i, "user_id": rnd.randint(1, 1000), "book_id": rnd.randint(1, 1000),
+            "borrowed_at": borrowed, "due_date": due, "returned_at": returned,
+            "status": "active" if returned is None else "returned",
+        })
+        if i % 10 == 0:
+            penalties.append({
+                "borrow_id": i, "days_overdue": 3, "daily_fee": 5, "amount": 15, "is_paid": False,
+                "created_at": due, "updated_at": due + timedelta(days=3),
+            })
+            logs.append({
+                "borrow_id": i, "type": "overdue", "email": "u@x.com", "message": "m",
+                "sent_at": due + timedelta(days=1), "success": True,
+            })
+    db.session.execute(Borrow.__table__.insert(), borrows)
+    db.session.execute(Penalty.__table__.insert(), penalties)
+    db.session.execute(NotificationLog.__table__.insert(), logs)
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+
+def _queries(now: datetime):
+    open_loans = Borrow.returned_at.is_(None)
+    return {
+        # late check / admin overdue: BorrowRepo.find_overdue
+        "overdue_list": select(Borrow.id).where(open_loans, Borrow.due_date < now).order_by(Borrow.due_date),
+        # admin_stats
+        "overdue_count": select(func.count()).select_from(Borrow).where(open_loans, Borrow.due_date < now),
+        "active_count": select(func.count()).select_from(Borrow).where(open_loans),
+        # late check partition aralıkları
+        "partition_ranges": select(func.min(Borrow.user_id), func.max(Borrow.user_id))
+        .where(open_loans, Borrow.due_date <= now + timedelta(days=1)),
+        # admin_penalties: updated_at DESC, id DESC keyset
+        "admin_penalties": select(Penalty.id).order_by(Penalty.updated_at.desc(), Penalty.id.desc()).limit(50),
+        # admin_mail_report: sent_at DESC, id DESC keyset
+        "mail_report": select(NotificationLog.id)
+        .order_by(NotificationLog.sent_at.desc(), NotificationLog.id.desc()).limit(50),
+        # borrow başına bildirimler (borrow_id, type)
+        "borrow_notifications": select(NotificationLog.id)
+        .where(NotificationLog.borrow_id == 10, NotificationLog.type == "overdue").limit(1),
+    }
+
+
+def _plan(conn, dialect: str, sql: str) -> list[str]:
+    if dialect == "sqlite":
+        return [r[-1] for r in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    if dialect == "postgresql":
+        return [r[0] for r in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+    if dialect == "mssql":
+        conn.exec_driver_sql("SET SHOWPLAN_TEXT ON")
+        try:
+            res = conn.exec_driver_sql(sql)
+            res.fetchall()  # ilk sonuç: sorgu metni
+            res.cursor.nextset()
+            return [r[0].strip() for r in res.cursor.fetchall()]
+        finally:
+            conn.exec_driver_sql("SET SHOWPLAN_TEXT OFF")
+    raise SystemExit(f"Desteklenmeyen veritabanı: {dialect}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="sqlite://", help="varsayılan: bellek içi SQLite + sentetik veri")
+    parser.add_argument("--rows", type=int, default=200_000, help="sentetik borrow sayısı (sadece SQLite)")
+    args = parser.parse_args()
+
+    app = _make_app(args.uri)
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite":
+            db.create_all()
+            _seed(args.rows)
+
+        now = datetime.utcnow()
+        with db.engine.connect() as conn:
+            for name, stmt in _queries(now).items():
+                sql = str(stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+                print(f"-- {name}")
+                for line in _plan(conn, dialect, sql):
+                    print(f"   {line}")
+
+
+if __name__ == "__main__":
+    main()
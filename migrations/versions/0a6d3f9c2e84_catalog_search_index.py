@@ -0,0 +1,52 @@
+"""catalog search index
+
+Revision ID: 0a6d3f9c2e84
+Revises: f2c9e4b8a731
+Create Date: 2026-10-18 18:47:05.219836
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6d3f9c2e84'
+down_revision = 'f2c9e4b8a731'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('search_terms',
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('df', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('token')
+    )
+    op.create_table('search_postings',
+    sa.Column('token', sa.String(length=64), nullable=False),
+    sa.Column('book_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('tf', sa.Integer(), nullable=False),
+    sa.Column('doc_len', sa.Integer(), nullable=False),
+    sa.Column('impact', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.PrimaryKeyConstraint('token', 'book_id')
+    )
+    with op.batch_alter_table('search_postings', schema=None) as batch_op:
+        batch_op.create_index('ix_search_postings_book_id', ['book_id'], unique=False)
+        batch_op.create_index('ix_search_postings_token_impact', ['token', sa.text('impact DESC')], unique=False)
+
+    # index mevcut kitaplar için `flask --app app rebuild-search-index` ile doldurulur (sayaç orada yazılır)
+    op.execute(
+        "INSERT INTO library_counters (name, value, updated_at) "
+        "SELECT 'search_token_total', 0, CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM library_counters WHERE name = 'search_token_total'")
+    with op.batch_alter_table('search_postings', schema=None) as batch_op:
+        batch_op.drop_index('ix_search_postings_token_impact')
+        batch_op.drop_index('ix_search_postings_book_id')
+
+    op.drop_table('search_postings')
+    op.drop_table('search_terms')
@@ -0,0 +1,28 @@
+"""catalog version counter
+
+Revision ID: 1b7e4a9d5c03
+Revises: 0a6d3f9c2e84
+Create Date: 2026-10-18 19:32:41.604217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7e4a9d5c03'
+down_revision = '0a6d3f9c2e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # her katalog yazımında artar; process içi autocomplete index'leri bununla senkron kalır
+    op.execute(
+        "INSERT INTO library_counters (name, value, updated_at) "
+        "SELECT 'catalog_version', 0, CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade():
+    op.execute("DELETE FROM library_counters WHERE name = 'catalog_version'")
@@ -0,0 +1,37 @@
+"""scheduler leases
+
+Revision ID: 2f6c8d1b4e93
+Revises: 7d4b2a9e1c58
+Create Date: 2026-10-18 13:48:19.402716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6c8d1b4e93'
+down_revision = '7d4b2a9e1c58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=200), nullable=True),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('last_run_owner', sa.String(length=200), nullable=True),
+    sa.Column('last_run_started_at', sa.DateTime(), nullable=True),
+    sa.Column('last_run_finished_at', sa.DateTime(), nullable=True),
+    sa.Column('last_run_duration_ms', sa.Integer(), nullable=True),
+    sa.Column('last_run_ok', sa.Boolean(), nullable=True),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
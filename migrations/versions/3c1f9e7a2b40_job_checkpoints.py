@@ -0,0 +1,31 @@
+"""job checkpoints
+
+Revision ID: 3c1f9e7a2b40
+Revises: a82bc799dc0a
+Create Date: 2026-10-18 10:12:41.204318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9e7a2b40'
+down_revision = 'a82bc799dc0a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_checkpoints',
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('run_started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('job_name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_checkpoints')
@@ -0,0 +1,30 @@
+"""resource versions for conditional GET
+
+Revision ID: 4d2a8f6b1e39
+Revises: 1b7e4a9d5c03
+Create Date: 2026-10-18 20:14:09.381552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2a8f6b1e39'
+down_revision = '1b7e4a9d5c03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resource_versions',
+    sa.Column('resource', sa.String(length=30), nullable=False),
+    sa.Column('scope_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('resource', 'scope_id')
+    )
+
+
+def downgrade():
+    op.drop_table('resource_versions')
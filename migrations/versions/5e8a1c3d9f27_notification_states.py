@@ -0,0 +1,41 @@
+"""notification states
+
+Revision ID: 5e8a1c3d9f27
+Revises: 9b7d2e4f6a13
+Create Date: 2026-10-18 12:21:07.915264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8a1c3d9f27'
+down_revision = '9b7d2e4f6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_states',
+    sa.Column('borrow_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('last_sent_at', sa.DateTime(), nullable=False),
+    sa.Column('next_eligible_at', sa.DateTime(), nullable=False),
+    sa.Column('send_count', sa.Integer(), nullable=False),
+    sa.Column('claim_token', sa.String(length=32), nullable=True),
+    sa.ForeignKeyConstraint(['borrow_id'], ['borrows.id'], ),
+    sa.PrimaryKeyConstraint('borrow_id', 'type')
+    )
+
+    # late_return tek seferlik: geçmişte gönderilmiş olanlar tekrar gönderilmesin
+    op.execute(
+        "INSERT INTO notification_states (borrow_id, type, last_sent_at, next_eligible_at, send_count) "
+        "SELECT borrow_id, type, MAX(sent_at), '9999-12-31', COUNT(*) "
+        "FROM notification_logs WHERE type = 'late_return' "
+        "GROUP BY borrow_id, type"
+    )
+
+
+def downgrade():
+    op.drop_table('notification_states')
@@ -0,0 +1,26 @@
+"""drop job_checkpoints.last_id (progress lives in job_partitions)
+
+Revision ID: 6f3b9d2c8a15
+Revises: 4d2a8f6b1e39
+Create Date: 2026-10-18 21:02:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f3b9d2c8a15'
+down_revision = '4d2a8f6b1e39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job_checkpoints', schema=None) as batch_op:
+        batch_op.drop_column('last_id')
+
+
+def downgrade():
+    with op.batch_alter_table('job_checkpoints', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'))
@@ -0,0 +1,47 @@
+"""digest notifications
+
+Revision ID: 7d4b2a9e1c58
+Revises: 5e8a1c3d9f27
+Create Date: 2026-10-18 13:05:42.118903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4b2a9e1c58'
+down_revision = '5e8a1c3d9f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mail_outbox_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('outbox_id', sa.Integer(), nullable=False),
+    sa.Column('borrow_id', sa.Integer(), nullable=False),
+    sa.Column('notif_type', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['borrow_id'], ['borrows.id'], ),
+    sa.ForeignKeyConstraint(['outbox_id'], ['mail_outbox.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('mail_outbox_items', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_mail_outbox_items_outbox_id'), ['outbox_id'], unique=False)
+
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('outbox_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_notification_logs_outbox_id'), ['outbox_id'], unique=False)
+        batch_op.create_foreign_key('fk_notification_logs_outbox_id', 'mail_outbox', ['outbox_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('notification_logs', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_notification_logs_outbox_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_notification_logs_outbox_id'))
+        batch_op.drop_column('outbox_id')
+
+    with op.batch_alter_table('mail_outbox_items', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_mail_outbox_items_outbox_id'))
+
+    op.drop_table('mail_outbox_items')
@@ -0,0 +1,38 @@
+"""job partitions
+
+Revision ID: 8a3e5f0c7b61
+Revises: 2f6c8d1b4e93
+Create Date: 2026-10-18 14:32:51.770214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3e5f0c7b61'
+down_revision = '2f6c8d1b4e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_partitions',
+    sa.Column('job_name', sa.String(length=100), nullable=False),
+    sa.Column('part_no', sa.Integer(), nullable=False),
+    sa.Column('user_id_from', sa.Integer(), nullable=False),
+    sa.Column('user_id_to', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('owner', sa.String(length=200), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('duration_ms', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('job_name', 'part_no')
+    )
+
+
+def downgrade():
+    op.drop_table('job_partitions')
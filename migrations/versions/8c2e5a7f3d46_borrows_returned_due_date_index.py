@@ -0,0 +1,27 @@
+"""index due_date of returned borrows (daily rollup overdue delta)
+
+Revision ID: 8c2e5a7f3d46
+Revises: 6f3b9d2c8a15
+Create Date: 2026-10-18 21:26:52.047193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2e5a7f3d46'
+down_revision = '6f3b9d2c8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_borrows_returned_due_date', 'borrows', ['due_date'], unique=False,
+                    mssql_where=sa.text('returned_at IS NOT NULL'),
+                    postgresql_where=sa.text('returned_at IS NOT NULL'),
+                    sqlite_where=sa.text('returned_at IS NOT NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_borrows_returned_due_date', table_name='borrows')
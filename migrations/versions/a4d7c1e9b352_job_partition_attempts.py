@@ -0,0 +1,28 @@
+"""job_partitions attempts / last_error
+
+Revision ID: a4d7c1e9b352
+Revises: 8c2e5a7f3d46
+Create Date: 2026-10-18 21:48:15.662907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7c1e9b352'
+down_revision = '8c2e5a7f3d46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job_partitions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('last_error', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job_partitions', schema=None) as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('attempts', mssql_drop_default=True)
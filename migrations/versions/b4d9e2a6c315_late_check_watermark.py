@@ -0,0 +1,28 @@
+"""late check watermark
+
+Revision ID: b4d9e2a6c315
+Revises: 8a3e5f0c7b61
+Create Date: 2026-10-18 15:10:27.348851
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d9e2a6c315'
+down_revision = '8a3e5f0c7b61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('job_checkpoints', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('watermark', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_full_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('job_checkpoints', schema=None) as batch_op:
+        batch_op.drop_column('last_full_at')
+        batch_op.drop_column('watermark')
@@ -0,0 +1,54 @@
+"""hot query indexes
+
+Revision ID: c7f1a3e8d592
+Revises: b4d9e2a6c315
+Create Date: 2026-10-18 15:52:40.126447
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7f1a3e8d592'
+down_revision = 'b4d9e2a6c315'
+branch_labels = None
+depends_on = None
+
+
+# açık ödünçler: MSSQL filtered index, PG/SQLite partial index
+OPEN_LOANS = dict(
+    mssql_where=sa.text('returned_at IS NULL'),
+    postgresql_where=sa.text('returned_at IS NULL'),
+    sqlite_where=sa.text('returned_at IS NULL'),
+)
+
+
+def upgrade():
+    op.create_index('ix_borrows_open_due_date', 'borrows', ['due_date'],
+                    unique=False, mssql_include=['user_id', 'book_id'], **OPEN_LOANS)
+    op.create_index('ix_borrows_open_user_due_date', 'borrows', ['user_id', 'due_date'],
+                    unique=False, **OPEN_LOANS)
+
+    # (borrow_id, type) borrow_id tek kolon indexini kapsar
+    op.create_index('ix_notification_logs_borrow_id_type', 'notification_logs', ['borrow_id', 'type'], unique=False)
+    op.drop_index('ix_notification_logs_borrow_id', table_name='notification_logs')
+    op.create_index('ix_notification_logs_sent_at_id', 'notification_logs',
+                    [sa.text('sent_at DESC'), sa.text('id DESC')], unique=False)
+
+    # penalties migration dışında oluşturulmuş olabilir
+    if sa.inspect(op.get_bind()).has_table('penalties'):
+        op.create_index('ix_penalties_updated_at_id', 'penalties',
+                        [sa.text('updated_at DESC'), sa.text('id DESC')], unique=False)
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('penalties'):
+        op.drop_index('ix_penalties_updated_at_id', table_name='penalties')
+
+    op.drop_index('ix_notification_logs_sent_at_id', table_name='notification_logs')
+    op.create_index('ix_notification_logs_borrow_id', 'notification_logs', ['borrow_id'], unique=False)
+    op.drop_index('ix_notification_logs_borrow_id_type', table_name='notification_logs')
+
+    op.drop_index('ix_borrows_open_user_due_date', table_name='borrows')
+    op.drop_index('ix_borrows_open_due_date', table_name='borrows')
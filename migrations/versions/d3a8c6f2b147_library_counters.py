@@ -0,0 +1,57 @@
+"""library counters
+
+Revision ID: d3a8c6f2b147
+Revises: c7f1a3e8d592
+Create Date: 2026-10-18 16:40:12.583019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8c6f2b147'
+down_revision = 'c7f1a3e8d592'
+branch_labels = None
+depends_on = None
+
+
+# başlangıç değerleri taban tablolardan (sonrası yazma yollarında artımlı)
+SEED = {
+    'total_books': "SELECT COUNT(*) FROM books",
+    'total_copies': "SELECT COALESCE(SUM(total_copies), 0) FROM books",
+    'active_borrows': "SELECT COUNT(*) FROM borrows WHERE returned_at IS NULL",
+    'overdue_borrows': "SELECT COUNT(*) FROM borrows WHERE returned_at IS NULL AND status IN ('overdue', 'late')",
+}
+PENALTY_SEED = {
+    'unpaid_penalty_count': "SELECT COUNT(*) FROM penalties WHERE is_paid = {false}",
+    'unpaid_penalty_amount': "SELECT COALESCE(SUM(amount), 0) FROM penalties WHERE is_paid = {false}",
+}
+
+
+def upgrade():
+    op.create_table('library_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    bind = op.get_bind()
+    seed = dict(SEED)
+    # penalties migration dışında oluşturulmuş olabilir
+    if sa.inspect(bind).has_table('penalties'):
+        false = 'false' if bind.dialect.name == 'postgresql' else '0'
+        seed.update({name: query.format(false=false) for name, query in PENALTY_SEED.items()})
+    else:
+        seed.update({name: "SELECT 0" for name in PENALTY_SEED})
+
+    for name, query in seed.items():
+        op.execute(
+            f"INSERT INTO library_counters (name, value, updated_at) "
+            f"SELECT '{name}', ({query}), CURRENT_TIMESTAMP"
+        )
+
+
+def downgrade():
+    op.drop_table('library_counters')
@@ -0,0 +1,59 @@
+"""daily stats rollup
+
+Revision ID: e5b1d7a4c260
+Revises: d3a8c6f2b147
+Create Date: 2026-10-18 17:25:48.901274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1d7a4c260'
+down_revision = 'd3a8c6f2b147'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('borrows_started', sa.Integer(), nullable=False),
+    sa.Column('borrows_returned', sa.Integer(), nullable=False),
+    sa.Column('overdue_open', sa.Integer(), nullable=False),
+    sa.Column('penalty_amount_accrued', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('penalties_paid', sa.Integer(), nullable=False),
+    sa.Column('penalty_amount_paid', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('mails_sent', sa.Integer(), nullable=False),
+    sa.Column('mails_failed', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+    op.create_index('ix_borrows_borrowed_at', 'borrows', ['borrowed_at'], unique=False)
+    op.create_index('ix_borrows_returned_at', 'borrows', ['returned_at'], unique=False,
+                    mssql_where=sa.text('returned_at IS NOT NULL'),
+                    postgresql_where=sa.text('returned_at IS NOT NULL'),
+                    sqlite_where=sa.text('returned_at IS NOT NULL'))
+
+    # penalties migration dışında oluşturulmuş olabilir
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('penalties'):
+        with op.batch_alter_table('penalties', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('paid_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(batch_op.f('ix_penalties_paid_at'), ['paid_at'], unique=False)
+        # önceden ödenmişler için en iyi tahmin: son güncelleme zamanı
+        true = 'true' if bind.dialect.name == 'postgresql' else '1'
+        op.execute(f"UPDATE penalties SET paid_at = updated_at WHERE is_paid = {true}")
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('penalties'):
+        with op.batch_alter_table('penalties', schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f('ix_penalties_paid_at'))
+            batch_op.drop_column('paid_at')
+
+    op.drop_index('ix_borrows_returned_at', table_name='borrows')
+    op.drop_index('ix_borrows_borrowed_at', table_name='borrows')
+    op.drop_table('daily_stats')
@@ -0,0 +1,30 @@
+"""leaderboard buckets
+
+Revision ID: f2c9e4b8a731
+Revises: e5b1d7a4c260
+Create Date: 2026-10-18 18:02:16.447810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9e4b8a731'
+down_revision = 'e5b1d7a4c260'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_buckets',
+    sa.Column('board', sa.String(length=30), nullable=False),
+    sa.Column('bucket_day', sa.Date(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('board', 'bucket_day', 'entity_id')
+    )
+
+
+def downgrade():
+    op.drop_table('leaderboard_buckets')
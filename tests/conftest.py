@@ -0,0 +1,73 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Config ortamdan import anında okunur: app import edilmeden önce ayarlanmalı
+os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+os.environ["APP_ROLE"] = "web"
+os.environ["SUGGEST_WARM_ON_START"] = "0"
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config.update(TESTING=True, MAIL_SUPPRESS_SEND=True)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def count_queries(app):
+    """with count_queries() as n: ... -> n[0] blok içinde çalışan SQL ifadesi sayısı"""
+    @contextmanager
+    def _count():
+        n = [0]
+
+        def _on_execute(*args):
+            n[0] += 1
+
+        event.listen(db.engine, "before_cursor_execute", _on_execute)
+        try:
+            yield n
+        finally:
+            event.remove(db.engine, "before_cursor_execute", _on_execute)
+    return _count
+
+
+def seed_library(n_users: int, n_books: int):
+    """Kullanıcı 1 admin."""
+    from app.models.book import Book
+    from app.models.user import User
+
+    for i in range(n_users):
+        db.session.add(User(
+            username=f"u{i}", email=f"u{i}@example.com", password_hash="x",
+            role="admin" if i == 0 else "user",
+        ))
+    for i in range(n_books):
+        db.session.add(Book(title=f"Kitap {i}", author=f"Yazar {i % 5}", total_copies=3, available_copies=3))
+    db.session.commit()
+
+
+def add_borrows(n: int, n_users: int, n_books: int):
+    """Ödünçlerin bir kısmı gecikmiş, bir kısmı 2 gün içinde teslim; kullanıcı / kitap sırayla dağılır."""
+    from app.models.borrow import Borrow
+
+    now = datetime.utcnow()
+    for i in range(n):
+        db.session.add(Borrow(
+            user_id=1 + i % n_users,
+            book_id=1 + i % n_books,
+            due_date=now + timedelta(days=(i % 4) - 2, hours=1),
+            status="active",
+        ))
+    db.session.commit()
@@ -0,0 +1,53 @@
+"""
+Ödünç listeleri satır başına user / book lazy load yapmamalı (N+1): SQL ifadesi sayısı
+satır sayısından bağımsız olmalı.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from tests.conftest import seed_library, add_borrows
+
+
+def _web_client(app):
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["user_id"] = 1
+        s["role"] = "admin"
+        s["username"] = "u0"
+    return client
+
+
+def _my_borrows(app, client):
+    token = create_access_token(identity="1", additional_claims={"role": "admin", "user_id": 1})
+    return client.get("/borrow/my", headers={"Authorization": f"Bearer {token}"})
+
+
+ENDPOINTS = {
+    "borrow_my": lambda app, client: client.get("/web/api/borrow/my"),
+    "my_borrows": _my_borrows,
+    "admin_overdue_list": lambda app, client: client.get("/web/api/admin/overdue"),
+    "admin_notifications": lambda app, client: client.get("/web/api/admin/notifications"),
+}
+
+
+def _statements(app, count_queries, call) -> tuple[int, int]:
+    client = _web_client(app)
+    with count_queries() as n:
+        resp = call(app, client)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return n[0], len(resp.get_json()["data"])
+
+
+@pytest.mark.parametrize("name", ENDPOINTS)
+def test_statement_count_does_not_grow_with_rows(app, count_queries, name):
+    seed_library(n_users=3, n_books=40)
+    add_borrows(12, n_users=3, n_books=4)
+    small, small_rows = _statements(app, count_queries, ENDPOINTS[name])
+
+    # daha çok satır, daha çok farklı kullanıcı / kitap
+    add_borrows(120, n_users=3, n_books=40)
+    large, large_rows = _statements(app, count_queries, ENDPOINTS[name])
+
+    assert large_rows > small_rows
+    assert large == small
+    assert large <= 4